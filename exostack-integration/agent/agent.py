@@ -1,76 +1,397 @@
 import asyncio
+import fcntl
+import functools
 import logging
 import time
-import requests
+from contextlib import asynccontextmanager
+import httpx
+import orjson
 import psutil
 import torch
-import json
 from datetime import datetime
-from typing import Dict, Any, Optional
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
+from typing import Dict, Any, AsyncGenerator, AsyncIterator, Optional, Tuple, Callable
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from .config import CACHE_DIR, HEALTH_MONITOR_CONFIG, ensure_dirs
 from .health_monitor import health_monitor
 from .executor import inference_engine
+from .grpc_server import GRPC_AVAILABLE, start_grpc_server, stop_grpc_server
+from .models import ModelRequest, TaskRequest, decode_body
 from .model_manager import model_manager
 from shared.models.model_registry import model_registry
-from shared.config.env import AGENT_ID, HUB_URL, AGENT_HOST, AGENT_PORT
+from shared.config.env import (
+    AGENT_ID, HUB_URL, AGENT_HOST, AGENT_PORT, AGENT_GRPC_PORT, HEARTBEAT_INTERVAL, MAX_CONCURRENT_TASKS
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="ExoStack Agent", version="1.0.0")
+# Persistent keep-alive client shared by registration and heartbeats
+HUB_CLIENT = httpx.AsyncClient(
+    base_url=HUB_URL,
+    timeout=10,
+    limits=httpx.Limits(max_keepalive_connections=4)
+)
+
+app = FastAPI(title="ExoStack Agent", version="1.0.0", default_response_class=ORJSONResponse)
+
+# Constant response bodies, serialized once
+HEALTH_BODY = orjson.dumps({"status": "healthy", "agent_id": AGENT_ID})
+
+# Capability payloads are rebuilt at most once per TTL
+PAYLOAD_CACHE_TTL = 5.0
+_payload_cache: Dict[str, Tuple[float, Dict[str, Any], bytes]] = {}
+
+# Dynamic batching of /tasks/execute requests
+BATCH_MAX_SIZE = 8
+BATCH_MAX_WAIT = 0.01
+PENDING_TASKS: asyncio.Queue = asyncio.Queue()
+# Queued /tasks/execute requests beyond this are rejected with 503
+MAX_PENDING_TASKS = BATCH_MAX_SIZE * MAX_CONCURRENT_TASKS
+_batch_worker_task: Optional[asyncio.Task] = None
+
+# Admission control: at most MAX_CONCURRENT_TASKS inferences in flight
+INFERENCE_SEM = asyncio.Semaphore(MAX_CONCURRENT_TASKS)
+MAX_ADMISSION_QUEUE = MAX_CONCURRENT_TASKS * 2
+_admission_waiting = 0
+
+# Detailed health body shared by /health/detailed and /metrics/detailed
+HEALTH_DETAILED_BODY: Optional[bytes] = None
+
+# Lock file held by the single worker that talks to the hub
+_registration_lock_file = None
+
+# Model status body, rebuilt on load/unload and by the health refresher
+_MODEL_STATUS_BODY: Optional[bytes] = None
+_model_status_lock = asyncio.Lock()
+
+# Latest system sample, republished by run_system_sampler() as a whole new dict
+SYSTEM_SNAPSHOT: Dict[str, Any] = {}
+
+def _probe_gpu() -> Tuple[bool, Dict[str, Any]]:
+    """Probe CUDA once, returning (has_gpu, gpu_info)"""
+    if not torch.cuda.is_available():
+        return False, {}
+
+    try:
+        gpu_props = torch.cuda.get_device_properties(0)
+        return True, {
+            "name": gpu_props.name,
+            "memory_gb": gpu_props.total_memory / (1024**3),
+            "compute_capability": f"{gpu_props.major}.{gpu_props.minor}"
+        }
+    except Exception as e:
+        return True, {"error": str(e)}
+
+# CPU and GPU properties do not change at runtime, so probe them once
+_CPU_COUNT = psutil.cpu_count()
+_HAS_GPU, _GPU_INFO = _probe_gpu()
+
+def _sample_system() -> Dict[str, Any]:
+    memory = psutil.virtual_memory()
+    ts_iso = datetime.now().isoformat(timespec="seconds")
+    return {
+        "available_ram_gb": memory.available / (1024**3),
+        "total_ram_gb": memory.total / (1024**3),
+        "cpu_count": _CPU_COUNT,
+        "ts_iso": ts_iso,
+        "ping_body": orjson.dumps({"status": "ok", "timestamp": ts_iso})
+    }
+
+def _cached_timestamp() -> str:
+    """Second-granularity timestamp from the latest system sample"""
+    return SYSTEM_SNAPSHOT.get("ts_iso") or datetime.now().isoformat(timespec="seconds")
+
+async def run_system_sampler():
+    """Refresh SYSTEM_SNAPSHOT every health collection interval"""
+    global SYSTEM_SNAPSHOT
+    interval = HEALTH_MONITOR_CONFIG["collection_interval"]
+    while True:
+        try:
+            SYSTEM_SNAPSHOT = _sample_system()
+        except Exception as e:
+            logger.error(f"System sampling failed: {e}")
+        await asyncio.sleep(interval)
+
+@functools.lru_cache(maxsize=16)
+def _list_models_cached(ram_bucket_gb: int, has_gpu: bool) -> Tuple[str, ...]:
+    """Compatible models per whole-GB RAM bucket; min_ram_gb is integral so results are exact"""
+    return tuple(model_registry.list_models(
+        compatible_with={'ram_gb': float(ram_bucket_gb), 'has_gpu': has_gpu}
+    ))
+
+async def _refresh_health():
+    global HEALTH_DETAILED_BODY
+    detailed = await asyncio.to_thread(health_monitor.get_detailed_health)
+    HEALTH_DETAILED_BODY = orjson.dumps(detailed)
+
+async def _detailed_health_body() -> bytes:
+    if HEALTH_DETAILED_BODY is None:
+        await _refresh_health()
+    return HEALTH_DETAILED_BODY
+
+async def run_health_refresher():
+    """Rebuild the shared detailed health body every health collection interval"""
+    interval = HEALTH_MONITOR_CONFIG["collection_interval"]
+    while True:
+        try:
+            await _refresh_health()
+            # Tasks can auto-load models, so also bound model status staleness
+            await _rebuild_model_status()
+        except Exception as e:
+            logger.error(f"Health snapshot refresh failed: {e}")
+        await asyncio.sleep(interval)
+
+def _build_resources() -> Dict[str, Any]:
+    has_gpu = _HAS_GPU
+    gpu_info = _GPU_INFO
+    snapshot = SYSTEM_SNAPSHOT or _sample_system()
+    cpu_cores = snapshot["cpu_count"]
+    total_ram_gb = snapshot["total_ram_gb"]
+    available_ram_gb = snapshot["available_ram_gb"]
+
+    # Get compatible models
+    compatible_models = list(_list_models_cached(int(available_ram_gb), has_gpu))
+
+    return {
+        "cpu_cores": cpu_cores,
+        "total_ram_gb": total_ram_gb,
+        "available_ram_gb": available_ram_gb,
+        "has_gpu": has_gpu,
+        "gpu_info": gpu_info,
+        "compatible_models": compatible_models
+    }
+
+def _cached_payload(key: str, build: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], bytes]:
+    """Return a cached (payload, serialized body) pair, rebuilding it once the TTL expires"""
+    now = time.monotonic()
+    entry = _payload_cache.get(key)
+    if entry is None or now >= entry[0]:
+        payload = build()
+        entry = (now + PAYLOAD_CACHE_TTL, payload, orjson.dumps(payload))
+        _payload_cache[key] = entry
+    return entry[1], entry[2]
+
+class StreamBuffer:
+    """Coalesces stream frames, flushing once size bytes are buffered or interval seconds have passed"""
+
+    def __init__(self, size: int = 8192, interval: float = 0.025):
+        self.size = size
+        self.interval = interval
+        self.buffer = bytearray()
+        self.last_flush = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def append(self, data: bytes) -> Optional[bytes]:
+        """Buffer data, returning the coalesced bytes when a flush is due"""
+        self.buffer += data
+        if len(self.buffer) >= self.size or time.monotonic() - self.last_flush >= self.interval:
+            return self.flush()
+        return None
+
+    def flush(self) -> bytes:
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        self.last_flush = time.monotonic()
+        return data
+
+    async def coalesce(self, frames: AsyncGenerator[bytes, None]) -> AsyncIterator[bytes]:
+        """Re-yield frames coalesced, flushing a partial buffer once interval passes without a new frame"""
+        # The next frame is awaited in a task so a timeout doesn't cancel the source
+        pending = None
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(frames.__anext__())
+                timeout = None
+                if self.buffer:
+                    timeout = max(0.0, self.interval - (time.monotonic() - self.last_flush))
+                done, _ = await asyncio.wait({pending}, timeout=timeout)
+                if not done:
+                    yield self.flush()
+                    continue
+
+                next_frame, pending = pending, None
+                try:
+                    frame = next_frame.result()
+                except StopAsyncIteration:
+                    break
+                data = self.append(frame)
+                if data:
+                    yield data
+        finally:
+            if pending is not None:
+                pending.cancel()
+                await asyncio.gather(pending, return_exceptions=True)
+            await frames.aclose()
+
+        if self.buffer:
+            yield self.flush()
+
+def acquire_registration_lock() -> bool:
+    """Take the per-agent file lock so only one uvicorn worker registers, heartbeats and serves gRPC"""
+    global _registration_lock_file
+    if _registration_lock_file is not None:
+        return True
+
+    ensure_dirs()
+    lock_file = open(CACHE_DIR / f"{AGENT_ID}.lock", "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return False
+
+    # Held for the life of the process; the OS releases it on exit
+    _registration_lock_file = lock_file
+    return True
+
+@app.on_event("startup")
+async def start_background_tasks():
+    ensure_dirs()
+    app.state.sampler_task = asyncio.create_task(run_system_sampler())
+    app.state.health_refresher_task = asyncio.create_task(run_health_refresher())
+    app.state.grpc_server = None
+    if acquire_registration_lock():
+        app.state.main_loop_task = asyncio.create_task(main_loop())
+        app.state.grpc_server = await start_grpc_server(inference_slot=_inference_slot)
+    else:
+        logger.info("Another worker owns hub registration for this agent")
+
+@app.on_event("shutdown")
+async def close_hub_client():
+    await stop_grpc_server(app.state.grpc_server)
+    await HUB_CLIENT.aclose()
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "agent_id": AGENT_ID}
+    return Response(content=HEALTH_BODY, media_type="application/json")
 
 @app.get("/health/detailed")
 async def get_detailed_health():
-    return health_monitor.get_detailed_health()
+    return Response(content=await _detailed_health_body(), media_type="application/json")
 
 @app.get("/metrics/detailed")
 async def get_detailed_metrics():
-    return health_monitor.get_detailed_health()
+    return Response(content=await _detailed_health_body(), media_type="application/json")
+
+def _check_capacity():
+    """Reject new inference work once all slots are busy and the wait queue is full"""
+    if INFERENCE_SEM.locked() and _admission_waiting >= MAX_ADMISSION_QUEUE:
+        raise HTTPException(
+            status_code=503,
+            detail="Agent at capacity",
+            headers={"Retry-After": "1"}
+        )
+
+@asynccontextmanager
+async def _inference_slot():
+    """Hold one of the MAX_CONCURRENT_TASKS inference slots"""
+    global _admission_waiting
+    _admission_waiting += 1
+    try:
+        await INFERENCE_SEM.acquire()
+    finally:
+        _admission_waiting -= 1
+    try:
+        yield
+    finally:
+        INFERENCE_SEM.release()
+
+async def _batch_worker():
+    """Collect up to BATCH_MAX_SIZE tasks within BATCH_MAX_WAIT seconds and dispatch them together"""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await PENDING_TASKS.get()]
+        deadline = loop.time() + BATCH_MAX_WAIT
+        while len(batch) < BATCH_MAX_SIZE:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(PENDING_TASKS.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        try:
+            # A whole batch occupies one inference slot, so batches can fill to BATCH_MAX_SIZE
+            async with _inference_slot():
+                results = await inference_engine.process_tasks_batch([task for task, _ in batch])
+        except Exception as e:
+            logger.error(f"Batch processing failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+def _ensure_batch_worker():
+    global _batch_worker_task
+    if _batch_worker_task is None or _batch_worker_task.done():
+        _batch_worker_task = asyncio.create_task(_batch_worker())
 
 @app.post("/tasks/execute")
-async def execute_task(task_data: dict):
-    task_id = task_data.get("id")
+async def execute_task(task: TaskRequest = Depends(decode_body(TaskRequest))):
+    task_id = task.id
     start_time = time.time()
-    
+    status = "failed"
+
+    if PENDING_TASKS.qsize() >= MAX_PENDING_TASKS:
+        raise HTTPException(
+            status_code=503,
+            detail="Agent at capacity",
+            headers={"Retry-After": "1"}
+        )
     try:
-        result = await inference_engine.process_task(task_data)
-        duration = time.time() - start_time
-        health_monitor.record_task(task_id, "completed", duration)
-        return {"status": "completed", "result": result}
-        
+        _ensure_batch_worker()
+        future = asyncio.get_running_loop().create_future()
+        await PENDING_TASKS.put((task.to_task_data(), future))
+        result = await future
     except Exception as e:
-        duration = time.time() - start_time
-        health_monitor.record_task(task_id, "failed", duration)
-        return {"status": "failed", "error": str(e)}
+        raise HTTPException(status_code=500, detail=str(e))
+    else:
+        if result.get("status") == "failed":
+            raise HTTPException(status_code=500, detail=result.get("error"))
+        status = "completed"
+        return result
+    finally:
+        health_monitor.record_task(task_id, status, time.time() - start_time)
 
 @app.post("/inference/stream")
-async def stream_inference(task_data: Dict[str, Any]):
+async def stream_inference(task: TaskRequest = Depends(decode_body(TaskRequest))):
     """Stream inference results in real-time using Server-Sent Events"""
+    _check_capacity()
+    task_data = task.to_task_data()
 
-    async def generate_stream():
-        """Generate SSE stream for inference"""
-        try:
+    async def sse_frames():
+        async with _inference_slot():
             async for chunk in inference_engine.stream_generate(task_data):
                 # Format as Server-Sent Events
-                data = json.dumps(chunk)
-                yield f"data: {data}\n\n"
+                yield b"data: " + orjson.dumps(chunk) + b"\n\n"
 
-                # Add small delay to prevent overwhelming the client
-                await asyncio.sleep(0.01)
+    async def generate_stream():
+        """Generate SSE stream for inference"""
+        buffer = StreamBuffer()
+        try:
+            async for data in buffer.coalesce(sse_frames()):
+                yield data
 
         except Exception as e:
             error_chunk = {
-                "task_id": task_data.get("id", "unknown"),
+                "task_id": task.id,
                 "status": "error",
                 "error": str(e),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": time.time_ns()
             }
-            yield f"data: {json.dumps(error_chunk)}\n\n"
+            buffer.append(b"data: " + orjson.dumps(error_chunk) + b"\n\n")
+
+        if buffer:
+            yield buffer.flush()
 
     return StreamingResponse(
         generate_stream(),
@@ -83,24 +404,34 @@ async def stream_inference(task_data: Dict[str, Any]):
     )
 
 @app.post("/inference/stream_json")
-async def stream_inference_json(task_data: Dict[str, Any]):
+async def stream_inference_json(task: TaskRequest = Depends(decode_body(TaskRequest))):
     """Stream inference results as JSON chunks"""
+    _check_capacity()
+    task_data = task.to_task_data()
+
+    async def json_frames():
+        async with _inference_slot():
+            async for chunk in inference_engine.stream_generate(task_data):
+                yield orjson.dumps(chunk) + b"\n"
 
     async def generate_json_stream():
         """Generate JSON stream for inference"""
+        buffer = StreamBuffer()
         try:
-            async for chunk in inference_engine.stream_generate(task_data):
-                yield json.dumps(chunk) + "\n"
-                await asyncio.sleep(0.01)
+            async for data in buffer.coalesce(json_frames()):
+                yield data
 
         except Exception as e:
             error_chunk = {
-                "task_id": task_data.get("id", "unknown"),
+                "task_id": task.id,
                 "status": "error",
                 "error": str(e),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": time.time_ns()
             }
-            yield json.dumps(error_chunk) + "\n"
+            buffer.append(orjson.dumps(error_chunk) + b"\n")
+
+        if buffer:
+            yield buffer.flush()
 
     return StreamingResponse(
         generate_json_stream(),
@@ -113,130 +444,119 @@ async def stream_inference_json(task_data: Dict[str, Any]):
 
 @app.get("/ping")
 async def ping():
-    return {"status": "ok", "timestamp": datetime.now().isoformat()}
+    body = SYSTEM_SNAPSHOT.get("ping_body") or orjson.dumps({"status": "ok", "timestamp": _cached_timestamp()})
+    return Response(content=body, media_type="application/json")
+
+async def _rebuild_model_status():
+    """Republish the model status body; only rebuilds are serialized, reads never wait"""
+    global _MODEL_STATUS_BODY
+    async with _model_status_lock:
+        _MODEL_STATUS_BODY = orjson.dumps(inference_engine.get_model_status())
 
 @app.get("/models/status")
 async def get_model_status():
     """Get status of all loaded models"""
-    return inference_engine.get_model_status()
+    if _MODEL_STATUS_BODY is None:
+        await _rebuild_model_status()
+    return Response(content=_MODEL_STATUS_BODY, media_type="application/json")
 
 @app.post("/models/load")
-async def load_model(request: dict):
+async def load_model(request: ModelRequest = Depends(decode_body(ModelRequest))):
     """Load a specific model"""
-    model_id = request.get("model_id")
+    model_id = request.model_id
     if not model_id:
         raise HTTPException(status_code=400, detail="model_id is required")
 
     success = await inference_engine.preload_model(model_id)
+    _list_models_cached.cache_clear()
+    await _rebuild_model_status()
     if success:
         return {"status": "success", "message": f"Model {model_id} loaded"}
     else:
         raise HTTPException(status_code=500, detail=f"Failed to load model {model_id}")
 
 @app.post("/models/unload")
-async def unload_model(request: dict):
+async def unload_model(request: ModelRequest = Depends(decode_body(ModelRequest))):
     """Unload a specific model"""
-    model_id = request.get("model_id")
+    model_id = request.model_id
     if not model_id:
         raise HTTPException(status_code=400, detail="model_id is required")
 
     success = await inference_engine.unload_model(model_id)
+    _list_models_cached.cache_clear()
+    await _rebuild_model_status()
     if success:
         return {"status": "success", "message": f"Model {model_id} unloaded"}
     else:
         raise HTTPException(status_code=500, detail=f"Failed to unload model {model_id}")
 
-@app.get("/models/available")
-async def get_available_models():
-    """Get list of available models from registry"""
-    # Get system resources
-    memory = psutil.virtual_memory()
-    available_ram_gb = memory.available / (1024**3)
-    has_gpu = torch.cuda.is_available()
-
-    # Get compatible models
-    compatible_models = model_registry.list_models(
-        compatible_with={'ram_gb': available_ram_gb, 'has_gpu': has_gpu}
-    )
-
+def _build_available_models() -> Dict[str, Any]:
+    resources = _cached_payload("resources", _build_resources)[0]
     return {
-        "available_models": compatible_models,
+        "available_models": resources["compatible_models"],
         "system_resources": {
-            "available_ram_gb": available_ram_gb,
-            "total_ram_gb": memory.total / (1024**3),
-            "has_gpu": has_gpu
+            "available_ram_gb": resources["available_ram_gb"],
+            "total_ram_gb": resources["total_ram_gb"],
+            "has_gpu": resources["has_gpu"]
         }
     }
 
-@app.get("/capabilities")
-async def get_capabilities():
-    """Get agent capabilities"""
-    memory = psutil.virtual_memory()
-    available_ram_gb = memory.available / (1024**3)
-    total_ram_gb = memory.total / (1024**3)
-    has_gpu = torch.cuda.is_available()
-
-    gpu_info = {}
-    if has_gpu:
-        try:
-            gpu_props = torch.cuda.get_device_properties(0)
-            gpu_info = {
-                "name": gpu_props.name,
-                "memory_gb": gpu_props.total_memory / (1024**3),
-                "compute_capability": f"{gpu_props.major}.{gpu_props.minor}"
-            }
-        except Exception as e:
-            gpu_info = {"error": str(e)}
-
-    # Get compatible models
-    compatible_models = model_registry.list_models(
-        compatible_with={'ram_gb': available_ram_gb, 'has_gpu': has_gpu}
-    )
-
+def _build_capabilities() -> Dict[str, Any]:
+    resources = _cached_payload("resources", _build_resources)[0]
     return {
         "agent_id": AGENT_ID,
         "compute_capabilities": {
-            "cpu_cores": psutil.cpu_count(),
-            "total_ram_gb": total_ram_gb,
-            "available_ram_gb": available_ram_gb,
-            "has_gpu": has_gpu,
-            "gpu_info": gpu_info
+            "cpu_cores": resources["cpu_cores"],
+            "total_ram_gb": resources["total_ram_gb"],
+            "available_ram_gb": resources["available_ram_gb"],
+            "has_gpu": resources["has_gpu"],
+            "gpu_info": resources["gpu_info"]
         },
-        "supported_models": compatible_models,
+        "supported_models": resources["compatible_models"],
         "supported_tasks": ["text-generation", "inference", "chat"],
-        "max_concurrent_tasks": 5,
+        "max_concurrent_tasks": MAX_CONCURRENT_TASKS,
         "features": ["auto_model_loading", "model_registry", "resource_management"]
     }
 
-def register_agent(agent_id: str, hub_url: str) -> bool:
+def get_capabilities_payload() -> Dict[str, Any]:
+    """Get agent capabilities as a dict, served from the payload cache"""
+    return _cached_payload("capabilities", _build_capabilities)[0]
+
+@app.post("/models/refresh_gpu")
+async def refresh_gpu():
+    """Re-probe GPU properties, e.g. after a device hotplug"""
+    global _HAS_GPU, _GPU_INFO
+    _HAS_GPU, _GPU_INFO = _probe_gpu()
+    _list_models_cached.cache_clear()
+    _payload_cache.clear()
+    return {"has_gpu": _HAS_GPU, "gpu_info": _GPU_INFO}
+
+@app.get("/models/available")
+async def get_available_models():
+    """Get list of available models from registry"""
+    return Response(
+        content=_cached_payload("available_models", _build_available_models)[1],
+        media_type="application/json"
+    )
+
+@app.get("/capabilities")
+async def get_capabilities():
+    """Get agent capabilities"""
+    return Response(
+        content=_cached_payload("capabilities", _build_capabilities)[1],
+        media_type="application/json"
+    )
+
+async def register_agent(agent_id: str, hub_url: str) -> bool:
     try:
-        # Get system capabilities
-        memory = psutil.virtual_memory()
-        available_ram_gb = memory.available / (1024**3)
-        total_ram_gb = memory.total / (1024**3)
-        has_gpu = torch.cuda.is_available()
-
-        gpu_info = {}
-        if has_gpu:
-            try:
-                gpu_props = torch.cuda.get_device_properties(0)
-                gpu_info = {
-                    "name": gpu_props.name,
-                    "memory_gb": gpu_props.total_memory / (1024**3),
-                    "compute_capability": f"{gpu_props.major}.{gpu_props.minor}"
-                }
-            except Exception:
-                gpu_info = {"available": True}
-
-        # Get compatible models
-        compatible_models = model_registry.list_models(
-            compatible_with={'ram_gb': available_ram_gb, 'has_gpu': has_gpu}
-        )
+        resources = _cached_payload("resources", _build_resources)[0]
+        compatible_models = resources["compatible_models"]
 
         registration_data = {
             "id": agent_id,
             "host": AGENT_HOST,
             "port": AGENT_PORT,
+            "grpc_port": AGENT_GRPC_PORT if GRPC_AVAILABLE else None,
             "capabilities": {
                 "inference": True,
                 "text_generation": True,
@@ -245,21 +565,24 @@ def register_agent(agent_id: str, hub_url: str) -> bool:
                 "model_registry": True
             },
             "compute_resources": {
-                "cpu_cores": psutil.cpu_count(),
-                "total_ram_gb": total_ram_gb,
-                "available_ram_gb": available_ram_gb,
-                "has_gpu": has_gpu,
-                "gpu_info": gpu_info
+                "cpu_cores": resources["cpu_cores"],
+                "total_ram_gb": resources["total_ram_gb"],
+                "available_ram_gb": resources["available_ram_gb"],
+                "has_gpu": resources["has_gpu"],
+                "gpu_info": resources["gpu_info"]
             },
             "supported_models": compatible_models,
-            "max_concurrent_tasks": 5,
+            "max_concurrent_tasks": MAX_CONCURRENT_TASKS,
             "features": ["auto_model_loading", "model_registry", "resource_management", "streaming"]
         }
 
-        response = requests.post(
+        response = await HUB_CLIENT.post(
             f"{hub_url}/nodes/register",
-            json=registration_data,
-            timeout=10
+            content=orjson.dumps(
+                registration_data,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            ),
+            headers={"content-type": "application/json"}
         )
 
         if response.status_code == 200:
@@ -273,11 +596,11 @@ def register_agent(agent_id: str, hub_url: str) -> bool:
         logger.error(f"Registration error: {e}")
         return False
 
-def heartbeat(agent_id: str, hub_url: str) -> bool:
+async def heartbeat(agent_id: str, hub_url: str) -> bool:
     try:
-        response = requests.post(
+        response = await HUB_CLIENT.post(
             f"{hub_url}/nodes/{agent_id}/heartbeat",
-            json={"timestamp": datetime.now().isoformat()},
+            json={"timestamp": _cached_timestamp()},
             timeout=5
         )
         return response.status_code == 200
@@ -286,43 +609,61 @@ def heartbeat(agent_id: str, hub_url: str) -> bool:
         logger.debug(f"Heartbeat failed: {e}")
         return False
 
-def run_inference():
-    # Placeholder for inference logic
-    pass
+async def _heartbeat_producer(queue: asyncio.Queue):
+    """Enqueue a heartbeat tick every HEARTBEAT_INTERVAL, dropping ticks while one is pending"""
+    while True:
+        try:
+            queue.put_nowait(time.time())
+        except asyncio.QueueFull:
+            logger.debug("Previous heartbeat still pending, skipping tick")
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
 
-def main_loop():
-    logger.info(f"Starting ExoStack Agent {AGENT_ID}")
-    
-    # Register with hub
-    if not register_agent(AGENT_ID, HUB_URL):
-        logger.error("Failed to register with hub, exiting...")
-        return
-    
+async def _heartbeat_worker(queue: asyncio.Queue):
+    """Drain heartbeat ticks and send them to the hub, re-registering after repeated failures"""
     consecutive_failures = 0
     max_consecutive_failures = 5
-    
+
     while True:
+        await queue.get()
         try:
             logger.debug("Sending heartbeat...")
-            if heartbeat(AGENT_ID, HUB_URL):
+            if await heartbeat(AGENT_ID, HUB_URL):
                 consecutive_failures = 0
             else:
                 consecutive_failures += 1
                 if consecutive_failures >= max_consecutive_failures:
                     logger.error(f"{consecutive_failures} consecutive heartbeat failures, re-registering...")
-                    register_agent(AGENT_ID, HUB_URL)
+                    await register_agent(AGENT_ID, HUB_URL)
                     consecutive_failures = 0
-            
-            logger.debug("Running inference...")
-            run_inference()
-            
-        except KeyboardInterrupt:
-            logger.info("Received shutdown signal, exiting gracefully...")
-            break
         except Exception as e:
-            logger.error(f"Unexpected error in main loop: {e}")
-            
-        time.sleep(10)
+            logger.error(f"Unexpected error in heartbeat worker: {e}")
+        finally:
+            queue.task_done()
+
+async def main_loop():
+    logger.info(f"Starting ExoStack Agent {AGENT_ID}")
+    
+    # Register with hub
+    if not await register_agent(AGENT_ID, HUB_URL):
+        logger.error("Failed to register with hub, exiting...")
+        return
+    
+    heartbeat_queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+    tasks = [
+        asyncio.create_task(_heartbeat_producer(heartbeat_queue)),
+        asyncio.create_task(_heartbeat_worker(heartbeat_queue))
+    ]
+
+    try:
+        await asyncio.gather(*tasks)
+    except asyncio.CancelledError:
+        logger.info("Received shutdown signal, exiting gracefully...")
+    finally:
+        for task in tasks:
+            task.cancel()
 
 if __name__ == "__main__":
-    main_loop()
\ No newline at end of file
+    try:
+        asyncio.run(main_loop())
+    except KeyboardInterrupt:
+        logger.info("Received shutdown signal, exiting gracefully...")
\ No newline at end of file
@@ -22,9 +22,16 @@ BASE_DIR = Path(__file__).parent.parent
 CACHE_DIR = BASE_DIR / "cache"
 LOG_DIR = BASE_DIR / "logs"
 
-# Ensure directories exist
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
-LOG_DIR.mkdir(parents=True, exist_ok=True)
+_dirs_ready = False
+
+def ensure_dirs() -> None:
+    """Create the cache and log directories on first use"""
+    global _dirs_ready
+    if _dirs_ready:
+        return
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    _dirs_ready = True
 
 # Health monitoring configuration
 HEALTH_MONITOR_CONFIG = {
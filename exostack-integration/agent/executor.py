@@ -1,33 +1,110 @@
 """
 Enhanced Model Executor with distributed execution support and registry integration
 """
-import os
 import time
 import logging
 import json
 import torch
 import psutil
 import asyncio
-from typing import Dict, Any, Optional, List, Tuple, AsyncGenerator
-from datetime import datetime
+import queue
+import functools
+import importlib.util
+import threading
+from typing import Dict, Any, Callable, Optional, List, Tuple, AsyncGenerator
 from pathlib import Path
 from transformers import (
     AutoTokenizer,
     AutoModelForCausalLM,
+    BitsAndBytesConfig,
     GenerationConfig,
     pipeline,
-    TextIteratorStreamer
+    TextStreamer
 )
-from threading import Thread
+from concurrent.futures import ThreadPoolExecutor
 from shared.config.env import (
     DEFAULT_MODEL,
     MODEL_CACHE_DIR,
     MAX_MODEL_MEMORY
 )
-from .model_manager import model_manager
+from .model_manager import model_manager, compile_for_inference
 
 logger = logging.getLogger(__name__)
 
+try:
+    from transformers import StaticCache
+    STATIC_CACHE_AVAILABLE = True
+except ImportError:
+    StaticCache = None
+    STATIC_CACHE_AVAILABLE = False
+    logger.warning("transformers StaticCache not available (requires >= 4.38), using dynamic KV cache")
+
+# flash-attn is optional; probe for it without importing its CUDA extension
+FLASH_ATTN_AVAILABLE = importlib.util.find_spec("flash_attn") is not None
+
+# Padded prompt lengths for sharded execution; static shapes keep compiled graphs reusable
+INPUT_BUCKETS = (64, 128, 256, 512, 1024, 2048)
+
+# Generation headroom reserved in each shard's preallocated static KV cache
+STATIC_CACHE_MAX_NEW_TOKENS = 512
+
+# Streamed text is flushed every STREAM_CHUNK_TOKENS tokens or STREAM_FLUSH_INTERVAL seconds
+STREAM_CHUNK_TOKENS = 8
+STREAM_FLUSH_INTERVAL = 0.05
+
+# Decodes shorter than this run inline; the worker-thread hop costs more than the work
+INLINE_DECODE_MAX_TOKENS = 2048
+
+# Streaming generates are serialized onto one long-lived thread; a single CUDA
+# context can't usefully run two generates at once
+GENERATION_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="generate")
+
+@functools.lru_cache(maxsize=64)
+def get_generation_config(
+    max_new_tokens: int,
+    temperature: float,
+    top_p: float,
+    do_sample: bool,
+    pad_token_id: Optional[int],
+    eos_token_id: Optional[int],
+    repetition_penalty: float = 1.0
+) -> GenerationConfig:
+    """Build (and memoize) a GenerationConfig; callers must treat it as read-only"""
+    return GenerationConfig(
+        max_new_tokens=max_new_tokens,
+        temperature=temperature,
+        top_p=top_p,
+        do_sample=do_sample,
+        pad_token_id=pad_token_id,
+        eos_token_id=eos_token_id,
+        repetition_penalty=repetition_penalty,
+        # Callers only read the token ids; never keep per-step logits on device
+        output_scores=False,
+        return_dict_in_generate=False
+    )
+
+def generate_inference_mode(model: Any, *args, **kwargs) -> Any:
+    """Call model.generate under inference_mode on the calling (worker) thread.
+
+    Autograd mode is thread-local, so the context must be entered where generate runs.
+    """
+    with torch.inference_mode():
+        return model.generate(*args, **kwargs)
+
+class AsyncTextStreamer(TextStreamer):
+    """Streamer that hands decoded text to an asyncio.Queue from the generation thread"""
+
+    def __init__(self, tokenizer: Any, loop: asyncio.AbstractEventLoop, **decode_kwargs):
+        super().__init__(tokenizer, skip_prompt=True, **decode_kwargs)
+        self.loop = loop
+        self.queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+
+    def on_finalized_text(self, text: str, stream_end: bool = False) -> None:
+        if text:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, text)
+        if stream_end:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, None)
+
 class InferenceEngine:
     """Enhanced inference engine with automatic model loading and registry integration"""
 
@@ -35,38 +112,45 @@ class InferenceEngine:
         self.model_manager = model_manager
         logger.info("Initialized InferenceEngine with model registry support")
 
+    async def _prepare_model(self, task_data: Dict[str, Any]) -> str:
+        """Resolve the task's model, auto-selecting and auto-loading it as needed"""
+        model_id = task_data.get("model", "auto")
+
+        # Auto-select model if not specified
+        if model_id == "auto":
+            task_type = task_data.get("task_type", "text-generation")
+            model_id = self.model_manager.get_recommended_model(task_type)
+            if not model_id:
+                raise ValueError("No suitable model found for current resources")
+            logger.info(f"Auto-selected model: {model_id}")
+
+        # Auto-load model if not already loaded
+        if not await self.model_manager.auto_load_model(model_id, task_data):
+            raise ValueError(f"Failed to load model {model_id}")
+
+        return model_id
+
+    def _get_model_tokenizer(self, model_id: str) -> Tuple[Any, Any]:
+        model_tokenizer = self.model_manager.get_model_for_inference(model_id)
+        if not model_tokenizer:
+            raise ValueError(f"Model {model_id} not available for inference")
+        return model_tokenizer
+
     async def process_task(self, task_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process an inference task with automatic model loading"""
         try:
             task_id = task_data.get("id", "unknown")
-            model_id = task_data.get("model", "auto")
             input_text = task_data.get("input", "")
             parameters = task_data.get("parameters", {})
 
-            logger.info(f"Processing task {task_id} with model {model_id}")
-
-            # Auto-select model if not specified
-            if model_id == "auto":
-                task_type = task_data.get("task_type", "text-generation")
-                model_id = self.model_manager.get_recommended_model(task_type)
-                if not model_id:
-                    raise ValueError("No suitable model found for current resources")
-                logger.info(f"Auto-selected model: {model_id}")
-
-            # Auto-load model if not already loaded
-            if not await self.model_manager.auto_load_model(model_id, task_data):
-                raise ValueError(f"Failed to load model {model_id}")
-
-            # Get model and tokenizer for inference
-            model_tokenizer = self.model_manager.get_model_for_inference(model_id)
-            if not model_tokenizer:
-                raise ValueError(f"Model {model_id} not available for inference")
+            logger.info(f"Processing task {task_id} with model {task_data.get('model', 'auto')}")
 
-            model, tokenizer = model_tokenizer
+            model_id = await self._prepare_model(task_data)
+            model, tokenizer = self._get_model_tokenizer(model_id)
 
             # Perform inference
             result = await self._run_inference(
-                model, tokenizer, input_text, parameters
+                model_id, model, tokenizer, input_text, parameters
             )
 
             return {
@@ -84,8 +168,117 @@ class InferenceEngine:
                 "status": "failed"
             }
 
+    async def process_tasks_batch(self, tasks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Process a batch of inference tasks, returning results in submission order.
+
+        Tasks sharing a model and sampling parameters run as one left-padded generate call.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(tasks)
+        groups: Dict[Tuple, List[int]] = {}
+
+        for index, task_data in enumerate(tasks):
+            try:
+                model_id = await self._prepare_model(task_data)
+                parameters = task_data.get("parameters", {})
+                key = (
+                    model_id,
+                    parameters.get("max_new_tokens", 100),
+                    parameters.get("temperature", 0.7),
+                    parameters.get("top_p", 0.9),
+                    parameters.get("do_sample", True)
+                )
+                groups.setdefault(key, []).append(index)
+            except Exception as e:
+                logger.error(f"Task processing failed: {e}")
+                results[index] = {
+                    "task_id": task_data.get("id", "unknown"),
+                    "error": str(e),
+                    "status": "failed"
+                }
+
+        for key, indices in groups.items():
+            model_id = key[0]
+            try:
+                model, tokenizer = self._get_model_tokenizer(model_id)
+                outputs = await self._run_batch_inference(
+                    model_id,
+                    model,
+                    tokenizer,
+                    [tasks[index].get("input", "") for index in indices],
+                    tasks[indices[0]].get("parameters", {})
+                )
+                for index, output in zip(indices, outputs):
+                    results[index] = {
+                        "task_id": tasks[index].get("id", "unknown"),
+                        "model_used": model_id,
+                        "result": output,
+                        "status": "completed"
+                    }
+            except Exception as e:
+                logger.error(f"Batch inference failed for model {model_id}: {e}")
+                for index in indices:
+                    results[index] = {
+                        "task_id": tasks[index].get("id", "unknown"),
+                        "error": str(e),
+                        "status": "failed"
+                    }
+
+        return results
+
+    async def _decode(self, decode: Callable[..., Any], model_id: str, token_ids: Any, num_tokens: int) -> Any:
+        """Decode inline when short and a pooled tokenizer is free, else in a worker thread"""
+        if num_tokens < INLINE_DECODE_MAX_TOKENS:
+            try:
+                return decode(model_id, token_ids, block=False)
+            except queue.Empty:
+                pass
+        return await asyncio.to_thread(decode, model_id, token_ids)
+
+    async def _run_batch_inference(
+        self,
+        model_id: str,
+        model: Any,
+        tokenizer: Any,
+        input_texts: List[str],
+        parameters: Dict[str, Any]
+    ) -> List[str]:
+        """Run one padded generate over several prompts and split the outputs per prompt"""
+        generation_config = get_generation_config(
+            max_new_tokens=parameters.get("max_new_tokens", 100),
+            temperature=parameters.get("temperature", 0.7),
+            top_p=parameters.get("top_p", 0.9),
+            do_sample=parameters.get("do_sample", True),
+            pad_token_id=tokenizer.pad_token_id,
+            eos_token_id=tokenizer.eos_token_id
+        )
+
+        # Tokenize all prompts together; the tokenizer pads on the left for generation
+        inputs = await asyncio.to_thread(
+            self.model_manager.encode_batch,
+            model_id,
+            input_texts
+        )
+
+        if hasattr(model, 'device'):
+            inputs = inputs.to(model.device)
+
+        outputs = await asyncio.to_thread(
+            generate_inference_mode,
+            model,
+            **inputs,
+            generation_config=generation_config
+        )
+
+        new_tokens = outputs[:, inputs["input_ids"].shape[1]:]
+        responses = await self._decode(
+            self.model_manager.decode_batch, model_id, new_tokens, new_tokens.numel()
+        )
+
+        return [response.strip() for response in responses]
+
     async def _run_inference(
         self,
+        model_id: str,
         model: Any,
         tokenizer: Any,
         input_text: str,
@@ -94,7 +287,7 @@ class InferenceEngine:
         """Run inference with the loaded model"""
         try:
             # Prepare generation parameters
-            generation_config = GenerationConfig(
+            generation_config = get_generation_config(
                 max_new_tokens=parameters.get("max_new_tokens", 100),
                 temperature=parameters.get("temperature", 0.7),
                 top_p=parameters.get("top_p", 0.9),
@@ -103,11 +296,11 @@ class InferenceEngine:
                 eos_token_id=tokenizer.eos_token_id
             )
 
-            # Tokenize input
+            # Tokenize input on a pooled tokenizer so concurrent tasks don't contend
             inputs = await asyncio.to_thread(
-                tokenizer.encode,
-                input_text,
-                return_tensors="pt"
+                self.model_manager.encode,
+                model_id,
+                input_text
             )
 
             # Move to appropriate device
@@ -115,18 +308,17 @@ class InferenceEngine:
                 inputs = inputs.to(model.device)
 
             # Generate response
-            with torch.no_grad():
-                outputs = await asyncio.to_thread(
-                    model.generate,
-                    inputs,
-                    generation_config=generation_config
-                )
+            outputs = await asyncio.to_thread(
+                generate_inference_mode,
+                model,
+                inputs,
+                generation_config=generation_config
+            )
 
             # Decode response
-            response = await asyncio.to_thread(
-                tokenizer.decode,
-                outputs[0][inputs.shape[1]:],
-                skip_special_tokens=True
+            new_tokens = outputs[0][inputs.shape[1]:]
+            response = await self._decode(
+                self.model_manager.decode, model_id, new_tokens, len(new_tokens)
             )
 
             return response.strip()
@@ -152,27 +344,225 @@ class InferenceEngine:
         """Unload a specific model"""
         return await self.model_manager.unload_model(model_id)
 
+    async def stream_generate(self, task_data: Dict[str, Any]) -> AsyncGenerator[Dict[str, Any], None]:
+        """Stream generation tokens in real-time"""
+        try:
+            task_id = task_data.get("id", "unknown")
+            model_id = task_data.get("model", "auto")
+            input_text = task_data.get("input", "")
+            parameters = task_data.get("parameters", {})
+
+            logger.info(f"Starting streaming generation for task {task_id}")
+
+            # Auto-select model if not specified
+            if model_id == "auto":
+                task_type = task_data.get("task_type", "text-generation")
+                model_id = self.model_manager.get_recommended_model(task_type)
+                if not model_id:
+                    yield {
+                        "error": "No suitable model available",
+                        "task_id": task_id,
+                        "status": "failed"
+                    }
+                    return
+
+            # Load model if needed
+            success = await self.model_manager.auto_load_model(model_id, task_data)
+            if not success:
+                yield {
+                    "error": f"Failed to load model {model_id}",
+                    "task_id": task_id,
+                    "status": "failed"
+                }
+                return
+
+            # Get loaded model and tokenizer
+            model_tokenizer = self.model_manager.get_model_for_inference(model_id)
+            if not model_tokenizer:
+                yield {
+                    "error": f"Model {model_id} not available after loading",
+                    "task_id": task_id,
+                    "status": "failed"
+                }
+                return
+
+            model, tokenizer = model_tokenizer
+
+            # Prepare generation parameters
+            generation_params = {
+                "max_new_tokens": parameters.get("max_tokens", 100),
+                "temperature": parameters.get("temperature", 0.7),
+                "top_p": parameters.get("top_p", 0.9),
+                "do_sample": parameters.get("temperature", 0.7) > 0,
+                "pad_token_id": tokenizer.eos_token_id,
+            }
+
+            # Borrow one pooled tokenizer for the whole stream; the streamer
+            # decodes on the generation thread until generate returns
+            loop = asyncio.get_running_loop()
+            tokenizer_pool = self.model_manager.tokenizer_pool(model_id)
+            stream_tokenizer = await asyncio.to_thread(tokenizer_pool.get)
+            try:
+                streamer = AsyncTextStreamer(stream_tokenizer, loop, skip_special_tokens=True)
+                generation_params["streamer"] = streamer
+
+                # Tokenize input
+                inputs = stream_tokenizer(input_text, return_tensors="pt")
+                if getattr(model, 'device', None) is not None and model.device.type == "cuda":
+                    # Overlap the input_ids/attention_mask copies; generate's kernels are
+                    # queued behind them on the same stream, so no explicit sync is needed
+                    inputs = {
+                        k: v.pin_memory().to(model.device, non_blocking=True)
+                        for k, v in inputs.items()
+                    }
+
+                # Run generation on the shared generation thread
+                generation_kwargs = {**inputs, **generation_params}
+                generation = loop.run_in_executor(
+                    GENERATION_EXECUTOR,
+                    functools.partial(generate_inference_mode, model, **generation_kwargs)
+                )
+            except BaseException:
+                tokenizer_pool.put(stream_tokenizer)
+                raise
+            # Return the tokenizer only once generate is done, even if the client left
+            generation.add_done_callback(lambda _: tokenizer_pool.put(stream_tokenizer))
+            # Unblock the consumer if generate fails before the streamer ends
+            generation.add_done_callback(lambda _: streamer.queue.put_nowait(None))
+
+            # Yield initial status
+            yield {
+                "task_id": task_id,
+                "status": "streaming",
+                "model": model_id,
+                "timestamp": time.time()
+            }
+
+            # Stream tokens, coalesced into chunks of several tokens
+            generated_text = ""
+            token_count = 0
+            buffer_text = ""
+            buffer_tokens = 0
+            last_flush = time.monotonic()
+
+            try:
+                while True:
+                    if buffer_tokens:
+                        # Wait only until the current chunk is due
+                        timeout = max(0.0, STREAM_FLUSH_INTERVAL - (time.monotonic() - last_flush))
+                        try:
+                            new_text = await asyncio.wait_for(streamer.queue.get(), timeout)
+                        except asyncio.TimeoutError:
+                            new_text = ""
+                    else:
+                        new_text = await streamer.queue.get()
+
+                    if new_text:
+                        generated_text += new_text
+                        buffer_text += new_text
+                        token_count += 1
+                        buffer_tokens += 1
+
+                    finished = new_text is None
+                    if buffer_tokens and (
+                        finished or
+                        buffer_tokens >= STREAM_CHUNK_TOKENS or
+                        time.monotonic() - last_flush >= STREAM_FLUSH_INTERVAL
+                    ):
+                        yield {
+                            "task_id": task_id,
+                            "status": "streaming",
+                            "token": buffer_text,
+                            "partial_text": generated_text,
+                            "token_count": token_count,
+                            "timestamp": time.time()
+                        }
+                        buffer_text = ""
+                        buffer_tokens = 0
+                        last_flush = time.monotonic()
+
+                    if finished:
+                        break
+
+            except Exception as stream_error:
+                logger.error(f"Streaming error: {stream_error}")
+                yield {
+                    "task_id": task_id,
+                    "status": "error",
+                    "error": str(stream_error),
+                    "timestamp": time.time()
+                }
+                return
+
+            # Wait for generation to complete and surface its errors
+            await generation
+
+            # Final result
+            yield {
+                "task_id": task_id,
+                "status": "completed",
+                "result": {
+                    "output": generated_text,
+                    "tokens_generated": token_count,
+                    "model_used": model_id,
+                    "processing_time": None  # Could add timing if needed
+                },
+                "timestamp": time.time()
+            }
+
+            logger.info(f"Completed streaming generation for task {task_id}")
+
+        except Exception as e:
+            logger.error(f"Error in streaming generation: {e}")
+            yield {
+                "task_id": task_data.get("id", "unknown"),
+                "status": "failed",
+                "error": str(e),
+                "timestamp": time.time()
+            }
+
 class ShardedModelExecutor:
     """Executor for model shards with resource management"""
     
     def __init__(self, shard_config: Dict[str, Any]):
         self.shard_id = shard_config["shard_id"]
         self.model_name = shard_config["model_name"]
-        self.device = self._get_optimal_device()
+        self.device, self.dtype = self._get_optimal_device()
         self.cache_dir = Path(MODEL_CACHE_DIR) / self.shard_id
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Compiled Inductor graphs go to the process-wide cache ModelManager sets up
+        # under MODEL_CACHE_DIR/inductor, shared by every shard, so reloads skip recompiling
         
         self.model = None
         self.tokenizer = None
         self.memory_usage = 0
         self.gpu_memory_usage = 0
+
+        # Reusable left-padded input and attention-mask buffers, one per length bucket
+        self._input_pool = {
+            bucket: torch.empty((1, bucket), dtype=torch.long, device=self.device)
+            for bucket in INPUT_BUCKETS
+        }
+        self._mask_pool = {
+            bucket: torch.empty((1, bucket), dtype=torch.long, device=self.device)
+            for bucket in INPUT_BUCKETS
+        }
+        self._generate_lock = threading.Lock()
+        self._static_cache = None
+
+        # Memory telemetry sampled in the background; the hot path only reads it
+        self._mem_snapshot: Dict[str, float] = {}
+        self._mem_sampler_task: Optional[asyncio.Task] = None
         
-        logger.info(f"Initialized shard executor {self.shard_id} on {self.device}")
+        logger.info(f"Initialized shard executor {self.shard_id} on {self.device} ({self.dtype})")
 
     async def load_shard(self) -> None:
-        """Load model shard with resource management"""
+        """Load model shard with resource management.
+
+        Shards loaded with NF4 quantization are inference-only and must not be fine-tuned.
+        """
         try:
-            memory_info = self._check_memory_usage()
+            memory_info = self._measure_memory_now()
             logger.debug(f"Memory before loading shard: {memory_info}")
 
             # Load tokenizer
@@ -190,32 +580,59 @@ class ShardedModelExecutor:
             model_kwargs = {
                 "cache_dir": self.cache_dir,
                 "trust_remote_code": True,
-                "torch_dtype": (
-                    torch.float16 if self.device != "cpu" else torch.float32
-                )
+                "torch_dtype": self.dtype,
+                # Stream (memory-mapped) weights straight onto the shard's device
+                # instead of materializing a full CPU copy first
+                "low_cpu_mem_usage": True,
+                "device_map": {"": self.device}
             }
 
-            # Load model with appropriate optimization
-            if self.device == "cpu" or memory_info.get("cpu_available_gb", 0) < 8:
-                try:
-                    model_kwargs["load_in_8bit"] = True
-                    logger.info("Loading shard with 8-bit quantization")
-                except Exception as e:
-                    logger.warning(f"8-bit loading failed, using default: {e}")
-
-            self.model = await asyncio.to_thread(
-                AutoModelForCausalLM.from_pretrained,
-                self.model_name,
-                **model_kwargs
+            # Quantize to NF4 on memory-constrained GPU hosts; bitsandbytes 4-bit requires CUDA
+            quantized = (
+                self.device.startswith("cuda") and
+                memory_info.get("cpu_available_gb", 0) < 8
             )
+            if quantized:
+                model_kwargs["quantization_config"] = BitsAndBytesConfig(
+                    load_in_4bit=True,
+                    bnb_4bit_quant_type="nf4",
+                    bnb_4bit_compute_dtype=self.dtype,
+                    bnb_4bit_use_double_quant=True
+                )
+                logger.info("Loading shard with NF4 4-bit quantization")
 
-            if not model_kwargs.get("load_in_8bit", False):
-                self.model = self.model.to(self.device)
+            # Use fused attention kernels that never materialize the attention matrix
+            model_kwargs["attn_implementation"] = self._get_attn_implementation()
+
+            try:
+                self.model = await asyncio.to_thread(
+                    AutoModelForCausalLM.from_pretrained,
+                    self.model_name,
+                    **model_kwargs
+                )
+            except (ImportError, TypeError, ValueError) as e:
+                # Older transformers or architectures without FlashAttention-2/SDPA support
+                logger.warning(
+                    f"attn_implementation={model_kwargs['attn_implementation']} "
+                    f"unavailable for shard {self.shard_id}, using default attention: {e}"
+                )
+                del model_kwargs["attn_implementation"]
+                self.model = await asyncio.to_thread(
+                    AutoModelForCausalLM.from_pretrained,
+                    self.model_name,
+                    **model_kwargs
+                )
 
             self.model.eval()
+            self._static_cache = self._allocate_static_cache()
+            self.model = compile_for_inference(self.model, dynamic=False)
+            await self._warmup()
 
             # Update memory usage
-            memory_after = self._check_memory_usage()
+            memory_after = self._measure_memory_now()
+            self._mem_snapshot = memory_after
+            if self._mem_sampler_task is None:
+                self._mem_sampler_task = asyncio.create_task(self._mem_sampler())
             self.memory_usage = (
                 memory_after.get("cpu_used_gb", 0) -
                 memory_info.get("cpu_used_gb", 0)
@@ -232,6 +649,31 @@ class ShardedModelExecutor:
             logger.error(f"Error loading shard {self.shard_id}: {e}")
             raise
 
+    async def _warmup(self) -> None:
+        """Compile and cache the decode graph for every input bucket.
+
+        Each warmup goes through _generate_ids, so it takes the same left-padded,
+        static-cache path as real requests.
+        """
+        gen_config = get_generation_config(
+            max_new_tokens=4,
+            temperature=1.0,
+            top_p=1.0,
+            do_sample=False,
+            pad_token_id=self.tokenizer.eos_token_id,
+            eos_token_id=self.tokenizer.eos_token_id
+        )
+        previous = 0
+        for bucket in INPUT_BUCKETS:
+            # A prompt just past the previous bucket lands in this one with padding
+            dummy_ids = torch.full((1, previous + 1), self.tokenizer.eos_token_id, dtype=torch.long)
+            previous = bucket
+            try:
+                await asyncio.to_thread(self._generate_ids, dummy_ids, gen_config)
+            except Exception as e:
+                logger.warning(f"Warmup failed for shard {self.shard_id} at bucket {bucket}: {e}")
+                return
+
     async def execute(
         self,
         input_data: Dict[str, Any]
@@ -244,16 +686,8 @@ class ShardedModelExecutor:
             input_text = input_data.get("input_segment", "")
             generation_config = input_data.get("parameters", {})
             
-            # Tokenize input
-            inputs = await asyncio.to_thread(
-                self.tokenizer.encode,
-                input_text,
-                return_tensors="pt"
-            )
-            inputs = inputs.to(self.device)
-            
             # Configure generation
-            gen_config = GenerationConfig(
+            gen_config = get_generation_config(
                 max_new_tokens=generation_config.get("max_tokens", 100),
                 temperature=generation_config.get("temperature", 0.7),
                 top_p=generation_config.get("top_p", 0.9),
@@ -263,22 +697,11 @@ class ShardedModelExecutor:
                 repetition_penalty=1.1
             )
 
-            # Generate output
-            with torch.no_grad():
-                outputs = await asyncio.to_thread(
-                    self.model.generate,
-                    inputs,
-                    generation_config=gen_config,
-                    return_dict_in_generate=True,
-                    output_scores=True
-                )
-
-            # Process output
-            generated_tokens = outputs.sequences[0][inputs.shape[1]:]
-            response_text = await asyncio.to_thread(
-                self.tokenizer.decode,
-                generated_tokens,
-                skip_special_tokens=True
+            # Tokenize, generate and decode in a single worker-thread round trip
+            response_text, output_tokens = await asyncio.to_thread(
+                self._generate_text,
+                input_text,
+                gen_config
             )
 
             # Collect execution metrics
@@ -289,7 +712,7 @@ class ShardedModelExecutor:
                 "shard_id": self.shard_id,
                 "position": input_data.get("position", 0),
                 "output": response_text.strip(),
-                "output_tokens": len(generated_tokens),
+                "output_tokens": output_tokens,
                 "execution_time": execution_time,
                 "memory_used": current_memory.get("cpu_used_gb", 0),
                 "gpu_memory_used": current_memory.get("gpu_allocated_gb", 0)
@@ -299,27 +722,116 @@ class ShardedModelExecutor:
             logger.error(f"Error executing shard {self.shard_id}: {e}")
             raise
 
-    def _get_optimal_device(self) -> str:
-        """Determine optimal device for the shard"""
+    def _generate_text(
+        self,
+        input_text: str,
+        gen_config: GenerationConfig
+    ) -> Tuple[str, int]:
+        """Blocking tokenize -> generate -> decode pipeline with one device-to-host copy"""
+        input_ids = self.tokenizer(input_text, return_tensors="pt").input_ids
+        new_ids = self._generate_ids(input_ids, gen_config)
+        response_text = self.tokenizer.decode(new_ids, skip_special_tokens=True)
+        return response_text.strip(), len(new_ids)
+
+    def _generate_ids(self, input_ids: torch.Tensor, gen_config: GenerationConfig) -> List[int]:
+        """Generate from host-side input_ids, left-padded into the matching bucket"""
+        if self.device.startswith("cuda"):
+            input_ids = input_ids.pin_memory()
+
+        length = input_ids.shape[1]
+        bucket = next((b for b in INPUT_BUCKETS if b >= length), None)
+
+        with self._generate_lock:
+            if bucket is None:
+                # Longer than the largest bucket: generate on the exact shape
+                input_ids = input_ids.to(self.device, non_blocking=True)
+                attention_mask = torch.ones_like(input_ids)
+            else:
+                # Left-pad into the pooled buffers for this bucket
+                pad = bucket - length
+                input_ids_buffer = self._input_pool[bucket]
+                attention_mask = self._mask_pool[bucket]
+                input_ids_buffer[:, :pad].fill_(self.tokenizer.pad_token_id)
+                input_ids_buffer[:, pad:].copy_(input_ids, non_blocking=True)
+                attention_mask[:, :pad].zero_()
+                attention_mask[:, pad:].fill_(1)
+                input_ids = input_ids_buffer
+
+            generate_kwargs = {}
+            if (
+                self._static_cache is not None and
+                bucket is not None and
+                gen_config.max_new_tokens <= STATIC_CACHE_MAX_NEW_TOKENS
+            ):
+                # Reuse the preallocated cache so KV tensors keep stable addresses and shapes
+                self._static_cache.reset()
+                generate_kwargs["past_key_values"] = self._static_cache
+
+            outputs = generate_inference_mode(
+                self.model,
+                input_ids=input_ids,
+                attention_mask=attention_mask,
+                generation_config=gen_config,
+                **generate_kwargs
+            )
+
+            # Slice on device, then sync once when copying the new tokens to the host
+            return outputs[0, input_ids.shape[1]:].tolist()
+
+    def _get_optimal_device(self) -> Tuple[str, torch.dtype]:
+        """Determine optimal device and weight dtype for the shard"""
         if torch.cuda.is_available():
             gpu_memory = (
                 torch.cuda.get_device_properties(0).total_memory / 1024**3
             )  # GB
             logger.info(f"GPU available with {gpu_memory:.1f}GB memory")
-            return "cuda:0"
+
+            # TF32 matmul precision is set process-wide once, in ModelManager.__init__
+            # BF16 keeps FP32's exponent range and runs natively on SM80+ (Ampere and newer)
+            if torch.cuda.get_device_capability(0)[0] >= 8:
+                return "cuda:0", torch.bfloat16
+            return "cuda:0", torch.float16
         elif hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
             logger.info("Using Apple MPS backend")
-            return "mps"
+            return "mps", torch.float16
         else:
             logger.info("Using CPU for inference")
-            return "cpu"
+            return "cpu", torch.float32
 
-    def _check_memory_usage(self) -> Dict[str, float]:
-        """Check current memory usage"""
+    def _allocate_static_cache(self) -> Optional[Any]:
+        """Preallocate a fixed-size KV cache covering the largest bucket plus generation headroom"""
+        if not STATIC_CACHE_AVAILABLE:
+            return None
+
+        try:
+            return StaticCache(
+                config=self.model.config,
+                max_batch_size=1,
+                max_cache_len=INPUT_BUCKETS[-1] + STATIC_CACHE_MAX_NEW_TOKENS,
+                device=self.model.device,
+                dtype=self.dtype
+            )
+        except Exception as e:
+            logger.warning(f"Static KV cache unavailable for shard {self.shard_id}: {e}")
+            return None
+
+    def _get_attn_implementation(self) -> str:
+        """FlashAttention-2 on SM80+ GPUs with flash-attn installed, SDPA otherwise"""
+        if (
+            FLASH_ATTN_AVAILABLE and
+            self.device.startswith("cuda") and
+            torch.cuda.get_device_capability(0)[0] >= 8
+        ):
+            return "flash_attention_2"
+        return "sdpa"
+
+    def _measure_memory_now(self) -> Dict[str, float]:
+        """Query current memory usage from the OS and the CUDA runtime"""
+        virtual_memory = psutil.virtual_memory()
         memory_info = {
-            "cpu_percent": psutil.virtual_memory().percent,
-            "cpu_available_gb": psutil.virtual_memory().available / 1024**3,
-            "cpu_used_gb": psutil.virtual_memory().used / 1024**3
+            "cpu_percent": virtual_memory.percent,
+            "cpu_available_gb": virtual_memory.available / 1024**3,
+            "cpu_used_gb": virtual_memory.used / 1024**3
         }
         
         if torch.cuda.is_available():
@@ -330,161 +842,45 @@ class ShardedModelExecutor:
         
         return memory_info
 
+    def _check_memory_usage(self) -> Dict[str, float]:
+        """Return the latest sampled memory usage"""
+        if not self._mem_snapshot:
+            self._mem_snapshot = self._measure_memory_now()
+        return self._mem_snapshot.copy()
+
+    async def _mem_sampler(self, interval: float = 1.0) -> None:
+        """Refresh the memory snapshot off the request path"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self._mem_snapshot = self._measure_memory_now()
+            except Exception as e:
+                logger.debug(f"Memory sampling failed for shard {self.shard_id}: {e}")
+
     async def cleanup(self):
         """Clean up shard resources"""
         try:
+            if self._mem_sampler_task is not None:
+                self._mem_sampler_task.cancel()
+                self._mem_sampler_task = None
+
+            self._static_cache = None
+
             if self.model is not None:
-                del self.model
-            if self.tokenizer is not None:
-                del self.tokenizer
-            
+                # The compiled forward is an instance attribute holding a bound method of
+                # the model; drop it so refcounting alone frees the weights without a GC pass
+                self.model.__dict__.pop("forward", None)
+            self.model = None
+            self.tokenizer = None
+
             if torch.cuda.is_available():
+                torch.cuda.synchronize()
                 torch.cuda.empty_cache()
-            
-            import gc
-            gc.collect()
-            
+
             logger.info(f"Cleaned up resources for shard {self.shard_id}")
 
         except Exception as e:
             logger.error(f"Error cleaning up shard {self.shard_id}: {e}")
 
-    async def stream_generate(self, task_data: Dict[str, Any]) -> AsyncGenerator[Dict[str, Any], None]:
-        """Stream generation tokens in real-time"""
-        try:
-            task_id = task_data.get("id", "unknown")
-            model_id = task_data.get("model", "auto")
-            input_text = task_data.get("input", "")
-            parameters = task_data.get("parameters", {})
-
-            logger.info(f"Starting streaming generation for task {task_id}")
-
-            # Auto-select model if not specified
-            if model_id == "auto":
-                task_type = task_data.get("task_type", "text-generation")
-                model_id = self.model_manager.get_recommended_model(task_type)
-                if not model_id:
-                    yield {
-                        "error": "No suitable model available",
-                        "task_id": task_id,
-                        "status": "failed"
-                    }
-                    return
-
-            # Load model if needed
-            success = await self.model_manager.auto_load_model(model_id, task_data)
-            if not success:
-                yield {
-                    "error": f"Failed to load model {model_id}",
-                    "task_id": task_id,
-                    "status": "failed"
-                }
-                return
-
-            # Get loaded model and tokenizer
-            model_info = self.model_manager.get_loaded_model(model_id)
-            if not model_info:
-                yield {
-                    "error": f"Model {model_id} not available after loading",
-                    "task_id": task_id,
-                    "status": "failed"
-                }
-                return
-
-            model = model_info["model"]
-            tokenizer = model_info["tokenizer"]
-
-            # Prepare generation parameters
-            generation_params = {
-                "max_new_tokens": parameters.get("max_tokens", 100),
-                "temperature": parameters.get("temperature", 0.7),
-                "top_p": parameters.get("top_p", 0.9),
-                "do_sample": parameters.get("temperature", 0.7) > 0,
-                "pad_token_id": tokenizer.eos_token_id,
-            }
-
-            # Setup streaming
-            streamer = TextIteratorStreamer(
-                tokenizer,
-                timeout=60.0,
-                skip_prompt=True,
-                skip_special_tokens=True
-            )
-            generation_params["streamer"] = streamer
-
-            # Tokenize input
-            inputs = tokenizer(input_text, return_tensors="pt")
-            if torch.cuda.is_available() and hasattr(model, 'device'):
-                inputs = {k: v.to(model.device) for k, v in inputs.items()}
-
-            # Start generation in a separate thread
-            generation_kwargs = {**inputs, **generation_params}
-            thread = Thread(target=model.generate, kwargs=generation_kwargs)
-            thread.start()
-
-            # Yield initial status
-            yield {
-                "task_id": task_id,
-                "status": "streaming",
-                "model": model_id,
-                "timestamp": datetime.now().isoformat()
-            }
-
-            # Stream tokens
-            generated_text = ""
-            token_count = 0
-
-            try:
-                for new_text in streamer:
-                    if new_text:
-                        generated_text += new_text
-                        token_count += 1
-
-                        yield {
-                            "task_id": task_id,
-                            "status": "streaming",
-                            "token": new_text,
-                            "partial_text": generated_text,
-                            "token_count": token_count,
-                            "timestamp": datetime.now().isoformat()
-                        }
-
-            except Exception as stream_error:
-                logger.error(f"Streaming error: {stream_error}")
-                yield {
-                    "task_id": task_id,
-                    "status": "error",
-                    "error": str(stream_error),
-                    "timestamp": datetime.now().isoformat()
-                }
-                return
-
-            # Wait for generation to complete
-            thread.join()
-
-            # Final result
-            yield {
-                "task_id": task_id,
-                "status": "completed",
-                "result": {
-                    "output": generated_text,
-                    "tokens_generated": token_count,
-                    "model_used": model_id,
-                    "processing_time": None  # Could add timing if needed
-                },
-                "timestamp": datetime.now().isoformat()
-            }
-
-            logger.info(f"Completed streaming generation for task {task_id}")
-
-        except Exception as e:
-            logger.error(f"Error in streaming generation: {e}")
-            yield {
-                "task_id": task_data.get("id", "unknown"),
-                "status": "failed",
-                "error": str(e),
-                "timestamp": datetime.now().isoformat()
-            }
-
 # Global inference engine instance
 inference_engine = InferenceEngine()
\ No newline at end of file
@@ -0,0 +1,62 @@
+"""
+gRPC server-streaming endpoint for hub-to-agent inference traffic
+"""
+import logging
+from contextlib import AbstractAsyncContextManager
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+import orjson
+
+from shared.config.env import AGENT_GRPC_PORT
+from .executor import inference_engine
+
+try:
+    import grpc
+    GRPC_AVAILABLE = True
+except ImportError:
+    grpc = None
+    GRPC_AVAILABLE = False
+    logging.warning("grpcio not available, gRPC inference streaming disabled")
+
+logger = logging.getLogger(__name__)
+
+# Messages are JSON documents framed by gRPC, so no generated stubs are needed:
+#   service exostack.Inference { rpc StreamGenerate(Task) returns (stream Chunk); }
+SERVICE_NAME = "exostack.Inference"
+
+def _build_handler(inference_slot: Callable[[], AbstractAsyncContextManager]):
+    async def _stream_generate(task_data: Dict[str, Any], context: Any) -> AsyncIterator[Dict[str, Any]]:
+        """Relay inference_engine.stream_generate chunks as individual gRPC messages"""
+        async with inference_slot():
+            async for chunk in inference_engine.stream_generate(task_data):
+                yield chunk
+
+    return grpc.method_handlers_generic_handler(SERVICE_NAME, {
+        "StreamGenerate": grpc.unary_stream_rpc_method_handler(
+            _stream_generate,
+            request_deserializer=orjson.loads,
+            response_serializer=orjson.dumps
+        )
+    })
+
+async def start_grpc_server(
+    inference_slot: Callable[[], AbstractAsyncContextManager],
+    port: int = AGENT_GRPC_PORT
+) -> Optional[Any]:
+    """Start the inference gRPC server, returning None when grpcio is unavailable.
+
+    inference_slot is entered around each stream so gRPC shares the HTTP routes' admission limit.
+    """
+    if not GRPC_AVAILABLE:
+        return None
+
+    server = grpc.aio.server()
+    server.add_generic_rpc_handlers((_build_handler(inference_slot),))
+    server.add_insecure_port(f"[::]:{port}")
+    await server.start()
+    logger.info(f"gRPC inference server listening on port {port}")
+    return server
+
+async def stop_grpc_server(server: Optional[Any], grace: float = 5.0) -> None:
+    if server is not None:
+        await server.stop(grace)
@@ -2,20 +2,22 @@
 Enhanced Agent Health Monitoring System with GPU support and real-time metrics
 """
 
+import os
 import psutil
 import time
 import logging
 import torch
 import platform
-import numpy as np
 import subprocess
 import json
-from typing import Dict, Any, List, Optional
+import array
+import functools
+from collections import deque
+from typing import Deque, Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from dataclasses import dataclass
-from threading import Thread, Lock
+from threading import Event, Thread, Lock
 from queue import Queue
-import GPUtil
 
 try:
     import pynvml
@@ -28,112 +30,299 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Package-0 energy counter exposed by the intel_rapl powercap driver
+RAPL_DOMAIN_PATH = "/sys/class/powercap/intel-rapl:0"
+
+# Host constants, sampled once at import. The usable CPU count honors the
+# process affinity mask so containers report their cgroup allotment.
+_CPU_COUNT = (
+    len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else psutil.cpu_count()
+)
+_CPU_COUNT_LOGICAL = psutil.cpu_count(logical=True)
+_BOOT_TIME = psutil.boot_time()
+_MEM_TOTAL = psutil.virtual_memory().total
+
+_NVIDIA_SMI_CMD = (
+    'nvidia-smi',
+    '--query-gpu=index,name,memory.total,memory.used,memory.free,temperature.gpu,power.draw,utilization.gpu,utilization.memory',
+    '--format=csv,noheader,nounits',
+)
+
+def _to_float_or_none(value: str) -> Optional[float]:
+    """Parse an nvidia-smi numeric field; unsupported readings become None"""
+    return None if value == '[Not Supported]' else float(value)
+
+@functools.lru_cache(maxsize=1)
+def _iso_ts(second: int) -> str:
+    """ISO-8601 local time for a whole epoch second; repeat calls within a second are free"""
+    return datetime.fromtimestamp(second).isoformat()
+
+@dataclass(frozen=True)
 class MetricSample:
+    # Explicit __slots__ (rather than slots=True) keeps this importable before 3.10
+    __slots__ = ("timestamp", "value", "metric_type")
+
     timestamp: float
     value: float
     metric_type: str
 
+class MetricRing:
+    """Fixed-size single-producer ring of (timestamp, value) pairs.
+
+    The producer writes a slot and then publishes it by bumping ``head``; under the GIL
+    that int store is atomic, so readers never need a lock. A reader racing a full wrap
+    may see a slot overwritten mid-copy, which is acceptable for monitoring snapshots.
+    """
+
+    __slots__ = ("size", "timestamps", "values", "head")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.timestamps = array.array('d', [0.0] * size)
+        self.values = array.array('d', [0.0] * size)
+        self.head = 0
+
+    def append(self, timestamp: float, value: float):
+        index = self.head % self.size
+        self.timestamps[index] = timestamp
+        self.values[index] = value
+        self.head += 1
+
+    def snapshot(self) -> List[Tuple[float, float]]:
+        head = self.head
+        # Copy both arrays in C first so the window racing the producer is as short as possible
+        timestamps = self.timestamps.tolist()
+        values = self.values.tolist()
+        if head <= self.size:
+            return list(zip(timestamps[:head], values[:head]))
+        split = head % self.size
+        return list(zip(timestamps[split:] + timestamps[:split], values[split:] + values[:split]))
+
 class MetricsBuffer:
     def __init__(self, max_samples: int = 100):
         self.max_samples = max_samples
-        self.samples: Dict[str, List[MetricSample]] = {}
-        self.lock = Lock()
+        self.samples: Dict[str, MetricRing] = {}
 
     def add_sample(self, metric_type: str, value: float):
-        with self.lock:
-            if metric_type not in self.samples:
-                self.samples[metric_type] = []
-            
-            self.samples[metric_type].append(
-                MetricSample(
-                    timestamp=time.time(),
-                    value=value,
-                    metric_type=metric_type
-                )
-            )
-            
-            # Keep only recent samples
-            if len(self.samples[metric_type]) > self.max_samples:
-                self.samples[metric_type] = self.samples[metric_type][-self.max_samples:]
+        # Each metric has a single producer (its collector thread), so no lock is taken
+        ring = self.samples.get(metric_type)
+        if ring is None:
+            ring = self.samples[metric_type] = MetricRing(self.max_samples)
+        ring.append(time.time(), value)
 
     def get_metrics(self, metric_type: str) -> List[MetricSample]:
-        with self.lock:
-            return self.samples.get(metric_type, [])
+        ring = self.samples.get(metric_type)
+        if ring is None:
+            return []
+        return [
+            MetricSample(timestamp=timestamp, value=value, metric_type=metric_type)
+            for timestamp, value in ring.snapshot()
+        ]
 
 class HealthMonitor:
-    def __init__(self, collection_interval: float = 1.0):
+    def __init__(self, collection_interval: float = 1.0, gpu_collection_interval: float = 2.0):
         self.start_time = time.time()
         self.collection_interval = collection_interval
+        # NVML queries are heavier than /proc reads, so GPUs are polled on their own cadence
+        self.gpu_collection_interval = gpu_collection_interval
         self.metrics_buffer = MetricsBuffer()
-        self.task_history: List[Dict] = []
         self.max_history = 1000
+        self.task_history: Deque[Dict] = deque(maxlen=self.max_history)
+        # Running aggregates over task_history, updated on append and eviction
+        self._task_completed = 0
+        self._task_failed = 0
+        self._task_total_duration = 0.0
+        self._task_lock = Lock()
         self.is_collecting = False
-        self.collection_thread: Optional[Thread] = None
+        self._stop_event = Event()
+        self.collection_threads: List[Thread] = []
         self.gpu_enabled = torch.cuda.is_available()
+
+        # CPU package power from RAPL energy counters; disabled if sysfs isn't readable
+        self._rapl_available = os.access(os.path.join(RAPL_DOMAIN_PATH, "energy_uj"), os.R_OK)
+        self._rapl_max_energy_uj = self._read_sysfs_int(
+            os.path.join(RAPL_DOMAIN_PATH, "max_energy_range_uj")
+        ) if self._rapl_available else None
+        self._rapl_prev: Optional[Tuple[int, float]] = None
+
+        # Short-lived cache for get_detailed_gpu_info; NVML/nvidia-smi are too slow per request
+        self._gpu_cache: Optional[Dict[str, Any]] = None
+        self._gpu_cache_ts = 0.0
+        self._gpu_cache_ttl = 2.0
+        self._gpu_cache_lock = Lock()
         
-        # Initialize GPU monitoring if available
-        self.gpus = []
-        if self.gpu_enabled:
+        # Initialize GPU monitoring if available; NVML handles are resolved once and reused
+        self.nvml_handles = []
+        if self.gpu_enabled and PYNVML_AVAILABLE:
             try:
-                self.gpus = GPUtil.getGPUs()
-                logger.info(f"Initialized GPU monitoring for {len(self.gpus)} GPUs")
+                self.nvml_handles = [
+                    pynvml.nvmlDeviceGetHandleByIndex(i)
+                    for i in range(pynvml.nvmlDeviceGetCount())
+                ]
+                logger.info(f"Initialized NVML monitoring for {len(self.nvml_handles)} GPUs")
             except Exception as e:
                 logger.warning(f"Failed to initialize GPU monitoring: {e}")
 
+        # Device properties and versions never change at runtime; query them once
+        self._static_gpu_props: List[Dict[str, Any]] = []
+        # is_gpu_capable answers, keyed by (min_memory_gb, min_compute_capability)
+        self._gpu_capable_cache: Dict[Tuple[float, str], bool] = {}
+        self._cuda_version = torch.version.cuda if self.gpu_enabled else None
+        self._driver_version: Optional[str] = None
+        if self.gpu_enabled:
+            try:
+                for i in range(torch.cuda.device_count()):
+                    props = torch.cuda.get_device_properties(i)
+                    self._static_gpu_props.append({
+                        "id": i,
+                        "name": props.name,
+                        "memory_total_gb": props.total_memory / (1024**3),
+                        "compute_capability": f"{props.major}.{props.minor}",
+                        "multiprocessor_count": props.multi_processor_count
+                    })
+            except Exception as e:
+                logger.warning(f"Failed to get PyTorch GPU info: {e}")
+
+            if PYNVML_AVAILABLE:
+                try:
+                    driver_version = pynvml.nvmlSystemGetDriverVersion()
+                    if isinstance(driver_version, bytes):
+                        driver_version = driver_version.decode('utf-8')
+                    self._driver_version = driver_version
+                except Exception as e:
+                    logger.warning(f"Failed to get PYNVML driver version: {e}")
+
     def start_collection(self):
-        """Start the metrics collection thread"""
+        """Start the CPU and GPU metrics collection threads"""
         if not self.is_collecting:
             self.is_collecting = True
-            self.collection_thread = Thread(target=self._collect_metrics, daemon=True)
-            self.collection_thread.start()
+            self._stop_event.clear()
+            self.collection_threads = [
+                Thread(target=self._cpu_collector, daemon=True),
+                Thread(target=self._gpu_collector, daemon=True),
+            ]
+            for thread in self.collection_threads:
+                thread.start()
             logger.info("Started health metrics collection")
 
     def stop_collection(self):
-        """Stop the metrics collection thread"""
+        """Stop the metrics collection threads"""
         self.is_collecting = False
-        if self.collection_thread:
-            self.collection_thread.join()
+        self._stop_event.set()
+        if self.collection_threads:
+            for thread in self.collection_threads:
+                thread.join()
+            self.collection_threads = []
             logger.info("Stopped health metrics collection")
 
-    def _collect_metrics(self):
-        """Continuously collect metrics at the specified interval"""
-        while self.is_collecting:
+    def _run_periodic(self, interval: float, collect) -> None:
+        """Call ``collect`` at a fixed rate until collection is stopped"""
+        next_tick = time.monotonic()
+        while not self._stop_event.is_set():
             try:
-                # Collect CPU metrics
-                cpu_percent = psutil.cpu_percent(interval=None)
-                self.metrics_buffer.add_sample("cpu_usage", cpu_percent)
-
-                # Collect memory metrics
-                memory = psutil.virtual_memory()
-                self.metrics_buffer.add_sample("memory_usage", memory.percent)
-                self.metrics_buffer.add_sample("memory_available", memory.available / 1024 / 1024)  # MB
-
-                # Collect GPU metrics if available
-                if self.gpu_enabled:
-                    for gpu_id, gpu in enumerate(self.gpus):
-                        try:
-                            gpu.load = GPUtil.getGPUs()[gpu_id].load * 100
-                            gpu.memoryUtil = GPUtil.getGPUs()[gpu_id].memoryUtil * 100
-                            self.metrics_buffer.add_sample(f"gpu_{gpu_id}_usage", gpu.load)
-                            self.metrics_buffer.add_sample(f"gpu_{gpu_id}_memory", gpu.memoryUtil)
-                        except Exception as e:
-                            logger.warning(f"Failed to collect GPU metrics: {e}")
-
-                # Add more metrics as needed
+                collect()
+            except Exception as e:
+                logger.error("Error collecting metrics: %s", e)
+
+            # Fixed-rate schedule; resync instead of bursting after an overrun
+            next_tick += interval
+            sleep_for = next_tick - time.monotonic()
+            if sleep_for > 0:
+                self._stop_event.wait(sleep_for)
+            else:
+                next_tick = time.monotonic()
+
+    def _cpu_collector(self):
+        """Collect CPU, memory and CPU power metrics every collection_interval"""
+        self._run_periodic(self.collection_interval, self._collect_cpu_metrics)
+
+    def _gpu_collector(self):
+        """Collect GPU metrics every gpu_collection_interval"""
+        if not self.nvml_handles:
+            return
+        self._run_periodic(self.gpu_collection_interval, self._collect_gpu_metrics)
+
+    def _collect_cpu_metrics(self):
+        # Collect CPU metrics
+        cpu_percent = psutil.cpu_percent(interval=None)
+        self.metrics_buffer.add_sample("cpu_usage", cpu_percent)
+
+        # Collect memory metrics
+        memory = psutil.virtual_memory()
+        self.metrics_buffer.add_sample("memory_usage", memory.percent)
+        self.metrics_buffer.add_sample("memory_available", memory.available / 1024 / 1024)  # MB
 
+        # Collect CPU package power if available
+        if self._rapl_available:
+            cpu_power_w = self._read_rapl_power()
+            if cpu_power_w is not None:
+                self.metrics_buffer.add_sample("cpu_power_w", cpu_power_w)
+
+    def _collect_gpu_metrics(self):
+        for gpu_id, handle in enumerate(self.nvml_handles):
+            try:
+                utilization = pynvml.nvmlDeviceGetUtilizationRates(handle)
+                self.metrics_buffer.add_sample(f"gpu_{gpu_id}_usage", utilization.gpu)
+                self.metrics_buffer.add_sample(f"gpu_{gpu_id}_memory", utilization.memory)
+                self.metrics_buffer.add_sample(
+                    f"gpu_{gpu_id}_power_w",
+                    pynvml.nvmlDeviceGetPowerUsage(handle) / 1000.0
+                )
             except Exception as e:
-                logger.error(f"Error collecting metrics: {e}")
+                logger.warning("Failed to collect GPU metrics: %s", e)
+
+    @staticmethod
+    def _read_sysfs_int(path: str) -> Optional[int]:
+        """Read an integer sysfs attribute without going through Python file objects"""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                return int(os.read(fd, 32))
+            finally:
+                os.close(fd)
+        except (OSError, ValueError):
+            return None
+
+    def _read_rapl_energy(self) -> Optional[int]:
+        """Current RAPL package energy counter in microjoules"""
+        return self._read_sysfs_int(os.path.join(RAPL_DOMAIN_PATH, "energy_uj"))
+
+    def _read_rapl_power(self) -> Optional[float]:
+        """Average CPU package power in watts since the previous reading"""
+        energy_uj = self._read_rapl_energy()
+        if energy_uj is None:
+            self._rapl_available = False
+            return None
+
+        now = time.monotonic()
+        prev = self._rapl_prev
+        self._rapl_prev = (energy_uj, now)
+        if prev is None or now <= prev[1]:
+            return None
+
+        delta_uj = energy_uj - prev[0]
+        if delta_uj < 0:
+            # Counter wrapped around max_energy_range_uj
+            if not self._rapl_max_energy_uj:
+                return None
+            delta_uj += self._rapl_max_energy_uj
+
+        return delta_uj / (now - prev[1]) / 1e6
 
     def get_detailed_health(self) -> Dict[str, Any]:
+        # Sample each system counter once and share it across the report sections
+        memory = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        cpu_usage = psutil.cpu_percent(interval=None)
+
         return {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": _iso_ts(int(time.time())),
             "uptime_seconds": time.time() - self.start_time,
             "system": self._get_system_info(),
-            "resources": self._get_resource_usage(),
+            "resources": self._get_resource_usage(memory, disk, cpu_usage),
             "gpu": self.get_detailed_gpu_info(),
             "tasks": self._get_task_stats(),
-            "status": self._get_overall_status(),
+            "status": self._get_overall_status(cpu_usage, memory.percent),
             "capabilities": {
                 "gpu_capable": self.is_gpu_capable(),
                 "gpu_ml_ready": self.is_gpu_capable(min_memory_gb=6.0, min_compute_capability="6.0")
@@ -142,20 +331,18 @@ class HealthMonitor:
         
     def _get_system_info(self) -> Dict[str, Any]:
         return {
-            "cpu_count": psutil.cpu_count(),
-            "cpu_count_logical": psutil.cpu_count(logical=True),
-            "memory_total": psutil.virtual_memory().total,
-            "boot_time": psutil.boot_time()
+            "cpu_count": _CPU_COUNT,
+            "cpu_count_logical": _CPU_COUNT_LOGICAL,
+            "memory_total": _MEM_TOTAL,
+            "boot_time": _BOOT_TIME
         }
         
-    def _get_resource_usage(self) -> Dict[str, Any]:
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
+    def _get_resource_usage(self, memory: Any, disk: Any, cpu_usage: float) -> Dict[str, Any]:
         return {
-            "cpu_usage": psutil.cpu_percent(interval=1),
+            # Non-blocking reading; the collection thread keeps the cpu_percent counter primed
+            "cpu_usage": cpu_usage,
             "memory_usage": memory.percent,
-            "memory_total": memory.total,
+            "memory_total": _MEM_TOTAL,
             "memory_available": memory.available,
             "memory_used": memory.used,
             "disk_usage": disk.percent,
@@ -164,38 +351,22 @@ class HealthMonitor:
         }
         
     def _get_task_stats(self) -> Dict[str, Any]:
-        if not self.task_history:
-            return {
-                "total_tasks": 0,
-                "completed_tasks": 0,
-                "failed_tasks": 0,
-                "avg_duration": 0.0,
-                "success_rate": 0.0
-            }
-            
-        completed = [t for t in self.task_history if t.get("status") == "completed"]
-        failed = [t for t in self.task_history if t.get("status") == "failed"]
-        
-        avg_duration = 0.0
-        if completed:
-            total_duration = sum(t.get("duration", 0) for t in completed)
-            avg_duration = total_duration / len(completed)
-            
-        success_rate = len(completed) / len(self.task_history) * 100 if self.task_history else 0
-        
+        with self._task_lock:
+            total = len(self.task_history)
+            completed = self._task_completed
+            failed = self._task_failed
+            total_duration = self._task_total_duration
+
         return {
-            "total_tasks": len(self.task_history),
-            "completed_tasks": len(completed),
-            "failed_tasks": len(failed),
-            "avg_duration": avg_duration,
-            "success_rate": success_rate
+            "total_tasks": total,
+            "completed_tasks": completed,
+            "failed_tasks": failed,
+            "avg_duration": total_duration / completed if completed else 0.0,
+            "success_rate": completed / total * 100 if total else 0.0
         }
         
-    def _get_overall_status(self) -> str:
+    def _get_overall_status(self, cpu_usage: float, memory_usage: float) -> str:
         try:
-            cpu_usage = psutil.cpu_percent(interval=1)
-            memory_usage = psutil.virtual_memory().percent
-            
             if cpu_usage > 90 or memory_usage > 90:
                 return "critical"
             elif cpu_usage > 70 or memory_usage > 70:
@@ -210,15 +381,35 @@ class HealthMonitor:
             "task_id": task_id,
             "status": status,
             "duration": duration,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": time.time()
         }
         
-        self.task_history.append(task_record)
-        
-        if len(self.task_history) > self.max_history:
-            self.task_history = self.task_history[-self.max_history:]
+        with self._task_lock:
+            # Retire the record the bounded deque is about to drop
+            if len(self.task_history) == self.max_history:
+                self._update_task_aggregates(self.task_history[0], -1)
+            self.task_history.append(task_record)
+            self._update_task_aggregates(task_record, 1)
+
+    def _update_task_aggregates(self, task_record: Dict[str, Any], sign: int):
+        if task_record["status"] == "completed":
+            self._task_completed += sign
+            self._task_total_duration += sign * task_record["duration"]
+        elif task_record["status"] == "failed":
+            self._task_failed += sign
 
     def get_detailed_gpu_info(self) -> Dict[str, Any]:
+        """Get comprehensive GPU information, cached for up to _gpu_cache_ttl seconds"""
+        with self._gpu_cache_lock:
+            if (
+                self._gpu_cache is None or
+                time.monotonic() - self._gpu_cache_ts >= self._gpu_cache_ttl
+            ):
+                self._gpu_cache = self._collect_gpu_info()
+                self._gpu_cache_ts = time.monotonic()
+            return dict(self._gpu_cache)
+
+    def _collect_gpu_info(self) -> Dict[str, Any]:
         """Get comprehensive GPU information using multiple methods"""
         gpu_info = {
             "available": self.gpu_enabled,
@@ -232,22 +423,16 @@ class HealthMonitor:
             return gpu_info
 
         try:
-            # Method 1: PyTorch CUDA info
-            if torch.cuda.is_available():
-                gpu_info["count"] = torch.cuda.device_count()
-                gpu_info["cuda_version"] = torch.version.cuda
-
-                for i in range(torch.cuda.device_count()):
-                    props = torch.cuda.get_device_properties(i)
-                    device_info = {
-                        "id": i,
-                        "name": props.name,
-                        "memory_total_gb": props.total_memory / (1024**3),
-                        "memory_allocated_gb": torch.cuda.memory_allocated(i) / (1024**3),
-                        "memory_reserved_gb": torch.cuda.memory_reserved(i) / (1024**3),
-                        "compute_capability": f"{props.major}.{props.minor}",
-                        "multiprocessor_count": props.multi_processor_count
-                    }
+            # Method 1: PyTorch CUDA info, overlaying live memory counters on cached properties
+            if self._static_gpu_props:
+                gpu_info["count"] = len(self._static_gpu_props)
+                gpu_info["cuda_version"] = self._cuda_version
+
+                for static_props in self._static_gpu_props:
+                    device_info = static_props.copy()
+                    i = device_info["id"]
+                    device_info["memory_allocated_gb"] = torch.cuda.memory_allocated(i) / (1024**3)
+                    device_info["memory_reserved_gb"] = torch.cuda.memory_reserved(i) / (1024**3)
                     gpu_info["devices"].append(device_info)
                     gpu_info["total_memory_gb"] += device_info["memory_total_gb"]
 
@@ -257,13 +442,9 @@ class HealthMonitor:
         try:
             # Method 2: PYNVML for detailed NVIDIA info
             if PYNVML_AVAILABLE:
-                driver_version = pynvml.nvmlSystemGetDriverVersion()
-                gpu_info["driver_version"] = driver_version.decode('utf-8')
-
-                device_count = pynvml.nvmlDeviceGetCount()
-                for i in range(device_count):
-                    handle = pynvml.nvmlDeviceGetHandleByIndex(i)
+                gpu_info["driver_version"] = self._driver_version
 
+                for i, handle in enumerate(self.nvml_handles):
                     # Get additional info not available through PyTorch
                     try:
                         temp = pynvml.nvmlDeviceGetTemperature(handle, pynvml.NVML_TEMPERATURE_GPU)
@@ -278,7 +459,7 @@ class HealthMonitor:
                                 "memory_utilization": utilization.memory
                             })
                     except Exception as e:
-                        logger.debug(f"Failed to get detailed info for GPU {i}: {e}")
+                        logger.debug("Failed to get detailed info for GPU %d: %s", i, e)
 
         except Exception as e:
             logger.warning(f"Failed to get PYNVML GPU info: {e}")
@@ -307,10 +488,7 @@ class HealthMonitor:
     def _get_nvidia_smi_info(self) -> Optional[Dict[str, Any]]:
         """Get GPU info using nvidia-smi"""
         try:
-            result = subprocess.run([
-                'nvidia-smi', '--query-gpu=index,name,memory.total,memory.used,memory.free,temperature.gpu,power.draw,utilization.gpu,utilization.memory',
-                '--format=csv,noheader,nounits'
-            ], capture_output=True, text=True, timeout=10)
+            result = subprocess.run(_NVIDIA_SMI_CMD, capture_output=True, text=True, timeout=10)
 
             if result.returncode != 0:
                 return None
@@ -318,27 +496,26 @@ class HealthMonitor:
             devices = []
             total_memory_gb = 0
 
-            for line in result.stdout.strip().split('\n'):
-                if line.strip():
-                    parts = [p.strip() for p in line.split(',')]
-                    if len(parts) >= 9:
-                        memory_total_mb = float(parts[2]) if parts[2] != '[Not Supported]' else 0
-                        memory_used_mb = float(parts[3]) if parts[3] != '[Not Supported]' else 0
-                        memory_free_mb = float(parts[4]) if parts[4] != '[Not Supported]' else 0
-
-                        device_info = {
-                            "id": int(parts[0]),
-                            "name": parts[1],
-                            "memory_total_gb": memory_total_mb / 1024,
-                            "memory_used_gb": memory_used_mb / 1024,
-                            "memory_free_gb": memory_free_mb / 1024,
-                            "temperature_c": float(parts[5]) if parts[5] != '[Not Supported]' else None,
-                            "power_usage_w": float(parts[6]) if parts[6] != '[Not Supported]' else None,
-                            "gpu_utilization": float(parts[7]) if parts[7] != '[Not Supported]' else None,
-                            "memory_utilization": float(parts[8]) if parts[8] != '[Not Supported]' else None
-                        }
-                        devices.append(device_info)
-                        total_memory_gb += device_info["memory_total_gb"]
+            for line in result.stdout.splitlines():
+                parts = [part.strip() for part in line.split(',')]
+                if len(parts) < 9:
+                    continue
+                index, name, *readings = parts[:9]
+                (memory_total, memory_used, memory_free,
+                 temperature, power, gpu_util, memory_util) = map(_to_float_or_none, readings)
+                device_info = {
+                    "id": int(index),
+                    "name": name,
+                    "memory_total_gb": (memory_total or 0) / 1024,
+                    "memory_used_gb": (memory_used or 0) / 1024,
+                    "memory_free_gb": (memory_free or 0) / 1024,
+                    "temperature_c": temperature,
+                    "power_usage_w": power,
+                    "gpu_utilization": gpu_util,
+                    "memory_utilization": memory_util
+                }
+                devices.append(device_info)
+                total_memory_gb += device_info["memory_total_gb"]
 
             return {
                 "count": len(devices),
@@ -351,23 +528,19 @@ class HealthMonitor:
             return None
 
     def is_gpu_capable(self, min_memory_gb: float = 4.0, min_compute_capability: str = "3.5") -> bool:
-        """Check if the system has GPU capability for ML workloads"""
-        if not self.gpu_enabled:
-            return False
-
-        gpu_info = self.get_detailed_gpu_info()
-
-        for device in gpu_info.get("devices", []):
-            memory_gb = device.get("memory_total_gb", 0)
-            compute_cap = device.get("compute_capability", "0.0")
-
-            if memory_gb >= min_memory_gb:
-                try:
-                    if float(compute_cap) >= float(min_compute_capability):
-                        return True
-                except ValueError:
-                    continue
-
-        return False
+        """Check if the system has GPU capability for ML workloads.
+
+        Only the device properties cached at init are inspected, so results are
+        memoized per argument set.
+        """
+        key = (min_memory_gb, min_compute_capability)
+        capable = self._gpu_capable_cache.get(key)
+        if capable is None:
+            capable = self._gpu_capable_cache[key] = any(
+                props["memory_total_gb"] >= min_memory_gb and
+                float(props["compute_capability"]) >= float(min_compute_capability)
+                for props in self._static_gpu_props
+            )
+        return capable
 
 health_monitor = HealthMonitor()
\ No newline at end of file
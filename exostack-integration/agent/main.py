@@ -5,13 +5,20 @@ Distributed AI agent with model registry, GPU detection, and streaming inference
 import os
 import logging
 import asyncio
+import httpx
+import orjson
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .agent import app as agent_app
+from fastapi.responses import ORJSONResponse, Response
+from .agent import (
+    app as agent_app, acquire_registration_lock, run_system_sampler, run_health_refresher, _inference_slot
+)
 from .health_monitor import health_monitor
 from .model_manager import model_manager
 from .executor import inference_engine
+from .grpc_server import start_grpc_server, stop_grpc_server
+from .config import ensure_dirs
 
 # Configure logging
 logging.basicConfig(
@@ -25,15 +32,26 @@ AGENT_ID = os.getenv("AGENT_ID", "agent-001")
 AGENT_PORT = int(os.getenv("AGENT_PORT", "8001"))
 HUB_URL = os.getenv("HUB_URL", "http://localhost:8000")
 
+# Uvicorn worker processes. Each worker loads its own copy of every model
+# (N x weights in host and GPU memory) and keeps its own load/LRU state, so
+# /models/* answers depend on which worker serves them. Keep 1 unless the host
+# has memory for N copies and clients tolerate per-worker model state.
+AGENT_WORKERS = max(1, int(os.getenv("AGENT_WORKERS", "1")))
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
     logger.info(f"🚀 Starting ExoStack Agent {AGENT_ID}...")
+    ensure_dirs()
     
     # Initialize health monitor
     await health_monitor.start()
     logger.info("✅ Health monitor started")
+
+    # Start system resource sampler and health snapshot refresher
+    sampler_task = asyncio.create_task(run_system_sampler())
+    health_refresher_task = asyncio.create_task(run_health_refresher())
     
     # Initialize model manager
     await model_manager.initialize()
@@ -42,13 +60,24 @@ async def lifespan(app: FastAPI):
     # Initialize inference engine
     await inference_engine.initialize()
     logger.info("✅ Inference engine initialized")
-    
-    # Register with hub
-    try:
-        await register_with_hub()
-        logger.info("✅ Registered with hub successfully")
-    except Exception as e:
-        logger.warning(f"⚠️  Failed to register with hub: {e}")
+
+    # Only one worker per agent serves gRPC and talks to the hub
+    is_registrar = acquire_registration_lock()
+    grpc_server = None
+
+    # One pooled keep-alive client for all hub calls over the app's lifetime
+    app.state.hub_client = httpx.AsyncClient(base_url=HUB_URL, timeout=30.0)
+
+    if is_registrar:
+        # Start gRPC streaming endpoint for hub traffic
+        grpc_server = await start_grpc_server(inference_slot=_inference_slot)
+
+        # Register with hub
+        try:
+            await register_with_hub()
+            logger.info("✅ Registered with hub successfully")
+        except Exception as e:
+            logger.warning(f"⚠️  Failed to register with hub: {e}")
     
     logger.info(f"🎉 ExoStack Agent {AGENT_ID} startup completed")
     
@@ -58,13 +87,18 @@ async def lifespan(app: FastAPI):
     logger.info(f"🛑 Shutting down ExoStack Agent {AGENT_ID}...")
     
     # Unregister from hub
-    try:
-        await unregister_from_hub()
-        logger.info("✅ Unregistered from hub")
-    except Exception as e:
-        logger.warning(f"⚠️  Failed to unregister from hub: {e}")
+    if is_registrar:
+        try:
+            await unregister_from_hub()
+            logger.info("✅ Unregistered from hub")
+        except Exception as e:
+            logger.warning(f"⚠️  Failed to unregister from hub: {e}")
     
     # Cleanup services
+    await app.state.hub_client.aclose()
+    await stop_grpc_server(grpc_server)
+    sampler_task.cancel()
+    health_refresher_task.cancel()
     await inference_engine.cleanup()
     await model_manager.cleanup()
     await health_monitor.stop()
@@ -73,8 +107,6 @@ async def lifespan(app: FastAPI):
 
 async def register_with_hub():
     """Register this agent with the hub"""
-    import httpx
-    
     # Get agent capabilities
     capabilities = await get_agent_capabilities()
     
@@ -87,35 +119,32 @@ async def register_with_hub():
         "supported_models": capabilities["supported_models"]
     }
     
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        response = await client.post(
-            f"{HUB_URL}/nodes/register",
-            json=registration_data
-        )
-        response.raise_for_status()
+    response = await app.state.hub_client.post(
+        "/nodes/register",
+        json=registration_data
+    )
+    response.raise_for_status()
 
 async def unregister_from_hub():
     """Unregister this agent from the hub"""
-    import httpx
-    
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            response = await client.delete(f"{HUB_URL}/nodes/{AGENT_ID}")
-            response.raise_for_status()
-        except Exception as e:
-            logger.warning(f"Failed to unregister: {e}")
+    try:
+        response = await app.state.hub_client.delete(f"/nodes/{AGENT_ID}", timeout=10.0)
+        response.raise_for_status()
+    except Exception as e:
+        logger.warning(f"Failed to unregister: {e}")
 
 async def get_agent_capabilities():
     """Get agent capabilities for registration"""
-    from .agent import get_capabilities
-    return await get_capabilities()
+    from .agent import get_capabilities_payload
+    return get_capabilities_payload()
 
 # Create FastAPI app with lifespan
 app = FastAPI(
     title=f"ExoStack Agent {AGENT_ID}",
     description="Distributed AI agent with model registry and streaming inference",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware
@@ -130,39 +159,49 @@ app.add_middleware(
 # Mount the agent app
 app.mount("/", agent_app)
 
+# Static response payloads, built once at import
+_ROOT_BODY = orjson.dumps({
+    "service": f"ExoStack Agent {AGENT_ID}",
+    "version": "1.0.0",
+    "description": "Distributed AI agent",
+    "features": [
+        "Model registry integration",
+        "GPU detection and utilization",
+        "Streaming inference support",
+        "Automatic model loading",
+        "Resource monitoring"
+    ],
+    "endpoints": {
+        "health": "/health",
+        "docs": "/docs",
+        "inference": "/inference",
+        "models": "/models",
+        "capabilities": "/capabilities"
+    }
+})
+
+_STATIC_HEALTH_PREFIX = {
+    "agent_id": AGENT_ID,
+    "service": "ExoStack Agent",
+    "version": "1.0.0"
+}
+
 # Override root endpoint
 @app.get("/")
 async def root():
     """Root endpoint"""
-    return {
-        "service": f"ExoStack Agent {AGENT_ID}",
-        "version": "1.0.0",
-        "description": "Distributed AI agent",
-        "features": [
-            "Model registry integration",
-            "GPU detection and utilization",
-            "Streaming inference support",
-            "Automatic model loading",
-            "Resource monitoring"
-        ],
-        "endpoints": {
-            "health": "/health",
-            "docs": "/docs",
-            "inference": "/inference",
-            "models": "/models",
-            "capabilities": "/capabilities"
-        }
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    health_data = health_monitor.get_health_status()
+    # Metric collection makes blocking syscalls; keep it off the event loop
+    health_data = await asyncio.get_running_loop().run_in_executor(
+        None, health_monitor.get_health_status
+    )
     return {
         "status": "healthy" if health_data["status"] == "healthy" else "unhealthy",
-        "agent_id": AGENT_ID,
-        "service": "ExoStack Agent",
-        "version": "1.0.0",
+        **_STATIC_HEALTH_PREFIX,
         **health_data
     }
 
@@ -170,13 +209,17 @@ async def health_check():
 @app.middleware("http")
 async def log_requests(request, call_next):
     """Log all requests"""
+    # Skip timing and message formatting entirely unless debug logging is on
+    if not logger.isEnabledFor(logging.DEBUG):
+        return await call_next(request)
+
     start_time = asyncio.get_event_loop().time()
     
-    logger.debug(f"Request: {request.method} {request.url.path}")
+    logger.debug("Request: %s %s", request.method, request.url.path)
     response = await call_next(request)
     
     duration = asyncio.get_event_loop().time() - start_time
-    logger.debug(f"Response: {response.status_code} from {request.url.path} ({duration:.3f}s)")
+    logger.debug("Response: %s from %s (%.3fs)", response.status_code, request.url.path, duration)
     
     return response
 
@@ -189,6 +232,8 @@ if __name__ == "__main__":
         "exo_agent.main:app",
         host="0.0.0.0",
         port=AGENT_PORT,
-        reload=True,
-        log_level="info"
+        workers=AGENT_WORKERS,
+        log_level="info",
+        loop="uvloop",
+        http="httptools"
     )
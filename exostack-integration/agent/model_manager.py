@@ -4,16 +4,23 @@ Handles automatic model loading, caching, and resource management
 """
 import os
 import gc
+import copy
+import queue
 import torch
 import psutil
 import logging
+import time
 import asyncio
-from typing import Dict, Any, Optional, Tuple, Union
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
 from datetime import datetime, timedelta
 from transformers import (
     AutoTokenizer, 
     AutoModelForCausalLM, 
+    BitsAndBytesConfig,
     GenerationConfig,
     pipeline
 )
@@ -22,15 +29,83 @@ from shared.config.env import MODEL_CACHE_DIR, MAX_MODEL_MEMORY
 
 logger = logging.getLogger(__name__)
 
+# Independent tokenizer instances per model; a single fast tokenizer serializes
+# concurrent callers and its padding state is not thread-safe
+TOKENIZER_POOL_SIZE = min(os.cpu_count() or 1, 4)
+
+# Pinned staging slot for host-to-device weight copies; two slots alternate so
+# one fills while the other is in flight, capping pinned host memory at 2x this
+PIN_STAGING_BYTES = 64 * 1024 * 1024
+
+def compile_for_inference(model: Any, dynamic: bool = True) -> Any:
+    """Compile the model forward pass once so decode steps run as fused kernels.
+
+    If this model fails to compile, it alone falls back to eager execution; the
+    global dynamo config is left untouched. The default mode is used: it skips
+    CUDA graphs, which would break when generation runs on whichever worker
+    thread picks the call up, and GEMM autotuning, which would multiply compile
+    time on every load and warmup shape.
+    """
+    if not hasattr(torch, "compile"):
+        return model
+
+    eager_forward = model.forward
+    try:
+        compiled_forward = torch.compile(
+            eager_forward,
+            fullgraph=False,
+            dynamic=dynamic
+        )
+    except Exception as e:
+        logger.warning(f"torch.compile unavailable, using eager generation: {e}")
+        return model
+
+    # Compilation is lazy, so backend failures surface on the first call
+    compile_errors = (torch._dynamo.exc.TorchDynamoException,)
+
+    def forward(*args, **kwargs):
+        try:
+            return compiled_forward(*args, **kwargs)
+        except compile_errors as e:
+            logger.warning(f"torch.compile failed for {type(model).__name__}, using eager generation: {e}")
+            model.forward = eager_forward
+            return eager_forward(*args, **kwargs)
+
+    model.forward = forward
+    return model
+
+@dataclass
+class _MemSnapshot:
+    """Memory reading taken once per admission decision.
+
+    host_gb is available host RAM, the quantity the registry's min_ram_gb and
+    get_loading_config contracts are written against.
+    """
+    host_gb: float
+
 class ModelManager:
     """Enhanced model manager with registry integration and auto-loading"""
     
     def __init__(self):
-        self.loaded_models: Dict[str, Dict[str, Any]] = {}
+        # Insertion order doubles as LRU order: hits move to the end, eviction starts at the front
+        self.loaded_models: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         self.model_cache_dir = Path(MODEL_CACHE_DIR)
         self.model_cache_dir.mkdir(parents=True, exist_ok=True)
+
+        # Persist compiled Inductor graphs across restarts. The setting is process-wide,
+        # so this one cache is shared by every model and ShardedModelExecutor shard
+        os.environ.setdefault("TORCHINDUCTOR_CACHE_DIR", str(self.model_cache_dir / "inductor"))
+        os.environ.setdefault("TORCHINDUCTOR_FX_GRAPH_CACHE", "1")
         self.max_memory_gb = MAX_MODEL_MEMORY / 1024  # Convert MB to GB
-        self.last_used: Dict[str, datetime] = {}
+        # Last use per model as monotonic ns; wall-clock time is derived only for display
+        self.last_used: Dict[str, int] = {}
+        self._boot_wall = datetime.now()
+        self._boot_ns = time.monotonic_ns()
+        # In-flight auto_load_model calls, and a lock so concurrent loaders never pick the same eviction victims
+        self._inflight: Dict[str, "asyncio.Future[bool]"] = {}
+        self._evict_lock = asyncio.Lock()
+        # Per-model cache directory strings, created on first use
+        self._cache_str: Dict[str, str] = {}
         
         # System resource detection
         self.system_ram_gb = psutil.virtual_memory().total / (1024**3)
@@ -38,6 +113,11 @@ class ModelManager:
         self.gpu_memory_gb = 0
         
         if self.has_gpu:
+            # TF32 tensor cores for the float32 matmuls left in unquantized layers
+            torch.set_float32_matmul_precision("high")
+            # Let SDPA pick FlashAttention kernels where the GPU and dtype allow it
+            torch.backends.cuda.enable_flash_sdp(True)
+
             try:
                 self.gpu_memory_gb = torch.cuda.get_device_properties(0).total_memory / (1024**3)
                 logger.info(f"GPU detected: {self.gpu_memory_gb:.1f}GB VRAM")
@@ -51,6 +131,19 @@ class ModelManager:
         memory = psutil.virtual_memory()
         return memory.available / (1024**3)
     
+    def _cache_for(self, model_id: str) -> str:
+        """Model-specific cache directory, created once and memoized as a string"""
+        cache_path = self._cache_str.get(model_id)
+        if cache_path is None:
+            cache_path = os.path.join(self.model_cache_dir, model_id)
+            os.makedirs(cache_path, exist_ok=True)
+            self._cache_str[model_id] = cache_path
+        return cache_path
+    
+    def _snapshot_memory(self) -> _MemSnapshot:
+        """Read available host memory once"""
+        return _MemSnapshot(host_gb=self.get_available_memory())
+    
     def get_model_memory_usage(self, model_id: str) -> float:
         """Get memory usage of a loaded model in GB"""
         if model_id not in self.loaded_models:
@@ -65,10 +158,27 @@ class ModelManager:
     
     async def auto_load_model(self, model_id: str, task_requirements: Optional[Dict[str, Any]] = None) -> bool:
         """Automatically load a model from the registry if not already loaded"""
+        # Concurrent requests for the same model share one in-flight load
+        inflight = self._inflight.get(model_id)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[model_id] = future
+        success = False
+        try:
+            success = await self._auto_load_model(model_id, task_requirements)
+            return success
+        finally:
+            del self._inflight[model_id]
+            future.set_result(success)
+
+    async def _auto_load_model(self, model_id: str, task_requirements: Optional[Dict[str, Any]] = None) -> bool:
         try:
             # Check if model is already loaded
             if model_id in self.loaded_models:
-                self.last_used[model_id] = datetime.now()
+                self.loaded_models.move_to_end(model_id)
+                self.last_used[model_id] = time.monotonic_ns()
                 logger.debug(f"Model {model_id} already loaded")
                 return True
             
@@ -79,20 +189,22 @@ class ModelManager:
                 return False
             
             # Check resource compatibility
-            available_memory = self.get_available_memory()
-            if not model_config.is_compatible_with_resources(available_memory, self.has_gpu):
+            snapshot = self._snapshot_memory()
+            if not model_config.is_compatible_with_resources(snapshot.host_gb, self.has_gpu):
                 logger.error(f"Insufficient resources for model {model_id}")
                 return False
             
-            # Free memory if needed
-            if not await self._ensure_memory_available(model_config.min_ram_gb):
-                logger.error(f"Could not free enough memory for model {model_id}")
-                return False
+            # Free memory if needed; evictions invalidate the snapshot
+            if snapshot.host_gb < model_config.min_ram_gb:
+                if not await self._ensure_memory_available(model_config.min_ram_gb, snapshot):
+                    logger.error(f"Could not free enough memory for model {model_id}")
+                    return False
+                snapshot = self._snapshot_memory()
             
             # Load the model
-            success = await self._load_model_from_config(model_id, model_config)
+            success = await self._load_model_from_config(model_id, model_config, snapshot)
             if success:
-                self.last_used[model_id] = datetime.now()
+                self.last_used[model_id] = time.monotonic_ns()
                 logger.info(f"Successfully auto-loaded model {model_id}")
             
             return success
@@ -101,61 +213,95 @@ class ModelManager:
             logger.error(f"Failed to auto-load model {model_id}: {e}")
             return False
     
-    async def _load_model_from_config(self, model_id: str, model_config: ModelConfig) -> bool:
+    async def _load_model_from_config(
+        self,
+        model_id: str,
+        model_config: ModelConfig,
+        snapshot: Optional[_MemSnapshot] = None
+    ) -> bool:
         """Load a model using its registry configuration"""
         try:
-            available_memory = self.get_available_memory()
+            snapshot = snapshot or self._snapshot_memory()
             loading_config = model_registry.get_loading_config(
-                model_id, available_memory, self.has_gpu
+                model_id, snapshot.host_gb, self.has_gpu
             )
             
-            logger.info(f"Loading model {model_id} with config: {loading_config}")
-            
-            # Create model-specific cache directory
-            model_cache_path = self.model_cache_dir / model_id
-            model_cache_path.mkdir(exist_ok=True)
-            
-            # Load tokenizer
-            tokenizer = await asyncio.to_thread(
-                AutoTokenizer.from_pretrained,
-                model_config.hf_repo,
-                cache_dir=str(model_cache_path),
-                trust_remote_code=loading_config.get('trust_remote_code', True)
+            logger.info(
+                f"Loading model {model_id} with config: {loading_config} "
+                f"(free host RAM {snapshot.host_gb:.1f}GB)"
             )
             
-            if tokenizer.pad_token is None:
-                tokenizer.pad_token = tokenizer.eos_token
+            model_cache_path = self._cache_for(model_id)
             
             # Prepare model loading arguments
             model_kwargs = {
-                'cache_dir': str(model_cache_path),
+                'cache_dir': model_cache_path,
                 'trust_remote_code': loading_config.get('trust_remote_code', True),
                 'torch_dtype': loading_config.get('torch_dtype', 'auto'),
                 'device_map': loading_config.get('device_map', 'auto')
             }
             
-            # Add quantization settings
+            # Add quantization settings; the legacy top-level load_in_* kwargs bypass the quantizer
+            quant_cfg = None
             if loading_config.get('load_in_4bit'):
-                model_kwargs['load_in_4bit'] = True
+                default_compute = 'bfloat16' if self.has_gpu and torch.cuda.is_bf16_supported() else 'float16'
+                quant_cfg = BitsAndBytesConfig(
+                    load_in_4bit=True,
+                    bnb_4bit_quant_type=loading_config.get('bnb_4bit_quant_type', 'nf4'),
+                    bnb_4bit_use_double_quant=loading_config.get('double_quant', True),
+                    bnb_4bit_compute_dtype=getattr(torch, loading_config.get('compute_dtype', default_compute))
+                )
             elif loading_config.get('load_in_8bit'):
-                model_kwargs['load_in_8bit'] = True
+                quant_cfg = BitsAndBytesConfig(load_in_8bit=True)
+
+            if quant_cfg is not None:
+                model_kwargs['quantization_config'] = quant_cfg
+                # The quantizer picks storage dtypes itself; 'auto' conflicts with it
+                if model_kwargs['torch_dtype'] == 'auto':
+                    del model_kwargs['torch_dtype']
             
             # Load model
-            memory_before = psutil.virtual_memory().used / (1024**3)
-            
-            model = await asyncio.to_thread(
-                AutoModelForCausalLM.from_pretrained,
-                model_config.hf_repo,
-                **model_kwargs
+            # Bulk-load unquantized weights on the CPU and copy them over from pinned memory;
+            # quantized and multi-GPU loads still need from_pretrained's own placement
+            pin_async_load = (
+                self.has_gpu and
+                quant_cfg is None and
+                torch.cuda.device_count() == 1 and
+                loading_config.get('pin_async_load', True)
+            )
+            load_model = self._load_then_pin_to_cuda if pin_async_load else AutoModelForCausalLM.from_pretrained
+
+            # Tokenizer files and model weights are independent downloads; fetch them concurrently
+            tokenizer, model = await asyncio.gather(
+                asyncio.to_thread(
+                    AutoTokenizer.from_pretrained,
+                    model_config.hf_repo,
+                    cache_dir=model_cache_path,
+                    trust_remote_code=loading_config.get('trust_remote_code', True)
+                ),
+                asyncio.to_thread(load_model, model_config.hf_repo, **model_kwargs)
             )
             
-            memory_after = psutil.virtual_memory().used / (1024**3)
-            memory_usage = memory_after - memory_before
+            memory_usage = self._model_size_gb(model)
+
+            if tokenizer.pad_token is None:
+                tokenizer.pad_token = tokenizer.eos_token
+
+            # Decoder-only models need left padding for batched generation
+            tokenizer.padding_side = "left"
+
+            model = compile_for_inference(model)
+
+            # Clones only: the primary instance is handed out by get_model_for_inference
+            tokenizer_pool: "queue.Queue[Any]" = queue.Queue()
+            for _ in range(TOKENIZER_POOL_SIZE):
+                tokenizer_pool.put(copy.deepcopy(tokenizer))
             
             # Store model information
             self.loaded_models[model_id] = {
                 'model': model,
                 'tokenizer': tokenizer,
+                'tokenizer_pool': tokenizer_pool,
                 'config': model_config,
                 'loading_config': loading_config,
                 'memory_usage_gb': memory_usage,
@@ -170,42 +316,55 @@ class ModelManager:
             logger.error(f"Failed to load model {model_id}: {e}")
             return False
     
-    async def _ensure_memory_available(self, required_gb: float) -> bool:
+    async def _ensure_memory_available(
+        self,
+        required_gb: float,
+        snapshot: Optional[_MemSnapshot] = None
+    ) -> bool:
         """Ensure enough memory is available by unloading models if necessary"""
-        available_memory = self.get_available_memory()
-        
-        if available_memory >= required_gb:
-            return True
-        
-        # Calculate how much memory we need to free
-        memory_to_free = required_gb - available_memory + 1.0  # 1GB buffer
-        
-        # Sort models by last used time (oldest first)
-        models_by_age = sorted(
-            self.loaded_models.keys(),
-            key=lambda x: self.last_used.get(x, datetime.min)
-        )
-        
-        freed_memory = 0.0
-        for model_id in models_by_age:
-            if freed_memory >= memory_to_free:
-                break
+        # A snapshot taken before waiting on another loader's eviction is stale
+        if self._evict_lock.locked():
+            snapshot = None
+
+        async with self._evict_lock:
+            available_memory = (snapshot or self._snapshot_memory()).host_gb
+            
+            if available_memory >= required_gb:
+                return True
             
-            model_memory = self.get_model_memory_usage(model_id)
-            await self.unload_model(model_id)
-            freed_memory += model_memory
+            # Calculate how much memory we need to free
+            memory_to_free = required_gb - available_memory + 1.0  # 1GB buffer
             
-            logger.info(f"Unloaded model {model_id} to free {model_memory:.2f}GB")
-        
-        # Force garbage collection
+            # loaded_models is kept in LRU order, oldest first; snapshot it since unloading mutates it
+            freed_memory = 0.0
+            for model_id in list(self.loaded_models):
+                if freed_memory >= memory_to_free:
+                    break
+                
+                model_memory = self.get_model_memory_usage(model_id)
+                await self.unload_model(model_id, defer_cleanup=True)
+                freed_memory += model_memory
+                
+                logger.info(f"Unloaded model {model_id} to free {model_memory:.2f}GB")
+            
+            self._release_memory()
+            
+            return freed_memory >= memory_to_free
+    
+    def _release_memory(self) -> None:
+        """Collect garbage and return cached CUDA blocks once after a batch of unloads"""
         gc.collect()
         if self.has_gpu:
             torch.cuda.empty_cache()
-        
-        return freed_memory >= memory_to_free
-    
-    async def unload_model(self, model_id: str) -> bool:
-        """Unload a specific model from memory"""
+            # Reclaiming IPC handles is expensive; only bother when VRAM is nearly exhausted
+            if self.gpu_memory_gb - self.get_total_model_memory() < 0.5:
+                torch.cuda.ipc_collect()
+
+    async def unload_model(self, model_id: str, defer_cleanup: bool = False) -> bool:
+        """Unload a specific model from memory.
+
+        With ``defer_cleanup`` the caller is responsible for calling _release_memory().
+        """
         try:
             if model_id not in self.loaded_models:
                 return True
@@ -215,15 +374,14 @@ class ModelManager:
             # Delete model and tokenizer
             del model_info['model']
             del model_info['tokenizer']
+            del model_info['tokenizer_pool']
             del self.loaded_models[model_id]
             
             if model_id in self.last_used:
                 del self.last_used[model_id]
             
-            # Force cleanup
-            gc.collect()
-            if self.has_gpu:
-                torch.cuda.empty_cache()
+            if not defer_cleanup:
+                self._release_memory()
             
             logger.info(f"Unloaded model {model_id}")
             return True
@@ -232,6 +390,70 @@ class ModelManager:
             logger.error(f"Failed to unload model {model_id}: {e}")
             return False
     
+    @staticmethod
+    def _model_size_gb(model: Any) -> float:
+        """Exact parameter and buffer footprint; packed bnb weights report their packed size"""
+        total_bytes = sum(p.numel() * p.element_size() for p in model.parameters())
+        total_bytes += sum(b.numel() * b.element_size() for b in model.buffers())
+        return total_bytes / (1024**3)
+
+    @staticmethod
+    def _prefetch_weight_files(cache_dir: str) -> None:
+        """Ask the kernel to read cached safetensors shards ahead in bulk"""
+        if not hasattr(os, "posix_fadvise"):
+            return
+        for path in Path(cache_dir).rglob("*.safetensors"):
+            try:
+                fd = os.open(path, os.O_RDONLY)
+                try:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                finally:
+                    os.close(fd)
+            except OSError:
+                continue
+
+    def _load_then_pin_to_cuda(self, hf_repo: str, **model_kwargs) -> Any:
+        """Load weights on the CPU and stream them to the GPU through pinned staging slots.
+
+        Direct-to-CUDA loading faults mmap'd pages in one at a time during each copy;
+        staging turns that into bulk readahead plus overlapped DMA. Weights pass through
+        two bounded, reused pinned slots rather than a pinned copy of the whole model, so
+        peak host RAM stays at one copy of the weights.
+        """
+        self._prefetch_weight_files(model_kwargs['cache_dir'])
+
+        model_kwargs = dict(model_kwargs, device_map="cpu", low_cpu_mem_usage=True)
+        model = AutoModelForCausalLM.from_pretrained(hf_repo, **model_kwargs)
+
+        staging = [torch.empty(PIN_STAGING_BYTES, dtype=torch.uint8, pin_memory=True) for _ in range(2)]
+        in_flight: List[Optional[torch.cuda.Event]] = [None, None]
+        slot = 0
+        for tensor in list(model.parameters()) + list(model.buffers()):
+            source = tensor.data.contiguous()
+            device_tensor = torch.empty_like(source, device="cuda")
+            source_bytes = source.reshape(-1).view(torch.uint8)
+            device_bytes = device_tensor.view(-1).view(torch.uint8)
+            for offset in range(0, source_bytes.numel(), PIN_STAGING_BYTES):
+                length = min(PIN_STAGING_BYTES, source_bytes.numel() - offset)
+                # Wait for this slot's previous copy before overwriting it
+                if in_flight[slot] is not None:
+                    in_flight[slot].synchronize()
+                staging[slot][:length].copy_(source_bytes[offset:offset + length])
+                device_bytes[offset:offset + length].copy_(staging[slot][:length], non_blocking=True)
+                in_flight[slot] = torch.cuda.Event()
+                in_flight[slot].record()
+                slot ^= 1
+            # Drops the CPU copy of this tensor as soon as its last chunk is queued
+            tensor.data = device_tensor
+
+        torch.cuda.synchronize()
+        return model
+
+    def _monotonic_to_wall(self, ns: Optional[int]) -> datetime:
+        if ns is None:
+            return datetime.min
+        return self._boot_wall + timedelta(microseconds=(ns - self._boot_ns) // 1000)
+
     def get_loaded_models(self) -> Dict[str, Dict[str, Any]]:
         """Get information about all loaded models"""
         result = {}
@@ -241,20 +463,62 @@ class ModelManager:
                 'memory_usage_gb': model_info['memory_usage_gb'],
                 'loaded_at': model_info['loaded_at'].isoformat(),
                 'device': model_info['device'],
-                'last_used': self.last_used.get(model_id, datetime.min).isoformat()
+                'last_used': self._monotonic_to_wall(self.last_used.get(model_id)).isoformat()
             }
         return result
     
     def get_model_for_inference(self, model_id: str) -> Optional[Tuple[Any, Any]]:
-        """Get model and tokenizer for inference"""
+        """Get model and tokenizer for inference.
+
+        The tokenizer is shared; read its special-token ids only and encode or
+        decode through pooled_tokenizer.
+        """
         if model_id not in self.loaded_models:
             return None
         
         model_info = self.loaded_models[model_id]
-        self.last_used[model_id] = datetime.now()
+        self.loaded_models.move_to_end(model_id)
+        self.last_used[model_id] = time.monotonic_ns()
         
         return model_info['model'], model_info['tokenizer']
     
+    def tokenizer_pool(self, model_id: str) -> "queue.Queue[Any]":
+        """Pool of independent tokenizer clones for a loaded model"""
+        return self.loaded_models[model_id]['tokenizer_pool']
+
+    @contextmanager
+    def pooled_tokenizer(self, model_id: str, block: bool = True) -> Iterator[Any]:
+        """Borrow a dedicated tokenizer instance for the duration of one call.
+
+        With block=False, raises queue.Empty instead of waiting for a free one.
+        """
+        tokenizer_pool = self.tokenizer_pool(model_id)
+        tokenizer = tokenizer_pool.get(block=block)
+        try:
+            yield tokenizer
+        finally:
+            tokenizer_pool.put(tokenizer)
+
+    def encode(self, model_id: str, input_text: str) -> torch.Tensor:
+        """Tokenize a prompt on a pooled tokenizer; blocking, run it in a worker thread"""
+        with self.pooled_tokenizer(model_id) as tokenizer:
+            return tokenizer(input_text, return_tensors="pt").input_ids
+
+    def encode_batch(self, model_id: str, input_texts: List[str]) -> Any:
+        """Tokenize several prompts in one padded call on a single pooled tokenizer"""
+        with self.pooled_tokenizer(model_id) as tokenizer:
+            return tokenizer(input_texts, padding=True, return_tensors="pt")
+
+    def decode(self, model_id: str, token_ids: Any, block: bool = True) -> str:
+        """Decode one sequence on a pooled tokenizer"""
+        with self.pooled_tokenizer(model_id, block) as tokenizer:
+            return tokenizer.decode(token_ids, skip_special_tokens=True)
+
+    def decode_batch(self, model_id: str, token_ids: Any, block: bool = True) -> List[str]:
+        """Decode several sequences in one call on a single pooled tokenizer"""
+        with self.pooled_tokenizer(model_id, block) as tokenizer:
+            return tokenizer.batch_decode(token_ids, skip_special_tokens=True)
+
     def get_recommended_model(self, task_type: Optional[str] = None) -> Optional[str]:
         """Get the best recommended model for current resources and task"""
         return model_registry.get_recommended_model(
@@ -265,15 +529,25 @@ class ModelManager:
     
     async def cleanup_old_models(self, max_age_hours: int = 24) -> None:
         """Clean up models that haven't been used for a while"""
-        cutoff_time = datetime.now() - timedelta(hours=max_age_hours)
+        now_ns = time.monotonic_ns()
+        max_age_ns = max_age_hours * 3_600_000_000_000
         
-        models_to_unload = [
-            model_id for model_id, last_used in self.last_used.items()
-            if last_used < cutoff_time
-        ]
+        # loaded_models is in LRU order, so the expired models form a prefix
+        models_to_unload = []
+        for model_id in self.loaded_models:
+            last_used = self.last_used.get(model_id)
+            if last_used is not None and now_ns - last_used < max_age_ns:
+                break
+            models_to_unload.append(model_id)
         
+        if not models_to_unload:
+            return
+
+        await asyncio.gather(*(
+            self.unload_model(model_id, defer_cleanup=True) for model_id in models_to_unload
+        ))
+        self._release_memory()
         for model_id in models_to_unload:
-            await self.unload_model(model_id)
             logger.info(f"Cleaned up old model {model_id}")
 
 # Global model manager instance
@@ -0,0 +1,58 @@
+"""
+Request bodies for the agent API, decoded with msgspec
+"""
+from typing import Any, Callable, Dict, Union
+
+import msgspec
+from fastapi import HTTPException, Request
+
+class TaskRequest(msgspec.Struct):
+    """Inference task body for /tasks/execute and the streaming endpoints.
+
+    Fields not declared here are kept in extra and handed on with the task.
+    """
+    id: Union[str, int] = "unknown"
+    model: str = "auto"
+    input: str = ""
+    parameters: Dict[str, Any] = {}
+    task_type: str = "text-generation"
+    extra: Dict[str, Any] = {}
+
+    def to_task_data(self) -> Dict[str, Any]:
+        """Rebuild the task dict the executor expects, including passthrough fields"""
+        task_data = dict(self.extra)
+        task_data.update(
+            id=self.id,
+            model=self.model,
+            input=self.input,
+            parameters=self.parameters,
+            task_type=self.task_type
+        )
+        return task_data
+
+class ModelRequest(msgspec.Struct):
+    """Body for /models/load and /models/unload"""
+    model_id: str = ""
+
+_TASK_FIELDS = frozenset(TaskRequest.__struct_fields__) - {"extra"}
+
+def decode_task(body: bytes) -> TaskRequest:
+    """Decode a task body, validating known fields and collecting the rest into extra"""
+    raw = msgspec.json.decode(body, type=Dict[str, Any])
+    known = {key: value for key, value in raw.items() if key in _TASK_FIELDS}
+    task = msgspec.convert(known, TaskRequest)
+    task.extra = {key: value for key, value in raw.items() if key not in _TASK_FIELDS}
+    return task
+
+def decode_body(struct_type: type) -> Callable:
+    """Build a dependency decoding the raw request body straight into struct_type"""
+    decoder = decode_task if struct_type is TaskRequest else (
+        lambda body: msgspec.json.decode(body, type=struct_type)
+    )
+
+    async def decode(request: Request):
+        try:
+            return decoder(await request.body())
+        except msgspec.MsgspecError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    return decode
@@ -3,11 +3,73 @@ Model Quantization and Optimization Manager
 """
 import torch
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Optional
 from transformers import AutoModelForCausalLM
 
+try:
+    import bitsandbytes as bnb
+    BNB_AVAILABLE = True
+except ImportError:
+    bnb = None
+    BNB_AVAILABLE = False
+    logging.warning("bitsandbytes not available, GPU weight quantization disabled")
+
 logger = logging.getLogger(__name__)
 
+# Pruning must run before weights are packed, and dynamic quantization only sees
+# whatever Linear layers survive the static passes
+_CANONICAL_ORDER = ('pruning', 'int4', 'int8', 'dynamic')
+
+def replace_regular_linears(
+    module: torch.nn.Module,
+    mode: str,
+    compute_dtype: torch.dtype = torch.float16,
+    skip_modules: Iterable[str] = ("lm_head",)
+) -> torch.nn.Module:
+    """Swap every nn.Linear under ``module`` in place for a bitsandbytes NF4 or int8 layer.
+
+    Weights are packed as they move to the GPU, so only CUDA devices are supported.
+    Children named in ``skip_modules`` keep full precision, and layers that are
+    already bitsandbytes layers are left as they are.
+    """
+    skip_modules = set(skip_modules)
+    for name, child in module.named_children():
+        # bnb layers subclass nn.Linear; re-wrapping would treat packed weights as fp16
+        if name in skip_modules or isinstance(child, (bnb.nn.Linear4bit, bnb.nn.Linear8bitLt)):
+            continue
+        if not isinstance(child, torch.nn.Linear):
+            replace_regular_linears(child, mode, compute_dtype, skip_modules)
+            continue
+
+        device = child.weight.device if child.weight.is_cuda else torch.device("cuda")
+        has_bias = child.bias is not None
+        if mode == "int4":
+            new_layer = bnb.nn.Linear4bit(
+                child.in_features,
+                child.out_features,
+                bias=has_bias,
+                compute_dtype=compute_dtype,
+                quant_type="nf4"
+            )
+            new_layer.weight = bnb.nn.Params4bit(
+                child.weight.data, requires_grad=False, quant_type="nf4"
+            )
+        else:
+            new_layer = bnb.nn.Linear8bitLt(
+                child.in_features,
+                child.out_features,
+                bias=has_bias,
+                has_fp16_weights=False
+            )
+            new_layer.weight = bnb.nn.Int8Params(
+                child.weight.data, requires_grad=False, has_fp16_weights=False
+            )
+        if has_bias:
+            new_layer.bias = torch.nn.Parameter(child.bias.data.to(compute_dtype), requires_grad=False)
+
+        setattr(module, name, new_layer.to(device))
+    return module
+
 class ModelOptimizer:
     def __init__(self):
         self.supported_optimizations = {
@@ -23,10 +85,17 @@ class ModelOptimizer:
         optimization_config: Dict[str, Any]
     ) -> AutoModelForCausalLM:
         """Apply various optimization techniques to the model"""
+        if not optimization_config:
+            return model
+
+        # Both pack the same Linear weights; the second pass would re-pack packed data
+        if 'int4' in optimization_config and 'int8' in optimization_config:
+            raise ValueError("int4 and int8 quantization are mutually exclusive")
+
         try:
-            for opt_type, params in optimization_config.items():
-                if opt_type in self.supported_optimizations:
-                    model = await self.supported_optimizations[opt_type](model, params)
+            for opt_type in _CANONICAL_ORDER:
+                if opt_type in optimization_config:
+                    model = await self.supported_optimizations[opt_type](model, optimization_config[opt_type])
                     logger.info(f"Applied {opt_type} optimization")
 
             return model
@@ -42,14 +111,14 @@ class ModelOptimizer:
     ) -> AutoModelForCausalLM:
         """Quantize model to INT8"""
         try:
-            # Configure quantization parameters
-            quantization_config = {
-                'weight_bits': 8,
-                'activation_bits': 8,
-                'calibration_samples': config.get('calibration_samples', 100)
-            }
-
-            # Apply quantization
+            if BNB_AVAILABLE and torch.cuda.is_available():
+                return replace_regular_linears(
+                    model,
+                    "int8",
+                    skip_modules=config.get('skip_modules', ("lm_head",))
+                )
+
+            # CPU-only hosts: dynamic quantization is the only int8 path for nn.Linear
             quantized_model = torch.quantization.quantize_dynamic(
                 model,
                 {torch.nn.Linear},
@@ -68,8 +137,21 @@ class ModelOptimizer:
         config: Dict[str, Any]
     ) -> AutoModelForCausalLM:
         """Quantize model to INT4 for extreme compression"""
-        # Implementation for INT4 quantization
-        pass
+        if not (BNB_AVAILABLE and torch.cuda.is_available()):
+            logger.warning("INT4 quantization requires bitsandbytes and CUDA; leaving model unchanged")
+            return model
+
+        try:
+            return replace_regular_linears(
+                model,
+                "int4",
+                compute_dtype=getattr(torch, config.get('compute_dtype', 'float16')),
+                skip_modules=config.get('skip_modules', ("lm_head",))
+            )
+
+        except Exception as e:
+            logger.error(f"INT4 quantization failed: {e}")
+            raise
 
     async def _dynamic_quantization(
         self,
@@ -77,8 +159,8 @@ class ModelOptimizer:
         config: Dict[str, Any]
     ) -> AutoModelForCausalLM:
         """Apply dynamic quantization based on runtime statistics"""
-        # Implementation for dynamic quantization
-        pass
+        logger.warning("Dynamic quantization is not implemented; leaving model unchanged")
+        return model
 
     async def _apply_pruning(
         self,
@@ -86,5 +168,5 @@ class ModelOptimizer:
         config: Dict[str, Any]
     ) -> AutoModelForCausalLM:
         """Apply model pruning to reduce model size"""
-        # Implementation for model pruning
-        pass
+        logger.warning("Pruning is not implemented; leaving model unchanged")
+        return model
@@ -1,9 +1,21 @@
 import requests
 import logging
 from typing import Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 logger = logging.getLogger(__name__)
 
+# Shared keep-alive session so repeated hub calls reuse pooled connections
+_SESSION = requests.Session()
+_SESSION.headers.update({"Connection": "keep-alive"})
+for _scheme in ("http://", "https://"):
+    _SESSION.mount(_scheme, HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=2, backoff_factor=0.1)
+    ))
+
 def register_agent(agent_id: str, hub_url: str) -> bool:
     """Register agent with the hub.
     
@@ -15,7 +27,7 @@ def register_agent(agent_id: str, hub_url: str) -> bool:
         bool: True if registration successful, False otherwise
     """
     try:
-        response = requests.post(
+        response = _SESSION.post(
             f"{hub_url}/nodes/register", 
             json={"id": agent_id},
             timeout=10
@@ -41,7 +53,7 @@ def heartbeat(agent_id: str, hub_url: str) -> bool:
         bool: True if heartbeat successful, False otherwise
     """
     try:
-        response = requests.post(
+        response = _SESSION.post(
             f"{hub_url}/nodes/heartbeat", 
             json={"id": agent_id},
             timeout=5
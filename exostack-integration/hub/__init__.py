@@ -1,12 +0,0 @@
-from .registry import registry
-from .scheduler import scheduler
-from .distributed_scheduler import distributed_scheduler
-from .logger import get_logger, log_task_event
-
-__all__ = [
-    'registry',
-    'scheduler', 
-    'distributed_scheduler',
-    'get_logger',
-    'log_task_event'
-]
\ No newline at end of file
@@ -6,6 +6,7 @@ from shared.config.env import (
     DATABASE_URL,
     SECRET_KEY,
     LOG_LEVEL,
+    LOG_FILE,
     DEBUG,
     MAX_CONCURRENT_TASKS
 )
@@ -1,13 +1,16 @@
 import logging
 import asyncio
 from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 
 from .routers import nodes, tasks, status
 from .services import registry, scheduler, distributed_scheduler
 from .services.gpu_scheduler import GPUScheduler
+from .services.heartbeat_batcher import heartbeat_batcher
 from .services.logger import get_logger
+from .middleware import FastPathMiddleware
+from shared.config.env import CORS_ORIGINS
 
 logger = get_logger(__name__)
 
@@ -21,6 +24,7 @@ async def lifespan(app: FastAPI):
     await scheduler.start()
     await distributed_scheduler.start()
     await gpu_scheduler.start()
+    await heartbeat_batcher.start()
 
     # Start registry cleanup task
     asyncio.create_task(registry.cleanup_inactive_nodes())
@@ -34,21 +38,22 @@ async def lifespan(app: FastAPI):
     await scheduler.stop()
     await distributed_scheduler.stop()
     await gpu_scheduler.stop()
+    await heartbeat_batcher.stop()
     logger.info("✅ ExoStack Hub shutdown complete")
 
 app = FastAPI(
     title="ExoStack Hub",
     description="Distributed AI orchestration hub with GPU-aware scheduling and streaming support",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    FastPathMiddleware,
+    allow_origins=CORS_ORIGINS,
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["authorization", "content-type"],
 )
 
 app.include_router(nodes.router, prefix="/nodes", tags=["nodes"])
@@ -92,11 +97,3 @@ async def health_check():
 async def get_metrics():
     from .services.metrics_collector import metrics_collector
     return metrics_collector.get_system_metrics()
-
-# Custom middleware for logging requests
-@app.middleware("http")
-async def log_requests(request, call_next):
-    logger.info(f"Request: {request.method} {request.url.path}")
-    response = await call_next(request)
-    logger.info(f"Response: {response.status_code} from {request.url.path}")
-    return response
\ No newline at end of file
@@ -0,0 +1,78 @@
+import logging
+
+from .services.logger import get_logger
+
+logger = get_logger(__name__)
+
+class FastPathMiddleware:
+    """Single raw-ASGI layer for CORS and debug request logging.
+
+    Replaces CORSMiddleware plus a decorator middleware so each request passes
+    through one Python frame; all CORS header bytes are built once up front.
+    """
+
+    def __init__(self, app, allow_origins, allow_methods, allow_headers, max_age: int = 600):
+        self.app = app
+        # "*" admits any origin; the request's origin is echoed back since credentials are allowed
+        self.allow_all_origins = "*" in allow_origins
+        self.allow_origins = frozenset(origin.encode() for origin in allow_origins)
+        self.allow_methods = frozenset(method.encode() for method in allow_methods)
+        self.preflight_headers = [
+            (b"access-control-allow-methods", ", ".join(allow_methods).encode()),
+            (b"access-control-allow-headers", ", ".join(allow_headers).encode()),
+            (b"access-control-allow-credentials", b"true"),
+            (b"access-control-max-age", str(max_age).encode()),
+            (b"vary", b"Origin"),
+            (b"content-length", b"0"),
+        ]
+        self.simple_headers = [
+            (b"access-control-allow-credentials", b"true"),
+            (b"vary", b"Origin"),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        request_method = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+
+        if scope["method"] == "OPTIONS" and origin is not None and request_method is not None:
+            allowed = self._origin_allowed(origin) and request_method in self.allow_methods
+            if allowed:
+                headers = [(b"access-control-allow-origin", origin)] + self.preflight_headers
+            else:
+                headers = [(b"content-length", b"0")]
+            await send({"type": "http.response.start", "status": 200 if allowed else 400, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Request: %s %s", scope["method"], scope["path"])
+
+        origin_allowed = self._origin_allowed(origin)
+        if not origin_allowed and not debug:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                if origin_allowed:
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"access-control-allow-origin", origin)
+                    ] + self.simple_headers
+                if debug:
+                    logger.debug("Response: %s from %s", message["status"], scope["path"])
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _origin_allowed(self, origin) -> bool:
+        return origin is not None and (self.allow_all_origins or origin in self.allow_origins)
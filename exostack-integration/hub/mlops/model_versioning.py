@@ -1,10 +1,69 @@
 """
 Model Versioning and A/B Testing
 """
+import os
+import asyncio
+import mmap
 import hashlib
+import time
+import logging
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
+logger = logging.getLogger(__name__)
+
+# Slice size when feeding memory-mapped model files into the version hash
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Shards hashed concurrently; hashlib releases the GIL on large updates
+HASH_WORKERS = min(os.cpu_count() or 1, 8)
+
+def _hash_file(path: str) -> bytes:
+    """BLAKE2b of one file via mmap, so memory stays constant for multi-GB shards"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return digest.digest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, 'madvise'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            with memoryview(mm) as view:
+                for offset in range(0, len(view), HASH_CHUNK_SIZE):
+                    digest.update(view[offset:offset + HASH_CHUNK_SIZE])
+    return digest.digest()
+
+# Samples retained per (version, metric); older samples are overwritten
+METRIC_BUFFER_CAPACITY = 10000
+
+METRIC_SAMPLE_DTYPE = np.dtype([('v', 'f8'), ('t', 'i8')])
+
+class MetricRingBuffer:
+    """Fixed-capacity ring of (value, wall-clock ns) samples in one contiguous array"""
+
+    def __init__(self, capacity: int = METRIC_BUFFER_CAPACITY):
+        self.capacity = capacity
+        self.buf = np.empty(capacity, dtype=METRIC_SAMPLE_DTYPE)
+        self.head = 0
+        self.count = 0
+
+    def append(self, value: float) -> None:
+        self.buf[self.head] = (value, time.time_ns())
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def recent(self, n: Optional[int] = None) -> np.ndarray:
+        """Up to ``n`` most recent samples, oldest first"""
+        if self.count < self.capacity:
+            ordered = self.buf[:self.count]
+        else:
+            ordered = np.concatenate([self.buf[self.head:], self.buf[:self.head]])
+        return ordered if n is None else ordered[-n:]
+
+    def __len__(self) -> int:
+        return self.count
+
 class ModelVersioning:
     def __init__(self):
         self.versions = {}
@@ -18,8 +77,8 @@ class ModelVersioning:
     ) -> str:
         """Register new model version"""
         try:
-            # Generate version hash
-            version_hash = self._generate_version_hash(model_path)
+            # Hash off the event loop; multi-GB models take seconds to read
+            version_hash = await asyncio.to_thread(self._generate_version_hash, model_path)
             
             # Store version info
             self.versions[version_hash] = {
@@ -37,6 +96,26 @@ class ModelVersioning:
             logger.error(f"Version registration failed: {e}")
             raise
 
+    def _generate_version_hash(self, model_path: str) -> str:
+        """Content hash of a model file or directory; directory shards are hashed in parallel"""
+        if not os.path.isdir(model_path):
+            return _hash_file(model_path).hex()
+
+        paths = sorted(
+            os.path.join(root, filename)
+            for root, _dirs, filenames in os.walk(model_path)
+            for filename in filenames
+        )
+        with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+            file_digests = list(pool.map(_hash_file, paths))
+
+        # Directory layout is part of the version, not just the bytes
+        digest = hashlib.blake2b(digest_size=16)
+        for path, file_digest in zip(paths, file_digests):
+            digest.update(os.path.relpath(path, model_path).encode())
+            digest.update(file_digest)
+        return digest.hexdigest()
+
     async def create_experiment(
         self,
         name: str,
@@ -45,8 +124,9 @@ class ModelVersioning:
     ) -> str:
         """Create A/B testing experiment"""
         try:
-            experiment_id = hashlib.sha256(
-                f"{name}_{datetime.now()}".encode()
+            experiment_id = hashlib.blake2b(
+                f"{name}_{datetime.now().isoformat()}".encode(),
+                digest_size=16
             ).hexdigest()
             
             self.experiments[experiment_id] = {
@@ -77,12 +157,10 @@ class ModelVersioning:
             # Update metrics
             current_metrics = self.versions[version]['metrics']
             for metric_name, value in metrics.items():
-                if metric_name not in current_metrics:
-                    current_metrics[metric_name] = []
-                current_metrics[metric_name].append({
-                    'value': value,
-                    'timestamp': datetime.now()
-                })
+                ring = current_metrics.get(metric_name)
+                if ring is None:
+                    ring = current_metrics[metric_name] = MetricRingBuffer()
+                ring.append(value)
 
         except Exception as e:
             logger.error(f"Failed to record metrics: {e}")
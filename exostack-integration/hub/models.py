@@ -114,6 +114,34 @@ class TaskUpdateRequest(BaseModel):
     result: Optional[TaskResult] = None
     error: Optional[str] = None
 
+class NodeHealth(BaseModel):
+    """Response model for /nodes/{node_id}/health."""
+    node_id: str
+    status: str
+    last_heartbeat: Optional[str] = None
+    seconds_since_heartbeat: float
+    current_load: float
+    active_tasks: int
+    tasks_completed: int
+    tasks_failed: int
+    health_score: float
+
+class NodeHealthDetail(BaseModel):
+    """Response model for /status/nodes/{node_id}/health."""
+    node_id: str
+    status: Optional[str] = None
+    last_heartbeat: Optional[str] = None
+    uptime: Optional[float] = None
+    health_metrics: Dict[str, Any] = Field(default_factory=dict)
+    capabilities: Optional[Dict[str, Any]] = None
+
+class SystemStatus(BaseModel):
+    """Response model for /status/system."""
+    timestamp: str
+    nodes: Dict[str, int]  # {"total": w, "online": x, "offline": y, "error": z}
+    system_metrics: Dict[str, Any] = Field(default_factory=dict)
+    overall_status: str
+
 class SystemStats(BaseModel):
     """System statistics model."""
     nodes: Dict[str, int]  # {"total": x, "online": y, "offline": z}
@@ -1,5 +1,8 @@
+import asyncio
+import orjson
 from fastapi import APIRouter, HTTPException
-from typing import Dict, Any, Optional
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, Any, Optional
 from ..services.metrics_collector import metrics_collector
 from ..services.logger import get_logger
 
@@ -12,7 +15,7 @@ async def get_system_metrics() -> Dict[str, Any]:
     try:
         return metrics_collector.get_system_metrics()
     except Exception as e:
-        logger.error(f"Error getting system metrics: {e}")
+        logger.error("Error getting system metrics: %s", e)
         raise HTTPException(status_code=500, detail="Failed to get system metrics")
 
 @router.get("/tasks")
@@ -21,7 +24,7 @@ async def get_task_metrics(task_id: Optional[str] = None) -> Dict[str, Any]:
     try:
         return metrics_collector.get_task_metrics(task_id)
     except Exception as e:
-        logger.error(f"Error getting task metrics: {e}")
+        logger.error("Error getting task metrics: %s", e)
         raise HTTPException(status_code=500, detail="Failed to get task metrics")
 
 @router.get("/nodes")
@@ -30,18 +33,22 @@ async def get_node_metrics(node_id: Optional[str] = None) -> Dict[str, Any]:
     try:
         return metrics_collector.get_node_metrics(node_id)
     except Exception as e:
-        logger.error(f"Error getting node metrics: {e}")
+        logger.error("Error getting node metrics: %s", e)
         raise HTTPException(status_code=500, detail="Failed to get node metrics")
 
 @router.get("/events")
-async def get_recent_events(limit: int = 100) -> Dict[str, Any]:
-    """Get recent system events."""
+async def get_recent_events(limit: int = 100) -> StreamingResponse:
+    """Stream recent system events as newline-delimited JSON, newest first."""
+    return StreamingResponse(_event_stream(limit), media_type="application/x-ndjson")
+
+async def _event_stream(limit: int) -> AsyncIterator[bytes]:
+    """Serialize events one chunk at a time, yielding to the event loop between chunks."""
     try:
-        events = metrics_collector.get_recent_events(limit)
-        return {"events": events, "count": len(events)}
+        for chunk in metrics_collector.iter_recent_events(limit):
+            yield b"".join(orjson.dumps(event) + b"\n" for event in chunk)
+            await asyncio.sleep(0)
     except Exception as e:
-        logger.error(f"Error getting recent events: {e}")
-        raise HTTPException(status_code=500, detail="Failed to get recent events")
+        logger.error("Error streaming recent events: %s", e)
 
 @router.post("/cleanup")
 async def cleanup_old_metrics(days: int = 7) -> Dict[str, str]:
@@ -50,5 +57,5 @@ async def cleanup_old_metrics(days: int = 7) -> Dict[str, str]:
         metrics_collector.cleanup_old_metrics(days)
         return {"message": f"Cleaned up metrics older than {days} days"}
     except Exception as e:
-        logger.error(f"Error cleaning up metrics: {e}")
+        logger.error("Error cleaning up metrics: %s", e)
         raise HTTPException(status_code=500, detail="Failed to cleanup metrics")
\ No newline at end of file
@@ -1,12 +1,15 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import ORJSONResponse
 from typing import List, Dict, Any
 from ..models import (
     NodeRegistrationRequest, 
     NodeHeartbeatRequest, 
     Node, 
-    NodeCapabilities
+    NodeCapabilities,
+    NodeHealth
 )
-from ..services.registry import registry
+from ..services.registry import registry, heartbeat_age_seconds
+from ..services.heartbeat_batcher import heartbeat_batcher
 from ..services.logger import get_logger, log_node_event
 import psutil
 import platform
@@ -51,27 +54,20 @@ async def register_node(request: NodeRegistrationRequest):
             raise HTTPException(status_code=500, detail="Failed to register node")
             
     except Exception as e:
-        logger.error(f"Node registration failed: {e}")
+        logger.error("Node registration failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/heartbeat")
 async def node_heartbeat(request: NodeHeartbeatRequest):
     """Receive heartbeat from a node."""
     try:
-        success = registry.update_node_heartbeat(request.id)
+        success = await heartbeat_batcher.submit(
+            request.id,
+            current_load=request.current_load,
+            active_tasks=request.active_tasks
+        )
         
         if success:
-            # Update additional metrics if provided
-            if request.current_load is not None or request.active_tasks is not None:
-                node_key = f"node:{request.id}"
-                update_data = {}
-                if request.current_load is not None:
-                    update_data["current_load"] = request.current_load
-                if request.active_tasks is not None:
-                    update_data["active_tasks"] = request.active_tasks
-                
-                registry.redis_client.hset(node_key, mapping=update_data)
-            
             return {
                 "status": "ok",
                 "timestamp": datetime.now().isoformat(),
@@ -81,38 +77,39 @@ async def node_heartbeat(request: NodeHeartbeatRequest):
             raise HTTPException(status_code=404, detail="Node not found")
             
     except Exception as e:
-        logger.error(f"Heartbeat processing failed: {e}")
+        logger.error("Heartbeat processing failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/status")
-async def get_nodes_status() -> List[Dict[str, Any]]:
+@router.get("/status", response_model=List[Dict[str, Any]])
+async def get_nodes_status() -> ORJSONResponse:
     """Get status of all registered nodes."""
     try:
-        nodes = registry.get_all_nodes()
-        return nodes
+        # Node hashes are flat str dicts, so skip response validation and jsonable_encoder
+        nodes = await registry.get_all_nodes_async()
+        return ORJSONResponse(nodes)
     except Exception as e:
-        logger.error(f"Failed to get nodes status: {e}")
+        logger.error("Failed to get nodes status: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{node_id}")
 async def get_node_info(node_id: str) -> Dict[str, Any]:
     """Get detailed information about a specific node."""
     try:
-        node = registry.get_node(node_id)
+        node = await registry.get_node_async(node_id)
         if not node:
             raise HTTPException(status_code=404, detail="Node not found")
         return node
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to get node info: {e}")
+        logger.error("Failed to get node info: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{node_id}")
 async def remove_node(node_id: str):
     """Remove a node from the system."""
     try:
-        success = registry.remove_node(node_id)
+        success = await registry.remove_node_async(node_id)
         if success:
             log_node_event(node_id, "removed")
             return {"status": "removed", "node_id": node_id}
@@ -121,61 +118,60 @@ async def remove_node(node_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to remove node: {e}")
+        logger.error("Failed to remove node: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/{node_id}/health")
-async def get_node_health(node_id: str):
+@router.get("/{node_id}/health", response_model=NodeHealth)
+async def get_node_health(node_id: str) -> NodeHealth:
     """Get health metrics for a specific node."""
     try:
-        node = registry.get_node(node_id)
+        node = await registry.get_node_async(node_id)
         if not node:
             raise HTTPException(status_code=404, detail="Node not found")
         
         # Calculate health metrics
-        last_heartbeat = datetime.fromisoformat(node.get("last_heartbeat", ""))
-        time_since_heartbeat = (datetime.now() - last_heartbeat).total_seconds()
+        time_since_heartbeat = heartbeat_age_seconds(node)
+        current_load = float(node.get("current_load", 0))
+        tasks_completed = int(node.get("tasks_completed", 0))
+        tasks_failed = int(node.get("tasks_failed", 0))
         
-        health_status = {
-            "node_id": node_id,
-            "status": node.get("status", "unknown"),
-            "last_heartbeat": node.get("last_heartbeat"),
-            "seconds_since_heartbeat": time_since_heartbeat,
-            "current_load": float(node.get("current_load", 0)),
-            "active_tasks": int(node.get("active_tasks", 0)),
-            "tasks_completed": int(node.get("tasks_completed", 0)),
-            "tasks_failed": int(node.get("tasks_failed", 0)),
-            "health_score": _calculate_health_score(node, time_since_heartbeat)
-        }
-        
-        return health_status
+        return NodeHealth(
+            node_id=node_id,
+            status=node.get("status", "unknown"),
+            last_heartbeat=node.get("last_heartbeat"),
+            seconds_since_heartbeat=time_since_heartbeat,
+            current_load=current_load,
+            active_tasks=int(node.get("active_tasks", 0)),
+            tasks_completed=tasks_completed,
+            tasks_failed=tasks_failed,
+            health_score=_calculate_health_score(
+                time_since_heartbeat, current_load, tasks_completed, tasks_failed
+            )
+        )
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to get node health: {e}")
+        logger.error("Failed to get node health: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-def _calculate_health_score(node: Dict[str, Any], time_since_heartbeat: float) -> float:
+def _calculate_health_score(
+    time_since_heartbeat: float,
+    current_load: float,
+    tasks_completed: int,
+    tasks_failed: int
+) -> float:
     """Calculate a health score for the node (0-100)."""
-    score = 100.0
-    
-    # Penalize for old heartbeats
-    if time_since_heartbeat > 30:  # 30 seconds
-        score -= min(50, time_since_heartbeat - 30)
-    
-    # Penalize for high load
-    current_load = float(node.get("current_load", 0))
-    if current_load > 0.8:
-        score -= (current_load - 0.8) * 100
-    
-    # Penalize for task failures
-    tasks_completed = int(node.get("tasks_completed", 0))
-    tasks_failed = int(node.get("tasks_failed", 0))
     total_tasks = tasks_completed + tasks_failed
+    failure_rate = tasks_failed / total_tasks if total_tasks else 0.0
     
-    if total_tasks > 0:
-        failure_rate = tasks_failed / total_tasks
-        score -= failure_rate * 30
-    
+    score = (
+        100.0
+        # Penalize heartbeats older than 30 seconds, by at most 50 points
+        - min(50.0, max(0.0, time_since_heartbeat - 30.0))
+        # Penalize load above 80%
+        - max(0.0, current_load - 0.8) * 100.0
+        # Penalize task failures
+        - failure_rate * 30.0
+    )
     return max(0.0, min(100.0, score))
@@ -1,64 +1,62 @@
 """
 Enhanced status endpoints for health monitoring
 """
+import json
+import time
 from fastapi import APIRouter, HTTPException, Query
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timedelta
-from ..models import NodeStatus
-from ..services.metrics_collector import MetricsCollector
-from ..services.registry import Registry
+from ..models import NodeHealthDetail, SystemStatus
+from ..services.metrics_collector import metrics_collector
+from ..services.registry import registry
 
 router = APIRouter(prefix="/status")
 
+# Node aggregates are recomputed at most once per TTL, or when membership changes
+SYSTEM_STATUS_CACHE_TTL = 0.5
+_node_summary_cache: Optional[Tuple[float, int, Dict[str, int], str]] = None
+
 @router.get("/health")
 async def health_check():
     """Basic health check endpoint"""
     return {"status": "ok", "timestamp": datetime.now().isoformat()}
 
-@router.get("/system")
-async def system_status() -> Dict[str, Any]:
+@router.get("/system", response_model=SystemStatus)
+async def system_status() -> SystemStatus:
     """Get detailed system status including all nodes"""
     try:
-        registry = Registry()
-        metrics_collector = MetricsCollector()
-
-        nodes = registry.get_all_nodes()
+        node_counts, overall_status = await _cached_node_summary()
         system_metrics = metrics_collector.get_system_metrics()
 
-        return {
-            "timestamp": datetime.now().isoformat(),
-            "nodes": {
-                "total": len(nodes),
-                "online": sum(1 for node in nodes if node.status == NodeStatus.ONLINE),
-                "offline": sum(1 for node in nodes if node.status == NodeStatus.OFFLINE),
-                "error": sum(1 for node in nodes if node.status == NodeStatus.ERROR)
-            },
-            "system_metrics": system_metrics,
-            "overall_status": _calculate_overall_status(nodes)
-        }
+        return SystemStatus(
+            timestamp=datetime.now().isoformat(),
+            nodes=node_counts,
+            system_metrics=system_metrics,
+            overall_status=overall_status
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching system status: {str(e)}")
 
-@router.get("/nodes/{node_id}/health")
-async def node_health(node_id: str) -> Dict[str, Any]:
+@router.get("/nodes/{node_id}/health", response_model=NodeHealthDetail)
+async def node_health(node_id: str) -> NodeHealthDetail:
     """Get detailed health information for a specific node"""
     try:
-        registry = Registry()
-        node = registry.get_node(node_id)
+        node = await registry.get_node_async(node_id)
         if not node:
             raise HTTPException(status_code=404, detail=f"Node {node_id} not found")
-
-        metrics_collector = MetricsCollector()
         node_metrics = metrics_collector.get_node_metrics(node_id)
 
-        return {
-            "node_id": node_id,
-            "status": node.status,
-            "last_heartbeat": node.last_heartbeat,
-            "uptime": _calculate_uptime(node.registered_at),
-            "health_metrics": node_metrics,
-            "capabilities": node.capabilities.dict() if node.capabilities else None
-        }
+        registered_at = node.get("registered_at")
+        capabilities = node.get("capabilities")
+
+        return NodeHealthDetail(
+            node_id=node_id,
+            status=node.get("status"),
+            last_heartbeat=node.get("last_heartbeat"),
+            uptime=_calculate_uptime(datetime.fromisoformat(registered_at) if registered_at else None),
+            health_metrics=node_metrics,
+            capabilities=json.loads(capabilities) if capabilities else None
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -72,7 +70,6 @@ async def get_metrics(
 ) -> Dict[str, Any]:
     """Get historical metrics with optional filtering"""
     try:
-        metrics_collector = MetricsCollector()
         from_time = datetime.now() - timedelta(seconds=time_range)
 
         metrics = metrics_collector.get_historical_metrics(
@@ -97,7 +94,6 @@ async def get_alerts(
 ) -> List[Dict[str, Any]]:
     """Get system alerts with optional filtering"""
     try:
-        metrics_collector = MetricsCollector()
         alerts = metrics_collector.get_alerts(
             severity=severity,
             node_id=node_id,
@@ -107,14 +103,26 @@ async def get_alerts(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching alerts: {str(e)}")
 
-def _calculate_overall_status(nodes: List[Any]) -> str:
+async def _cached_node_summary() -> Tuple[Dict[str, int], str]:
+    """Return (node counts, overall status), recounting in Redis once the TTL expires"""
+    global _node_summary_cache
+    now = time.monotonic()
+    entry = _node_summary_cache
+    if entry is None or now >= entry[0] or entry[1] != registry.nodes_epoch:
+        epoch = registry.nodes_epoch
+        node_counts = await registry.get_status_counts_async()
+        entry = (now + SYSTEM_STATUS_CACHE_TTL, epoch, node_counts, _calculate_overall_status(node_counts))
+        _node_summary_cache = entry
+    return entry[2], entry[3]
+
+def _calculate_overall_status(node_counts: Dict[str, int]) -> str:
     """Calculate overall system status based on node health"""
-    if not nodes:
+    total_nodes = node_counts["total"]
+    if not total_nodes:
         return "unknown"
 
-    online_nodes = sum(1 for node in nodes if node.status == NodeStatus.ONLINE)
-    error_nodes = sum(1 for node in nodes if node.status == NodeStatus.ERROR)
-    total_nodes = len(nodes)
+    online_nodes = node_counts["online"]
+    error_nodes = node_counts["error"]
 
     if error_nodes > total_nodes * 0.2:  # More than 20% nodes in error
         return "critical"
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+from .registry import registry
+
+logger = logging.getLogger(__name__)
+
+# Heartbeats arriving within MAX_WAIT of each other share one Redis pipeline
+MAX_BATCH = 256
+MAX_WAIT = 0.002
+
+class HeartbeatBatcher:
+    """Coalesces concurrent node heartbeats into pipelined Redis writes."""
+    
+    def __init__(self):
+        self.running = False
+        self.queue: Optional[asyncio.Queue] = None
+        self.batcher_task = None
+        # Heartbeats taken off the queue but not yet answered
+        self._current_batch: List[Tuple] = []
+    
+    async def start(self):
+        """Start the heartbeat batching worker."""
+        if self.running:
+            return
+        
+        self.queue = asyncio.Queue()
+        self.running = True
+        self.batcher_task = asyncio.create_task(self._batch_loop())
+        logger.info("Heartbeat batcher started")
+    
+    async def stop(self):
+        """Stop the worker; heartbeats still queued or mid-flush are answered with False."""
+        if not self.running:
+            return
+        
+        self.running = False
+        if self.batcher_task:
+            self.batcher_task.cancel()
+            try:
+                await self.batcher_task
+            except asyncio.CancelledError:
+                pass
+        
+        pending = self._current_batch
+        self._current_batch = []
+        while not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+        for *_, future in pending:
+            if not future.done():
+                future.set_result(False)
+        logger.info("Heartbeat batcher stopped")
+    
+    async def submit(
+        self,
+        node_id: str,
+        current_load: Optional[float] = None,
+        active_tasks: Optional[int] = None
+    ) -> bool:
+        """Queue one heartbeat and wait for the batch that carries it to be written."""
+        if not self.running:
+            results = await registry.update_heartbeats_batch_async(
+                [(node_id, current_load, active_tasks)]
+            )
+            return results[0]
+        
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((node_id, current_load, active_tasks, future))
+        return await future
+    
+    async def _batch_loop(self):
+        """Drain up to MAX_BATCH heartbeats per flush, waiting at most MAX_WAIT for stragglers."""
+        loop = asyncio.get_running_loop()
+        while self.running:
+            batch = self._current_batch = [await self.queue.get()]
+            deadline = loop.time() + MAX_WAIT
+            while len(batch) < MAX_BATCH:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            await self._flush(batch)
+            self._current_batch = []
+    
+    async def _flush(self, batch: List[Tuple]):
+        heartbeats = [(node_id, load, tasks) for node_id, load, tasks, _ in batch]
+        try:
+            results = await registry.update_heartbeats_batch_async(heartbeats)
+        except Exception as e:
+            logger.error("Heartbeat batch of %s failed: %s", len(batch), e)
+            results = [False] * len(batch)
+        
+        for (*_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+# Global heartbeat batcher instance
+heartbeat_batcher = HeartbeatBatcher()
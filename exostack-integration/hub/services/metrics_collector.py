@@ -4,7 +4,7 @@ Enhanced metrics collection service
 
 import logging
 import time
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 from datetime import datetime
 from threading import Lock
 from collections import defaultdict
@@ -161,6 +161,15 @@ class MetricsCollector:
                 reverse=True
             )[:limit]
 
+    def iter_recent_events(self, limit: int = 100, chunk_size: int = 100) -> Iterator[List[Dict[str, Any]]]:
+        """Yield the newest alert events, newest first, in chunks of chunk_size"""
+        # Alerts are appended in time order, so the tail is already the newest
+        with self._lock:
+            recent = self._alerts_store[-limit:] if limit > 0 else []
+
+        for end in range(len(recent), 0, -chunk_size):
+            yield recent[max(0, end - chunk_size):end][::-1]
+
     def _check_alerts(self, node_id: str, metrics: Dict[str, Any]):
         """Check metrics against thresholds and generate alerts"""
         for metric_name, threshold in self._alert_thresholds.items():
@@ -1,14 +1,89 @@
 import json
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import redis
+import redis.asyncio as aioredis
 import logging
 from ..config import REDIS_URL
-from ..models import Node, Task
+from ..models import Node, NodeStatus, Task
 
 logger = logging.getLogger(__name__)
 
+# Node hashes expire after a day without heartbeats
+NODE_TTL_SECONDS = 86400
+
+# Nodes without a heartbeat for this long are reported offline
+NODE_OFFLINE_AFTER_SECONDS = 30
+
+# Server-side status indexes: heartbeat-driven nodes scored by last heartbeat
+# epoch, and nodes registered in the error state
+NODE_HEARTBEAT_INDEX = "node_heartbeats"
+ERROR_NODES_KEY = "error_nodes"
+
+# Upper bound on pooled async connections; callers wait for a free one past this
+ASYNC_POOL_MAX_CONNECTIONS = 64
+
+# Existence check, field update, TTL refresh and status index update in one
+# server-side call.
+# KEYS[1] = node hash, KEYS[2] = heartbeat index, KEYS[3] = error set
+# ARGV[1] = ttl, ARGV[2] = node id, ARGV[3] = heartbeat epoch, ARGV[4..] = field/value pairs
+_HEARTBEAT_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 4))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+redis.call('ZADD', KEYS[2], ARGV[3], ARGV[2])
+redis.call('SREM', KEYS[3], ARGV[2])
+return 1
+"""
+
+# Node read plus stale-offline marking in one server-side call.
+# KEYS[1] = node hash, ARGV[1] = epoch seconds / ARGV[2] = ISO timestamp before
+# which the node is stale; the ISO form covers hashes written before last_heartbeat_ts
+_GET_NODE_LUA = """
+local data = redis.call('HGETALL', KEYS[1])
+local ts, iso
+for i = 1, #data, 2 do
+    if data[i] == 'last_heartbeat_ts' then
+        ts = tonumber(data[i + 1])
+    elseif data[i] == 'last_heartbeat' then
+        iso = data[i + 1]
+    end
+end
+if (ts and ts < tonumber(ARGV[1])) or (not ts and iso and iso < ARGV[2]) then
+    redis.call('HSET', KEYS[1], 'status', 'offline')
+end
+return data
+"""
+
+def heartbeat_age_seconds(node_data: Dict[str, Any]) -> float:
+    """Seconds since the node's last heartbeat, preferring the numeric epoch field."""
+    last_heartbeat_ts = node_data.get("last_heartbeat_ts")
+    if last_heartbeat_ts is not None:
+        return time.time() - float(last_heartbeat_ts)
+    last_heartbeat = datetime.fromisoformat(node_data.get("last_heartbeat", ""))
+    return (datetime.now() - last_heartbeat).total_seconds()
+
+def _heartbeat_script_call(
+    node_id: str,
+    now: float,
+    timestamp: str,
+    current_load: Optional[float],
+    active_tasks: Optional[int]
+) -> Dict[str, List[Any]]:
+    """Build the keys/args for one _HEARTBEAT_LUA invocation."""
+    fields = ["last_heartbeat", timestamp, "last_heartbeat_ts", now, "status", "online"]
+    if current_load is not None:
+        fields += ["current_load", current_load]
+    if active_tasks is not None:
+        fields += ["active_tasks", active_tasks]
+    return {
+        "keys": [f"node:{node_id}", NODE_HEARTBEAT_INDEX, ERROR_NODES_KEY],
+        "args": [NODE_TTL_SECONDS, node_id, now, *fields]
+    }
+
 class RedisRegistry:
     """Redis-based registry for managing nodes and tasks."""
     
@@ -19,6 +94,20 @@ class RedisRegistry:
             # Test connection
             self.redis_client.ping()
             logger.info("Connected to Redis successfully")
+            # Bumped whenever node membership changes so cached views can invalidate
+            self.nodes_epoch = 0
+            self._heartbeat_script = self.redis_client.register_script(_HEARTBEAT_LUA)
+            
+            # Non-blocking client for request handlers, sharing one bounded pool
+            self.async_client = aioredis.Redis(
+                connection_pool=aioredis.BlockingConnectionPool.from_url(
+                    redis_url,
+                    max_connections=ASYNC_POOL_MAX_CONNECTIONS,
+                    decode_responses=True
+                )
+            )
+            self._async_heartbeat_script = self.async_client.register_script(_HEARTBEAT_LUA)
+            self._async_get_node_script = self.async_client.register_script(_GET_NODE_LUA)
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
             raise
@@ -28,24 +117,41 @@ class RedisRegistry:
         """Register a new node."""
         try:
             node_key = f"node:{node.id}"
+            now = time.time()
+            registered_at = datetime.fromtimestamp(now).isoformat()
             node_data = {
                 "id": node.id,
                 "status": node.status,
                 "capabilities": json.dumps(node.capabilities) if hasattr(node, 'capabilities') else "{}",
-                "last_heartbeat": datetime.now().isoformat(),
-                "registered_at": datetime.now().isoformat(),
+                "last_heartbeat": registered_at,
+                "last_heartbeat_ts": now,
+                "registered_at": registered_at,
                 "tasks_completed": 0,
                 "tasks_failed": 0
             }
             
+            pipe = self.redis_client.pipeline(transaction=False)
+            
             # Store node data
-            self.redis_client.hset(node_key, mapping=node_data)
+            pipe.hset(node_key, mapping=node_data)
             
             # Add to active nodes set
-            self.redis_client.sadd("active_nodes", node.id)
+            pipe.sadd("active_nodes", node.id)
             
             # Set expiration for cleanup (24 hours)
-            self.redis_client.expire(node_key, 86400)
+            pipe.expire(node_key, NODE_TTL_SECONDS)
+            
+            # Index the node for server-side status counts; nodes registered
+            # offline are scored as already stale
+            if node.status == NodeStatus.ERROR:
+                pipe.sadd(ERROR_NODES_KEY, node.id)
+            elif node.status == NodeStatus.ONLINE:
+                pipe.zadd(NODE_HEARTBEAT_INDEX, {node.id: now})
+            elif node.status == NodeStatus.OFFLINE:
+                pipe.zadd(NODE_HEARTBEAT_INDEX, {node.id: now - NODE_OFFLINE_AFTER_SECONDS - 1})
+            
+            pipe.execute()
+            self.nodes_epoch += 1
             
             logger.info(f"Node {node.id} registered successfully")
             return True
@@ -56,28 +162,73 @@ class RedisRegistry:
     
     def update_node_heartbeat(self, node_id: str) -> bool:
         """Update node's last heartbeat timestamp."""
+        return self.update_heartbeat_bulk(node_id)
+    
+    def update_heartbeat_bulk(
+        self,
+        node_id: str,
+        current_load: Optional[float] = None,
+        active_tasks: Optional[int] = None
+    ) -> bool:
+        """Record a heartbeat and any reported load metrics in a single round-trip."""
         try:
-            node_key = f"node:{node_id}"
-            if not self.redis_client.exists(node_key):
+            now = time.time()
+            call = _heartbeat_script_call(
+                node_id, now, datetime.fromtimestamp(now).isoformat(), current_load, active_tasks
+            )
+            
+            if not self._heartbeat_script(**call):
                 logger.warning(f"Node {node_id} not found for heartbeat update")
                 return False
             
-            # Update heartbeat timestamp and status
-            self.redis_client.hset(node_key, mapping={
-                "last_heartbeat": datetime.now().isoformat(),
-                "status": "online"
-            })
-            
-            # Reset expiration
-            self.redis_client.expire(node_key, 86400)
-            
-            logger.debug(f"Heartbeat updated for node {node_id}")
+            logger.debug("Heartbeat updated for node %s", node_id)
             return True
             
         except Exception as e:
             logger.error(f"Failed to update heartbeat for node {node_id}: {e}")
             return False
     
+    def update_heartbeats_batch(
+        self,
+        heartbeats: List[Tuple[str, Optional[float], Optional[int]]]
+    ) -> List[bool]:
+        """Apply many (node_id, current_load, active_tasks) heartbeats in one pipelined round-trip."""
+        now = time.time()
+        timestamp = datetime.fromtimestamp(now).isoformat()
+        pipe = self.redis_client.pipeline(transaction=False)
+        for node_id, current_load, active_tasks in heartbeats:
+            self._heartbeat_script(
+                **_heartbeat_script_call(node_id, now, timestamp, current_load, active_tasks),
+                client=pipe
+            )
+        
+        results = [bool(result) for result in pipe.execute()]
+        for (node_id, _, _), found in zip(heartbeats, results):
+            if not found:
+                logger.warning(f"Node {node_id} not found for heartbeat update")
+        return results
+    
+    async def update_heartbeats_batch_async(
+        self,
+        heartbeats: List[Tuple[str, Optional[float], Optional[int]]]
+    ) -> List[bool]:
+        """Async variant of update_heartbeats_batch on the pooled async client."""
+        now = time.time()
+        timestamp = datetime.fromtimestamp(now).isoformat()
+        async with self.async_client.pipeline(transaction=False) as pipe:
+            for node_id, current_load, active_tasks in heartbeats:
+                await self._async_heartbeat_script(
+                    **_heartbeat_script_call(node_id, now, timestamp, current_load, active_tasks),
+                    client=pipe
+                )
+            
+            results = [bool(result) for result in await pipe.execute()]
+        
+        for (node_id, _, _), found in zip(heartbeats, results):
+            if not found:
+                logger.warning(f"Node {node_id} not found for heartbeat update")
+        return results
+    
     def get_node(self, node_id: str) -> Optional[Dict[str, Any]]:
         """Get node information."""
         try:
@@ -88,9 +239,7 @@ class RedisRegistry:
                 return None
             
             # Check if node is offline (no heartbeat in last 30 seconds)
-            last_heartbeat = datetime.fromisoformat(node_data.get("last_heartbeat", ""))
-            if datetime.now() - last_heartbeat > timedelta(seconds=30):
-                node_data["status"] = "offline"
+            if self._mark_offline_if_stale(node_data):
                 self.redis_client.hset(node_key, "status", "offline")
             
             return node_data
@@ -111,7 +260,7 @@ class RedisRegistry:
                     nodes.append(node_data)
                 else:
                     # Remove inactive node from set
-                    self.redis_client.srem("active_nodes", node_id)
+                    self._forget_node(self.redis_client, node_id)
             
             return nodes
             
@@ -124,11 +273,131 @@ class RedisRegistry:
         try:
             node_key = f"node:{node_id}"
             
-            # Remove from active nodes set
-            self.redis_client.srem("active_nodes", node_id)
+            pipe = self.redis_client.pipeline(transaction=False)
+            
+            # Remove from active nodes set and status indexes
+            self._forget_node(pipe, node_id)
             
             # Delete node data
-            self.redis_client.delete(node_key)
+            pipe.delete(node_key)
+            pipe.execute()
+            self.nodes_epoch += 1
+            
+            logger.info(f"Node {node_id} removed from registry")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to remove node {node_id}: {e}")
+            return False
+    
+    @staticmethod
+    def _forget_node(client, node_id: str) -> None:
+        """Drop node_id from the active set and status indexes on client (or a pipeline)."""
+        client.srem("active_nodes", node_id)
+        client.zrem(NODE_HEARTBEAT_INDEX, node_id)
+        client.srem(ERROR_NODES_KEY, node_id)
+    
+    def _queue_status_counts(self, pipe) -> None:
+        """Queue the commands whose replies _status_counts_from unpacks."""
+        now = time.time()
+        stale_before = now - NODE_OFFLINE_AFTER_SECONDS
+        # Entries whose node hash has expired can no longer be refreshed
+        pipe.zremrangebyscore(NODE_HEARTBEAT_INDEX, "-inf", now - NODE_TTL_SECONDS)
+        pipe.scard("active_nodes")
+        pipe.zcount(NODE_HEARTBEAT_INDEX, stale_before, "+inf")
+        pipe.zcount(NODE_HEARTBEAT_INDEX, "-inf", f"({stale_before}")
+        pipe.scard(ERROR_NODES_KEY)
+    
+    @staticmethod
+    def _status_counts_from(replies: List[Any]) -> Dict[str, int]:
+        _, total, online, offline, error = replies
+        return {"total": total, "online": online, "offline": offline, "error": error}
+    
+    def get_status_counts(self) -> Dict[str, int]:
+        """Count nodes per status server-side in one pipelined round-trip."""
+        pipe = self.redis_client.pipeline(transaction=False)
+        self._queue_status_counts(pipe)
+        return self._status_counts_from(pipe.execute())
+    
+    async def get_status_counts_async(self) -> Dict[str, int]:
+        """Async variant of get_status_counts."""
+        async with self.async_client.pipeline(transaction=False) as pipe:
+            self._queue_status_counts(pipe)
+            return self._status_counts_from(await pipe.execute())
+    
+    def _mark_offline_if_stale(self, node_data: Dict[str, Any]) -> bool:
+        """Flag node_data offline when its last heartbeat is older than NODE_OFFLINE_AFTER_SECONDS."""
+        if heartbeat_age_seconds(node_data) > NODE_OFFLINE_AFTER_SECONDS:
+            node_data["status"] = "offline"
+            return True
+        return False
+    
+    async def get_node_async(self, node_id: str) -> Optional[Dict[str, Any]]:
+        """Async variant of get_node for request handlers; one round-trip even for stale nodes."""
+        try:
+            stale_before = time.time() - NODE_OFFLINE_AFTER_SECONDS
+            flat = await self._async_get_node_script(
+                keys=[f"node:{node_id}"],
+                args=[stale_before, datetime.fromtimestamp(stale_before).isoformat()]
+            )
+            
+            if not flat:
+                return None
+            
+            # The script already persisted the offline flag; mirror it locally
+            node_data = dict(zip(flat[::2], flat[1::2]))
+            self._mark_offline_if_stale(node_data)
+            
+            return node_data
+            
+        except Exception as e:
+            logger.error(f"Failed to get node {node_id}: {e}")
+            return None
+    
+    async def get_all_nodes_async(self) -> List[Dict[str, Any]]:
+        """Async variant of get_all_nodes; fetches every node hash in one pipeline."""
+        try:
+            node_ids = list(await self.async_client.smembers("active_nodes"))
+            if not node_ids:
+                return []
+            
+            async with self.async_client.pipeline(transaction=False) as pipe:
+                for node_id in node_ids:
+                    pipe.hgetall(f"node:{node_id}")
+                hashes = await pipe.execute()
+            
+            nodes = []
+            async with self.async_client.pipeline(transaction=False) as pipe:
+                for node_id, node_data in zip(node_ids, hashes):
+                    if not node_data:
+                        # Remove inactive node from set
+                        self._forget_node(pipe, node_id)
+                        continue
+                    try:
+                        if self._mark_offline_if_stale(node_data):
+                            pipe.hset(f"node:{node_id}", "status", "offline")
+                    except Exception as e:
+                        logger.error(f"Failed to get node {node_id}: {e}")
+                        continue
+                    nodes.append(node_data)
+                
+                if len(pipe):
+                    await pipe.execute()
+            
+            return nodes
+            
+        except Exception as e:
+            logger.error(f"Failed to get all nodes: {e}")
+            return []
+    
+    async def remove_node_async(self, node_id: str) -> bool:
+        """Async variant of remove_node; both deletes go out in one round-trip."""
+        try:
+            async with self.async_client.pipeline(transaction=False) as pipe:
+                self._forget_node(pipe, node_id)
+                pipe.delete(f"node:{node_id}")
+                await pipe.execute()
+            self.nodes_epoch += 1
             
             logger.info(f"Node {node_id} removed from registry")
             return True
@@ -341,11 +610,12 @@ class RedisRegistry:
     def get_stats(self) -> Dict[str, Any]:
         """Get system statistics."""
         try:
+            node_counts = self.get_status_counts()
             stats = {
                 "nodes": {
-                    "total": self.redis_client.scard("active_nodes"),
-                    "online": 0,
-                    "offline": 0
+                    "total": node_counts["total"],
+                    "online": node_counts["online"],
+                    "offline": node_counts["total"] - node_counts["online"]
                 },
                 "tasks": {
                     "pending": self.redis_client.zcard("pending_tasks"),
@@ -356,14 +626,6 @@ class RedisRegistry:
                 }
             }
             
-            # Count online/offline nodes
-            nodes = self.get_all_nodes()
-            for node in nodes:
-                if node.get("status") == "online":
-                    stats["nodes"]["online"] += 1
-                else:
-                    stats["nodes"]["offline"] += 1
-            
             return stats
             
         except Exception as e:
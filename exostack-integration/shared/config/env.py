@@ -1,44 +1,120 @@
 import os
+import functools
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Tuple
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 env_file = Path(__file__).parent.parent.parent / ".env"
-load_dotenv(env_file)
-
-# Hub Configuration
-HUB_HOST = os.getenv("HUB_HOST", "localhost")
-HUB_PORT = int(os.getenv("HUB_PORT", "8000"))
-HUB_URL = os.getenv("HUB_URL", f"http://{HUB_HOST}:{HUB_PORT}")
-
-# Agent Configuration
-AGENT_ID = os.getenv("AGENT_ID", "agent-001")
-AGENT_HOST = os.getenv("AGENT_HOST", "localhost")
-AGENT_PORT = int(os.getenv("AGENT_PORT", "8001"))
-
-# Database Configuration
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./exostack.db")
-REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-
-# Model Configuration
-DEFAULT_MODEL = os.getenv("DEFAULT_MODEL", "microsoft/DialoGPT-medium")
-MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", "./models")
-MAX_MODEL_MEMORY = int(os.getenv("MAX_MODEL_MEMORY", "4096"))
-MODEL_REGISTRY_PATH = os.getenv("MODEL_REGISTRY_PATH", "./shared/config/model_registry.yaml")
-
-# Logging Configuration
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-LOG_FILE = os.getenv("LOG_FILE", "./logs/exostack.log")
-
-# Security Configuration
-SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
-API_KEY_EXPIRES_DAYS = int(os.getenv("API_KEY_EXPIRES_DAYS", "30"))
-
-# Resource Management
-MAX_CONCURRENT_TASKS = int(os.getenv("MAX_CONCURRENT_TASKS", "5"))
-TASK_TIMEOUT_SECONDS = int(os.getenv("TASK_TIMEOUT_SECONDS", "300"))
-HEARTBEAT_INTERVAL = int(os.getenv("HEARTBEAT_INTERVAL", "10"))
-
-# Development Configuration
-DEBUG = os.getenv("DEBUG", "false").lower() == "true"
-DEVELOPMENT_MODE = os.getenv("DEVELOPMENT_MODE", "false").lower() == "true"
+
+@dataclass(frozen=True)
+class Env:
+    """Process-wide settings, parsed from the environment exactly once"""
+    HUB_HOST: str
+    HUB_PORT: int
+    HUB_URL: str
+    AGENT_ID: str
+    AGENT_HOST: str
+    AGENT_PORT: int
+    AGENT_GRPC_PORT: int
+    DATABASE_URL: str
+    REDIS_URL: str
+    DEFAULT_MODEL: str
+    MODEL_CACHE_DIR: str
+    MAX_MODEL_MEMORY: int
+    MODEL_REGISTRY_PATH: str
+    LOG_LEVEL: str
+    LOG_FILE: str
+    SECRET_KEY: str
+    API_KEY_EXPIRES_DAYS: int
+    CORS_ORIGINS: Tuple[str, ...]
+    MAX_CONCURRENT_TASKS: int
+    TASK_TIMEOUT_SECONDS: int
+    HEARTBEAT_INTERVAL: int
+    DEBUG: bool
+    DEVELOPMENT_MODE: bool
+
+@functools.lru_cache(maxsize=1)
+def get_env() -> Env:
+    load_dotenv(env_file)
+
+    hub_host = os.getenv("HUB_HOST", "localhost")
+    hub_port = int(os.getenv("HUB_PORT", "8000"))
+    return Env(
+        # Hub Configuration
+        HUB_HOST=hub_host,
+        HUB_PORT=hub_port,
+        HUB_URL=os.getenv("HUB_URL", f"http://{hub_host}:{hub_port}"),
+
+        # Agent Configuration
+        AGENT_ID=os.getenv("AGENT_ID", "agent-001"),
+        AGENT_HOST=os.getenv("AGENT_HOST", "localhost"),
+        AGENT_PORT=int(os.getenv("AGENT_PORT", "8001")),
+        AGENT_GRPC_PORT=int(os.getenv("AGENT_GRPC_PORT", "50051")),
+
+        # Database Configuration
+        DATABASE_URL=os.getenv("DATABASE_URL", "sqlite:///./exostack.db"),
+        REDIS_URL=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+
+        # Model Configuration
+        DEFAULT_MODEL=os.getenv("DEFAULT_MODEL", "microsoft/DialoGPT-medium"),
+        MODEL_CACHE_DIR=os.getenv("MODEL_CACHE_DIR", "./models"),
+        MAX_MODEL_MEMORY=int(os.getenv("MAX_MODEL_MEMORY", "4096")),
+        MODEL_REGISTRY_PATH=os.getenv("MODEL_REGISTRY_PATH", "./shared/config/model_registry.yaml"),
+
+        # Logging Configuration
+        LOG_LEVEL=os.getenv("LOG_LEVEL", "INFO"),
+        LOG_FILE=os.getenv("LOG_FILE", "./logs/exostack.log"),
+
+        # Security Configuration
+        SECRET_KEY=os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production"),
+        API_KEY_EXPIRES_DAYS=int(os.getenv("API_KEY_EXPIRES_DAYS", "30")),
+        # Comma-separated browser origins allowed by the hub's CORS policy; "*" allows any
+        CORS_ORIGINS=tuple(
+            origin.strip() for origin in os.getenv("CORS_ORIGINS", "").split(",") if origin.strip()
+        ) or ("*",),
+
+        # Resource Management
+        MAX_CONCURRENT_TASKS=int(os.getenv("MAX_CONCURRENT_TASKS", "5")),
+        TASK_TIMEOUT_SECONDS=int(os.getenv("TASK_TIMEOUT_SECONDS", "300")),
+        HEARTBEAT_INTERVAL=int(os.getenv("HEARTBEAT_INTERVAL", "10")),
+
+        # Development Configuration
+        DEBUG=os.getenv("DEBUG", "false").lower() == "true",
+        DEVELOPMENT_MODE=os.getenv("DEVELOPMENT_MODE", "false").lower() == "true",
+    )
+
+# Module-level names for existing importers; values are constant for the process
+_env = get_env()
+
+HUB_HOST = _env.HUB_HOST
+HUB_PORT = _env.HUB_PORT
+HUB_URL = _env.HUB_URL
+
+AGENT_ID = _env.AGENT_ID
+AGENT_HOST = _env.AGENT_HOST
+AGENT_PORT = _env.AGENT_PORT
+AGENT_GRPC_PORT = _env.AGENT_GRPC_PORT
+
+DATABASE_URL = _env.DATABASE_URL
+REDIS_URL = _env.REDIS_URL
+
+DEFAULT_MODEL = _env.DEFAULT_MODEL
+MODEL_CACHE_DIR = _env.MODEL_CACHE_DIR
+MAX_MODEL_MEMORY = _env.MAX_MODEL_MEMORY
+MODEL_REGISTRY_PATH = _env.MODEL_REGISTRY_PATH
+
+LOG_LEVEL = _env.LOG_LEVEL
+LOG_FILE = _env.LOG_FILE
+
+SECRET_KEY = _env.SECRET_KEY
+API_KEY_EXPIRES_DAYS = _env.API_KEY_EXPIRES_DAYS
+CORS_ORIGINS = list(_env.CORS_ORIGINS)
+
+MAX_CONCURRENT_TASKS = _env.MAX_CONCURRENT_TASKS
+TASK_TIMEOUT_SECONDS = _env.TASK_TIMEOUT_SECONDS
+HEARTBEAT_INTERVAL = _env.HEARTBEAT_INTERVAL
+
+DEBUG = _env.DEBUG
+DEVELOPMENT_MODE = _env.DEVELOPMENT_MODE
@@ -203,6 +203,10 @@ class ModelRegistry:
         if quantization:
             if quantization in ['4bit', '8bit']:
                 config[f'load_in_{quantization}'] = True
+                if quantization == '4bit':
+                    # NF4 with double quantization; compute dtype is left to the loader
+                    config['bnb_4bit_quant_type'] = 'nf4'
+                    config['double_quant'] = True
             else:
                 config['quantization'] = quantization
         
@@ -0,0 +1,39 @@
+"""
+Shared fixtures: the hub registry connects to Redis on import, so point it at fakeredis
+"""
+import os
+import tempfile
+
+import fakeredis
+import pytest
+import redis
+
+# Keep model caches and log files created on import out of the source tree
+_SCRATCH_DIR = tempfile.mkdtemp(prefix="exostack-tests-")
+os.environ.setdefault("MODEL_CACHE_DIR", os.path.join(_SCRATCH_DIR, "models"))
+os.environ.setdefault("LOG_FILE", os.path.join(_SCRATCH_DIR, "logs", "exostack.log"))
+
+FAKE_REDIS_SERVER = fakeredis.FakeServer()
+
+redis.from_url = lambda url, **kwargs: fakeredis.FakeRedis(server=FAKE_REDIS_SERVER, **kwargs)
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Flushed fakeredis server wired into the hub registry; yields a sync client on it.
+
+    The async client is rebuilt per test because its connections are bound to
+    the event loop that opened them.
+    """
+    from hub.services.registry import _GET_NODE_LUA, _HEARTBEAT_LUA, registry
+
+    sync_client = fakeredis.FakeRedis(server=FAKE_REDIS_SERVER, decode_responses=True)
+    sync_client.flushall()
+    async_client = fakeredis.aioredis.FakeRedis(server=FAKE_REDIS_SERVER, decode_responses=True)
+    monkeypatch.setattr(registry, "async_client", async_client)
+    monkeypatch.setattr(
+        registry, "_async_heartbeat_script", async_client.register_script(_HEARTBEAT_LUA)
+    )
+    monkeypatch.setattr(
+        registry, "_async_get_node_script", async_client.register_script(_GET_NODE_LUA)
+    )
+    yield sync_client
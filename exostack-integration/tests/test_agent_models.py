@@ -0,0 +1,70 @@
+"""
+Tests for agent request body decoding
+"""
+import msgspec
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from agent.models import ModelRequest, TaskRequest, decode_body, decode_task
+
+def test_decode_task_defaults():
+    task = decode_task(b"{}")
+    assert task.to_task_data() == {
+        "id": "unknown",
+        "model": "auto",
+        "input": "",
+        "parameters": {},
+        "task_type": "text-generation"
+    }
+
+def test_decode_task_accepts_numeric_id():
+    task = decode_task(b'{"id": 42, "input": "hi"}')
+    assert task.id == 42
+    assert task.input == "hi"
+
+def test_decode_task_passes_unknown_fields_through():
+    task = decode_task(b'{"id": "t1", "priority": 3, "callback_url": "http://x"}')
+    assert task.extra == {"priority": 3, "callback_url": "http://x"}
+    task_data = task.to_task_data()
+    assert task_data["priority"] == 3
+    assert task_data["callback_url"] == "http://x"
+    assert task_data["id"] == "t1"
+
+def test_decode_task_declared_fields_win_over_extra():
+    task = decode_task(b'{"model": "gpt2", "extra": {"a": 1}}')
+    assert task.to_task_data()["model"] == "gpt2"
+    assert task.extra == {"extra": {"a": 1}}
+
+@pytest.mark.parametrize("body", [b'{"id": [1]}', b'{"parameters": "x"}', b"[]", b"not json"])
+def test_decode_task_rejects_invalid_bodies(body):
+    with pytest.raises(msgspec.MsgspecError):
+        decode_task(body)
+
+def _client() -> TestClient:
+    app = FastAPI()
+
+    @app.post("/tasks")
+    async def tasks(task: TaskRequest = Depends(decode_body(TaskRequest))):
+        return task.to_task_data()
+
+    @app.post("/models")
+    async def models(request: ModelRequest = Depends(decode_body(ModelRequest))):
+        return {"model_id": request.model_id}
+
+    return TestClient(app)
+
+def test_decode_body_dependency():
+    client = _client()
+    response = client.post("/tasks", content=b'{"id": 7, "tag": "a"}')
+    assert response.status_code == 200
+    assert response.json()["id"] == 7
+    assert response.json()["tag"] == "a"
+
+    response = client.post("/models", content=b'{"model_id": "gpt2"}')
+    assert response.json() == {"model_id": "gpt2"}
+
+def test_decode_body_invalid_returns_422():
+    client = _client()
+    assert client.post("/tasks", content=b'{"id": 1.5}').status_code == 422
+    assert client.post("/models", content=b'{"model_id": 1}').status_code == 422
@@ -0,0 +1,95 @@
+"""
+Tests for the hub's CORS preflight and simple-request handling
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from hub.middleware import FastPathMiddleware
+
+ORIGIN = "http://allowed.example"
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    app.add_middleware(
+        FastPathMiddleware,
+        allow_origins=[ORIGIN],
+        allow_methods=["GET", "POST"],
+        allow_headers=["Content-Type"],
+        max_age=600
+    )
+    return TestClient(app)
+
+def _preflight(client, origin, method="GET"):
+    return client.options("/ping", headers={
+        "Origin": origin,
+        "Access-Control-Request-Method": method
+    })
+
+def test_preflight_allowed(client):
+    response = _preflight(client, ORIGIN)
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+    assert response.headers["access-control-allow-methods"] == "GET, POST"
+    assert response.headers["access-control-allow-headers"] == "Content-Type"
+    assert response.headers["access-control-allow-credentials"] == "true"
+    assert response.headers["access-control-max-age"] == "600"
+    assert response.content == b""
+
+@pytest.mark.parametrize("origin, method", [
+    ("http://evil.example", "GET"),
+    (ORIGIN, "DELETE"),
+])
+def test_preflight_denied(client, origin, method):
+    response = _preflight(client, origin, method)
+    assert response.status_code == 400
+    assert "access-control-allow-origin" not in response.headers
+
+def test_simple_request_allowed_origin(client):
+    response = client.get("/ping", headers={"Origin": ORIGIN})
+    assert response.json() == {"ok": True}
+    assert response.headers["access-control-allow-origin"] == ORIGIN
+    assert response.headers["vary"] == "Origin"
+
+def test_simple_request_other_origin(client):
+    response = client.get("/ping", headers={"Origin": "http://evil.example"})
+    assert response.json() == {"ok": True}
+    assert "access-control-allow-origin" not in response.headers
+
+@pytest.fixture
+def wildcard_client():
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    app.add_middleware(
+        FastPathMiddleware,
+        allow_origins=["*"],
+        allow_methods=["GET"],
+        allow_headers=["Content-Type"]
+    )
+    return TestClient(app)
+
+def test_wildcard_allows_any_origin(wildcard_client):
+    origin = "http://anywhere.example"
+    response = _preflight(wildcard_client, origin)
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == origin
+
+    response = wildcard_client.get("/ping", headers={"Origin": origin})
+    assert response.headers["access-control-allow-origin"] == origin
+
+def test_wildcard_still_checks_methods(wildcard_client):
+    assert _preflight(wildcard_client, "http://anywhere.example", "DELETE").status_code == 400
+
+def test_no_cors_headers_without_origin(wildcard_client):
+    response = wildcard_client.get("/ping")
+    assert "access-control-allow-origin" not in response.headers
@@ -0,0 +1,41 @@
+"""
+Tests for the branchless node health score
+"""
+import itertools
+
+import pytest
+
+from hub.routers.nodes import _calculate_health_score
+
+def _reference_score(time_since_heartbeat, current_load, tasks_completed, tasks_failed):
+    """The original branching implementation"""
+    score = 100.0
+    if time_since_heartbeat > 30:
+        score -= min(50, time_since_heartbeat - 30)
+    if current_load > 0.8:
+        score -= (current_load - 0.8) * 100
+    total_tasks = tasks_completed + tasks_failed
+    if total_tasks > 0:
+        score -= tasks_failed / total_tasks * 30
+    return max(0.0, min(100.0, score))
+
+@pytest.mark.parametrize("args, expected", [
+    ((0.0, 0.0, 0, 0), 100.0),
+    ((30.0, 0.8, 10, 0), 100.0),
+    ((40.0, 0.0, 0, 0), 90.0),
+    ((500.0, 0.0, 0, 0), 50.0),
+    ((0.0, 0.9, 0, 0), 90.0),
+    ((0.0, 0.0, 5, 5), 85.0),
+    ((500.0, 1.5, 0, 10), 0.0),
+])
+def test_health_score_examples(args, expected):
+    assert _calculate_health_score(*args) == pytest.approx(expected)
+
+def test_health_score_matches_branching_version():
+    heartbeats = [0.0, 29.9, 30.0, 30.1, 45.0, 80.0, 81.0, 1000.0]
+    loads = [0.0, 0.5, 0.8, 0.81, 1.0, 2.0]
+    task_counts = [(0, 0), (10, 0), (0, 10), (7, 3)]
+    for heartbeat, load, (completed, failed) in itertools.product(heartbeats, loads, task_counts):
+        assert _calculate_health_score(heartbeat, load, completed, failed) == pytest.approx(
+            _reference_score(heartbeat, load, completed, failed)
+        )
@@ -0,0 +1,94 @@
+"""
+Tests for coalescing concurrent heartbeats in HeartbeatBatcher
+"""
+import asyncio
+
+import pytest
+
+from hub.models import Node, NodeStatus
+from hub.services import heartbeat_batcher as batcher_module
+from hub.services.heartbeat_batcher import HeartbeatBatcher
+from hub.services.registry import registry
+
+@pytest.fixture
+def batch_calls(fake_redis, monkeypatch):
+    """Record each batch handed to the registry while still writing it"""
+    calls = []
+    write = registry.update_heartbeats_batch_async
+
+    async def recording_write(heartbeats):
+        calls.append(list(heartbeats))
+        return await write(heartbeats)
+
+    monkeypatch.setattr(registry, "update_heartbeats_batch_async", recording_write)
+    return calls
+
+@pytest.mark.asyncio
+async def test_concurrent_heartbeats_share_one_batch(batch_calls):
+    registry.register_node(Node(id="n1", status=NodeStatus.ONLINE))
+    registry.register_node(Node(id="n2", status=NodeStatus.ONLINE))
+    batcher = HeartbeatBatcher()
+    await batcher.start()
+    try:
+        results = await asyncio.gather(
+            batcher.submit("n1", 0.5, 1),
+            batcher.submit("ghost"),
+            batcher.submit("n2", active_tasks=2)
+        )
+    finally:
+        await batcher.stop()
+
+    assert results == [True, False, True]
+    assert batch_calls == [[("n1", 0.5, 1), ("ghost", None, None), ("n2", None, 2)]]
+
+@pytest.mark.asyncio
+async def test_batch_is_capped_at_max_batch(batch_calls, monkeypatch):
+    monkeypatch.setattr(batcher_module, "MAX_BATCH", 2)
+    batcher = HeartbeatBatcher()
+    await batcher.start()
+    try:
+        results = await asyncio.gather(*(batcher.submit(f"n{i}") for i in range(5)))
+    finally:
+        await batcher.stop()
+
+    assert results == [False] * 5
+    assert [len(batch) for batch in batch_calls] == [2, 2, 1]
+
+@pytest.mark.asyncio
+async def test_submit_writes_directly_when_stopped(batch_calls):
+    registry.register_node(Node(id="n1", status=NodeStatus.ONLINE))
+    assert await HeartbeatBatcher().submit("n1", 0.1) is True
+    assert batch_calls == [[("n1", 0.1, None)]]
+
+@pytest.mark.asyncio
+async def test_failed_flush_answers_false(fake_redis, monkeypatch):
+    async def failing_write(heartbeats):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(registry, "update_heartbeats_batch_async", failing_write)
+    batcher = HeartbeatBatcher()
+    await batcher.start()
+    try:
+        assert await batcher.submit("n1") is False
+    finally:
+        await batcher.stop()
+
+@pytest.mark.asyncio
+async def test_stop_answers_in_flight_and_queued_heartbeats(fake_redis, monkeypatch):
+    flushing = asyncio.Event()
+
+    async def stalled_write(heartbeats):
+        flushing.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(registry, "update_heartbeats_batch_async", stalled_write)
+    batcher = HeartbeatBatcher()
+    await batcher.start()
+
+    in_flight = asyncio.ensure_future(batcher.submit("n1"))
+    await flushing.wait()
+    queued = asyncio.ensure_future(batcher.submit("n2"))
+    await asyncio.sleep(0)
+
+    await batcher.stop()
+    assert await asyncio.wait_for(asyncio.gather(in_flight, queued), 1) == [False, False]
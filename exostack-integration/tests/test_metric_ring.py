@@ -0,0 +1,37 @@
+"""
+Tests for the agent's single-producer metric rings
+"""
+from agent.health_monitor import MetricRing, MetricsBuffer
+
+def test_ring_before_wrap_keeps_insertion_order():
+    ring = MetricRing(4)
+    assert ring.snapshot() == []
+    ring.append(1.0, 10.0)
+    ring.append(2.0, 20.0)
+    assert ring.snapshot() == [(1.0, 10.0), (2.0, 20.0)]
+
+def test_ring_exactly_full():
+    ring = MetricRing(3)
+    for i in range(3):
+        ring.append(float(i), float(i * 10))
+    assert ring.snapshot() == [(0.0, 0.0), (1.0, 10.0), (2.0, 20.0)]
+
+def test_ring_after_wrap_returns_newest_oldest_first():
+    ring = MetricRing(3)
+    for i in range(7):
+        ring.append(float(i), float(i * 10))
+    assert ring.snapshot() == [(4.0, 40.0), (5.0, 50.0), (6.0, 60.0)]
+    assert ring.head == 7
+
+def test_metrics_buffer_keeps_metrics_separate_and_bounded():
+    buffer = MetricsBuffer(max_samples=2)
+    assert buffer.get_metrics("cpu") == []
+    for value in (1.0, 2.0, 3.0):
+        buffer.add_sample("cpu", value)
+    buffer.add_sample("memory", 50.0)
+
+    cpu = buffer.get_metrics("cpu")
+    assert [sample.value for sample in cpu] == [2.0, 3.0]
+    assert all(sample.metric_type == "cpu" for sample in cpu)
+    assert cpu[0].timestamp <= cpu[1].timestamp
+    assert [sample.value for sample in buffer.get_metrics("memory")] == [50.0]
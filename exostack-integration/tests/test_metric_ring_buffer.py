@@ -0,0 +1,45 @@
+"""
+Tests for per-version inference metric ring buffers
+"""
+import pytest
+
+from hub.mlops.model_versioning import MetricRingBuffer, ModelVersioning
+
+def test_ring_buffer_before_wrap():
+    ring = MetricRingBuffer(capacity=4)
+    assert len(ring) == 0
+    assert ring.recent().size == 0
+    for value in (1.0, 2.0, 3.0):
+        ring.append(value)
+    assert len(ring) == 3
+    assert ring.recent()["v"].tolist() == [1.0, 2.0, 3.0]
+    assert ring.recent(2)["v"].tolist() == [2.0, 3.0]
+
+def test_ring_buffer_wraps_oldest_first():
+    ring = MetricRingBuffer(capacity=3)
+    for value in range(1, 8):
+        ring.append(float(value))
+    recent = ring.recent()
+    assert len(ring) == 3
+    assert recent["v"].tolist() == [5.0, 6.0, 7.0]
+    assert recent["t"].tolist() == sorted(recent["t"].tolist())
+    assert ring.recent(1)["v"].tolist() == [7.0]
+
+@pytest.mark.asyncio
+async def test_record_inference_metrics_uses_one_ring_per_metric(tmp_path):
+    model_file = tmp_path / "model.bin"
+    model_file.write_bytes(b"weights")
+    versioning = ModelVersioning()
+    version = await versioning.register_version("m", str(model_file), {})
+
+    await versioning.record_inference_metrics(version, {"latency": 0.5, "tokens": 10})
+    await versioning.record_inference_metrics(version, {"latency": 0.7})
+
+    metrics = versioning.versions[version]["metrics"]
+    assert metrics["latency"].recent()["v"].tolist() == [0.5, 0.7]
+    assert metrics["tokens"].recent()["v"].tolist() == [10.0]
+
+@pytest.mark.asyncio
+async def test_record_inference_metrics_unknown_version():
+    with pytest.raises(ValueError):
+        await ModelVersioning().record_inference_metrics("missing", {"latency": 1.0})
@@ -0,0 +1,59 @@
+"""
+Tests for the /metrics/events NDJSON stream
+"""
+from datetime import datetime, timedelta
+
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from hub.routers import metrics
+from hub.services.metrics_collector import metrics_collector
+
+def _alerts(count):
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            "timestamp": start + timedelta(seconds=i),
+            "node_id": f"node-{i}",
+            "metric_name": "cpu_usage",
+            "value": 90.0,
+            "threshold": 80.0,
+            "severity": "warning"
+        }
+        for i in range(count)
+    ]
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(metrics.router)
+    return TestClient(app)
+
+def _events(response):
+    return [orjson.loads(line) for line in response.content.splitlines()]
+
+def test_events_are_ndjson_newest_first(client, monkeypatch):
+    monkeypatch.setattr(metrics_collector, "_alerts_store", _alerts(3))
+    response = client.get("/metrics/events")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.content.endswith(b"\n")
+    events = _events(response)
+    assert [event["node_id"] for event in events] == ["node-2", "node-1", "node-0"]
+    assert events[0]["timestamp"] == "2024-01-01T00:00:02"
+
+def test_events_limit_spans_chunks(client, monkeypatch):
+    monkeypatch.setattr(metrics_collector, "_alerts_store", _alerts(250))
+    events = _events(client.get("/metrics/events", params={"limit": 230}))
+    assert len(events) == 230
+    assert events[0]["node_id"] == "node-249"
+    assert events[-1]["node_id"] == "node-20"
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_events_empty(client, monkeypatch, limit):
+    monkeypatch.setattr(metrics_collector, "_alerts_store", _alerts(5))
+    response = client.get("/metrics/events", params={"limit": limit})
+    assert response.status_code == 200
+    assert response.content == b""
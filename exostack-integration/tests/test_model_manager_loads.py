@@ -0,0 +1,71 @@
+"""
+Tests for coalescing concurrent auto_load_model calls
+"""
+import asyncio
+
+import pytest
+
+from agent.model_manager import ModelManager
+
+@pytest.fixture
+def manager():
+    return ModelManager()
+
+def _stub_loader(manager, monkeypatch, result=True):
+    """Replace the real load with one that blocks until released and counts calls"""
+    calls = []
+    release = asyncio.Event()
+
+    async def load(model_id, task_requirements=None):
+        calls.append(model_id)
+        await release.wait()
+        return result
+
+    monkeypatch.setattr(manager, "_auto_load_model", load)
+    return calls, release
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_share_one_attempt(manager, monkeypatch):
+    calls, release = _stub_loader(manager, monkeypatch)
+    loads = [asyncio.ensure_future(manager.auto_load_model("m")) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*loads) == [True, True, True]
+    assert calls == ["m"]
+    assert manager._inflight == {}
+
+@pytest.mark.asyncio
+async def test_failed_load_is_shared_and_retried_later(manager, monkeypatch):
+    calls, release = _stub_loader(manager, monkeypatch, result=False)
+    loads = [asyncio.ensure_future(manager.auto_load_model("m")) for _ in range(2)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*loads) == [False, False]
+
+    assert await manager.auto_load_model("m") is False
+    assert calls == ["m", "m"]
+
+@pytest.mark.asyncio
+async def test_different_models_load_independently(manager, monkeypatch):
+    calls, release = _stub_loader(manager, monkeypatch)
+    loads = [asyncio.ensure_future(manager.auto_load_model(model_id)) for model_id in ("a", "b")]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*loads) == [True, True]
+    assert sorted(calls) == ["a", "b"]
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_the_shared_load(manager, monkeypatch):
+    calls, release = _stub_loader(manager, monkeypatch)
+    leader = asyncio.ensure_future(manager.auto_load_model("m"))
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(manager.auto_load_model("m"))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    release.set()
+    assert await leader is True
+    assert calls == ["m"]
@@ -0,0 +1,59 @@
+"""
+Tests for LRU eviction in ModelManager
+"""
+import queue
+
+import pytest
+
+from agent.model_manager import ModelManager, _MemSnapshot
+
+@pytest.fixture
+def manager(monkeypatch):
+    manager = ModelManager()
+    monkeypatch.setattr(manager, "_release_memory", lambda: None)
+    return manager
+
+def _add_loaded(manager, model_id, memory_gb):
+    manager.loaded_models[model_id] = {
+        "model": object(),
+        "tokenizer": object(),
+        "tokenizer_pool": queue.Queue(),
+        "memory_usage_gb": memory_gb
+    }
+    manager.last_used[model_id] = 0
+
+def test_hits_move_models_to_the_back(manager):
+    for model_id in ("a", "b", "c"):
+        _add_loaded(manager, model_id, 1.0)
+    manager.get_model_for_inference("a")
+    assert list(manager.loaded_models) == ["b", "c", "a"]
+
+@pytest.mark.asyncio
+async def test_eviction_unloads_least_recently_used_first(manager):
+    for model_id in ("a", "b", "c"):
+        _add_loaded(manager, model_id, 2.0)
+    manager.get_model_for_inference("a")
+
+    # Needs 4GB with 1GB free, plus the 1GB margin: frees b and c, keeps a
+    assert await manager._ensure_memory_available(4.0, _MemSnapshot(host_gb=1.0))
+    assert list(manager.loaded_models) == ["a"]
+    assert set(manager.last_used) == {"a"}
+
+@pytest.mark.asyncio
+async def test_eviction_stops_once_enough_is_freed(manager):
+    for model_id in ("a", "b", "c"):
+        _add_loaded(manager, model_id, 3.0)
+    assert await manager._ensure_memory_available(3.0, _MemSnapshot(host_gb=2.0))
+    assert list(manager.loaded_models) == ["b", "c"]
+
+@pytest.mark.asyncio
+async def test_nothing_is_evicted_when_memory_suffices(manager):
+    _add_loaded(manager, "a", 2.0)
+    assert await manager._ensure_memory_available(4.0, _MemSnapshot(host_gb=8.0))
+    assert list(manager.loaded_models) == ["a"]
+
+@pytest.mark.asyncio
+async def test_eviction_reports_failure_when_it_cannot_free_enough(manager):
+    _add_loaded(manager, "a", 1.0)
+    assert not await manager._ensure_memory_available(10.0, _MemSnapshot(host_gb=1.0))
+    assert not manager.loaded_models
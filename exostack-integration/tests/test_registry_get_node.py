@@ -0,0 +1,51 @@
+"""
+Tests for stale-node marking in RedisRegistry.get_node_async
+"""
+import time
+from datetime import datetime
+
+import pytest
+
+from hub.models import Node, NodeStatus
+from hub.services.registry import NODE_OFFLINE_AFTER_SECONDS, registry
+
+STALE_AGE = NODE_OFFLINE_AFTER_SECONDS + 10
+
+@pytest.mark.asyncio
+async def test_missing_node_is_none(fake_redis):
+    assert await registry.get_node_async("ghost") is None
+
+@pytest.mark.asyncio
+async def test_fresh_node_keeps_its_status(fake_redis):
+    registry.register_node(Node(id="n1", status=NodeStatus.ONLINE))
+    node = await registry.get_node_async("n1")
+    assert node["id"] == "n1"
+    assert node["status"] == "online"
+    assert fake_redis.hget("node:n1", "status") == "online"
+
+@pytest.mark.asyncio
+async def test_stale_epoch_heartbeat_is_marked_offline(fake_redis):
+    registry.register_node(Node(id="n1", status=NodeStatus.ONLINE))
+    fake_redis.hset("node:n1", "last_heartbeat_ts", time.time() - STALE_AGE)
+
+    node = await registry.get_node_async("n1")
+    assert node["status"] == "offline"
+    assert fake_redis.hget("node:n1", "status") == "offline"
+
+@pytest.mark.asyncio
+async def test_stale_iso_heartbeat_without_epoch_is_marked_offline(fake_redis):
+    stale = datetime.fromtimestamp(time.time() - STALE_AGE).isoformat()
+    fake_redis.hset("node:legacy", mapping={"id": "legacy", "status": "online", "last_heartbeat": stale})
+
+    node = await registry.get_node_async("legacy")
+    assert node["status"] == "offline"
+    assert fake_redis.hget("node:legacy", "status") == "offline"
+
+@pytest.mark.asyncio
+async def test_fresh_iso_heartbeat_without_epoch_stays_online(fake_redis):
+    fresh = datetime.now().isoformat()
+    fake_redis.hset("node:legacy", mapping={"id": "legacy", "status": "online", "last_heartbeat": fresh})
+
+    node = await registry.get_node_async("legacy")
+    assert node["status"] == "online"
+    assert fake_redis.hget("node:legacy", "status") == "online"
@@ -0,0 +1,67 @@
+"""
+Tests for the Lua heartbeat write path in the hub registry
+"""
+import time
+
+import pytest
+
+from hub.models import Node, NodeStatus
+from hub.services.registry import (
+    ERROR_NODES_KEY,
+    NODE_HEARTBEAT_INDEX,
+    NODE_TTL_SECONDS,
+    registry
+)
+
+def _register(node_id, status=NodeStatus.ONLINE):
+    assert registry.register_node(Node(id=node_id, status=status))
+
+def test_heartbeat_unknown_node_writes_nothing(fake_redis):
+    assert registry.update_heartbeat_bulk("ghost", current_load=0.5) is False
+    assert not fake_redis.exists("node:ghost")
+    assert fake_redis.zscore(NODE_HEARTBEAT_INDEX, "ghost") is None
+
+def test_heartbeat_updates_fields_and_indexes(fake_redis):
+    _register("n1", NodeStatus.ERROR)
+    fake_redis.expire("node:n1", 10)
+    before = time.time()
+
+    assert registry.update_heartbeat_bulk("n1", current_load=0.25, active_tasks=3) is True
+
+    node = fake_redis.hgetall("node:n1")
+    assert node["status"] == "online"
+    assert float(node["current_load"]) == 0.25
+    assert int(node["active_tasks"]) == 3
+    assert float(node["last_heartbeat_ts"]) >= before
+    assert fake_redis.zscore(NODE_HEARTBEAT_INDEX, "n1") >= before
+    assert not fake_redis.sismember(ERROR_NODES_KEY, "n1")
+    assert fake_redis.ttl("node:n1") > NODE_TTL_SECONDS - 5
+
+def test_heartbeat_without_metrics_leaves_them_unset(fake_redis):
+    _register("n1")
+    assert registry.update_node_heartbeat("n1") is True
+    node = fake_redis.hgetall("node:n1")
+    assert "current_load" not in node
+    assert "active_tasks" not in node
+
+def test_heartbeat_batch_reports_per_node(fake_redis):
+    _register("n1")
+    _register("n2")
+    results = registry.update_heartbeats_batch([
+        ("n1", 0.1, 1),
+        ("ghost", 0.2, 2),
+        ("n2", None, None)
+    ])
+    assert results == [True, False, True]
+    assert fake_redis.hget("node:n1", "active_tasks") == "1"
+    assert not fake_redis.exists("node:ghost")
+
+@pytest.mark.asyncio
+async def test_heartbeat_batch_async_matches_sync(fake_redis):
+    _register("n1", NodeStatus.ERROR)
+    results = await registry.update_heartbeats_batch_async([("n1", 0.5, 4), ("ghost", None, None)])
+    assert results == [True, False]
+    assert fake_redis.hget("node:n1", "status") == "online"
+    assert fake_redis.hget("node:n1", "active_tasks") == "4"
+    assert not fake_redis.sismember(ERROR_NODES_KEY, "n1")
+    assert fake_redis.zscore(NODE_HEARTBEAT_INDEX, "n1") is not None
@@ -0,0 +1,72 @@
+"""
+Tests for the /status/system node counts
+"""
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from hub.routers import status
+from hub.services.registry import ERROR_NODES_KEY, NODE_HEARTBEAT_INDEX, NODE_OFFLINE_AFTER_SECONDS
+
+@pytest.fixture
+def client(fake_redis, monkeypatch):
+    monkeypatch.setattr(status, "_node_summary_cache", None)
+    app = FastAPI()
+    app.include_router(status.router)
+    return TestClient(app)
+
+def _add_nodes(client_redis, online=0, offline=0, error=0):
+    now = time.time()
+    for i in range(online):
+        client_redis.sadd("active_nodes", f"on-{i}")
+        client_redis.zadd(NODE_HEARTBEAT_INDEX, {f"on-{i}": now})
+    for i in range(offline):
+        client_redis.sadd("active_nodes", f"off-{i}")
+        client_redis.zadd(NODE_HEARTBEAT_INDEX, {f"off-{i}": now - NODE_OFFLINE_AFTER_SECONDS - 5})
+    for i in range(error):
+        client_redis.sadd("active_nodes", f"err-{i}")
+        client_redis.sadd(ERROR_NODES_KEY, f"err-{i}")
+
+def test_system_status_no_nodes(client):
+    body = client.get("/status/system").json()
+    assert body["nodes"] == {"total": 0, "online": 0, "offline": 0, "error": 0}
+    assert body["overall_status"] == "unknown"
+
+def test_system_status_counts(client, fake_redis):
+    _add_nodes(fake_redis, online=3, offline=1)
+    body = client.get("/status/system").json()
+    assert body["nodes"] == {"total": 4, "online": 3, "offline": 1, "error": 0}
+    assert body["overall_status"] == "degraded"
+
+def test_system_status_drops_expired_heartbeats(client, fake_redis):
+    _add_nodes(fake_redis, online=1)
+    fake_redis.zadd(NODE_HEARTBEAT_INDEX, {"gone": 1.0})
+    body = client.get("/status/system").json()
+    assert body["nodes"]["online"] == 1
+    assert body["nodes"]["offline"] == 0
+    assert fake_redis.zscore(NODE_HEARTBEAT_INDEX, "gone") is None
+
+def test_system_status_recounts_when_membership_changes(client, fake_redis, monkeypatch):
+    monkeypatch.setattr(status, "SYSTEM_STATUS_CACHE_TTL", 60)
+    _add_nodes(fake_redis, online=1)
+    assert client.get("/status/system").json()["overall_status"] == "healthy"
+
+    _add_nodes(fake_redis, error=1)
+    assert client.get("/status/system").json()["nodes"]["error"] == 0
+
+    monkeypatch.setattr(status.registry, "nodes_epoch", status.registry.nodes_epoch + 1)
+    body = client.get("/status/system").json()
+    assert body["nodes"] == {"total": 2, "online": 1, "offline": 0, "error": 1}
+    assert body["overall_status"] == "critical"
+
+@pytest.mark.parametrize("counts, expected", [
+    ({"total": 0, "online": 0, "offline": 0, "error": 0}, "unknown"),
+    ({"total": 4, "online": 4, "offline": 0, "error": 0}, "healthy"),
+    ({"total": 4, "online": 3, "offline": 1, "error": 0}, "degraded"),
+    ({"total": 4, "online": 1, "offline": 3, "error": 0}, "warning"),
+    ({"total": 4, "online": 2, "offline": 0, "error": 2}, "critical"),
+])
+def test_calculate_overall_status(counts, expected):
+    assert status._calculate_overall_status(counts) == expected
@@ -0,0 +1,82 @@
+"""
+Tests for coalescing streamed frames in StreamBuffer
+"""
+import asyncio
+import time
+
+import pytest
+
+from agent.agent import StreamBuffer
+
+async def _collect(buffer, frames):
+    return [data async for data in buffer.coalesce(frames)]
+
+def test_append_flushes_at_size():
+    buffer = StreamBuffer(size=8, interval=60)
+    assert buffer.append(b"abc") is None
+    assert buffer.append(b"defgh") == b"abcdefgh"
+    assert len(buffer) == 0
+
+def test_append_flushes_after_interval():
+    buffer = StreamBuffer(size=1024, interval=0.01)
+    buffer.last_flush = time.monotonic()
+    assert buffer.append(b"a") is None
+    time.sleep(0.02)
+    assert buffer.append(b"b") == b"ab"
+
+@pytest.mark.asyncio
+async def test_coalesce_merges_back_to_back_frames():
+    async def frames():
+        for frame in (b"a", b"b", b"c"):
+            yield frame
+
+    buffer = StreamBuffer(size=1024, interval=60)
+    buffer.last_flush = time.monotonic()
+    assert await _collect(buffer, frames()) == [b"abc"]
+
+@pytest.mark.asyncio
+async def test_coalesce_flushes_partial_buffer_during_a_pause():
+    received = []
+    resumed = asyncio.Event()
+
+    async def frames():
+        yield b"a"
+        await resumed.wait()
+        yield b"b"
+
+    buffer = StreamBuffer(size=1024, interval=0.02)
+    buffer.last_flush = time.monotonic()
+    stream = buffer.coalesce(frames())
+    received.append(await asyncio.wait_for(stream.__anext__(), 1))
+    resumed.set()
+    received.extend([data async for data in stream])
+    assert received == [b"a", b"b"]
+
+@pytest.mark.asyncio
+async def test_coalesce_propagates_source_errors():
+    async def frames():
+        yield b"a"
+        raise RuntimeError("generation failed")
+
+    buffer = StreamBuffer(size=1024, interval=60)
+    buffer.last_flush = time.monotonic()
+    with pytest.raises(RuntimeError, match="generation failed"):
+        await _collect(buffer, frames())
+    assert buffer.flush() == b"a"
+
+@pytest.mark.asyncio
+async def test_coalesce_closes_source_when_consumer_stops():
+    closed = asyncio.Event()
+
+    async def frames():
+        try:
+            yield b"a"
+            await asyncio.Event().wait()
+        finally:
+            closed.set()
+
+    buffer = StreamBuffer(size=1, interval=60)
+    stream = buffer.coalesce(frames())
+    assert await stream.__anext__() == b"a"
+    await stream.aclose()
+    assert closed.is_set()
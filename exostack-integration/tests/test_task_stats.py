@@ -0,0 +1,57 @@
+"""
+Tests for the running task aggregates behind HealthMonitor._get_task_stats
+"""
+import random
+from collections import deque
+
+import pytest
+
+from agent.health_monitor import HealthMonitor
+
+@pytest.fixture
+def monitor():
+    monitor = HealthMonitor()
+    monitor.max_history = 5
+    monitor.task_history = deque(maxlen=monitor.max_history)
+    return monitor
+
+def _recomputed_stats(history):
+    completed = [task for task in history if task["status"] == "completed"]
+    failed = [task for task in history if task["status"] == "failed"]
+    return {
+        "total_tasks": len(history),
+        "completed_tasks": len(completed),
+        "failed_tasks": len(failed),
+        "avg_duration": sum(task["duration"] for task in completed) / len(completed) if completed else 0.0,
+        "success_rate": len(completed) / len(history) * 100 if history else 0.0
+    }
+
+def test_empty_stats(monitor):
+    assert monitor._get_task_stats() == {
+        "total_tasks": 0,
+        "completed_tasks": 0,
+        "failed_tasks": 0,
+        "avg_duration": 0.0,
+        "success_rate": 0.0
+    }
+
+def test_stats_before_eviction(monitor):
+    monitor.record_task("a", "completed", 1.0)
+    monitor.record_task("b", "completed", 3.0)
+    monitor.record_task("c", "failed", 10.0)
+    monitor.record_task("d", "cancelled", 5.0)
+    stats = monitor._get_task_stats()
+    assert stats["total_tasks"] == 4
+    assert stats["completed_tasks"] == 2
+    assert stats["failed_tasks"] == 1
+    assert stats["avg_duration"] == pytest.approx(2.0)
+    assert stats["success_rate"] == pytest.approx(50.0)
+
+def test_evicted_tasks_leave_the_aggregates(monitor):
+    rng = random.Random(0)
+    for i in range(50):
+        monitor.record_task(str(i), rng.choice(["completed", "failed", "timeout"]), rng.uniform(0, 5))
+        expected = _recomputed_stats(monitor.task_history)
+        stats = monitor._get_task_stats()
+        assert stats == {key: pytest.approx(value) for key, value in expected.items()}
+    assert len(monitor.task_history) == monitor.max_history